@@ -4,13 +4,18 @@ from requests.packages.urllib3.util.retry import Retry
 import json
 import logging
 from typing import Optional, List, Dict, Union, Any, Tuple
+from cache_utils import SingleFlight
 
 # Loglama ayarları
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Process geneli single-flight: ayni FMG istegi (Orn: ("interfaces", fmg, cihaz, vdom, adom))
+# icin eszamanli oturumlar/thread'ler tek cagriyi bekler ve sonucu paylasir.
+FMG_REQUESTS = SingleFlight()
+
 class CONSTANTS:
-    DEVICE_FIELDS = ["name", "ip", "platform_str", "os_ver", "desc", "vdom", "conn_status", "adom"]
+    DEVICE_FIELDS = ["name", "ip", "platform_str", "os_ver", "desc", "vdom", "conn_status", "adom", "sn"]
     INTERFACE_FIELDS = ["name", "status", "type", "ip", "vdom", "link-status", "admin-status"]
     VDOM_FIELDS = ["name", "status"]
 
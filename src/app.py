@@ -2,6 +2,7 @@ import streamlit as st
 # Force Rebuild
 import time
 import datetime
+import functools
 import pytz
 import pandas as pd
 import logging
@@ -14,41 +15,23 @@ logging.getLogger('tornado.general').setLevel(logging.WARNING)
 
 # Servisler ve Bilesenler
 from auth_service import AuthService
-from log_service import LogService
+from log_service import LogService, EXPORT_MAX_ROWS
 from config_service import ConfigService
 from ui_components import UI
 from api_client import FortiManagerAPI
 from system_service import SystemService
 from settings_view import render_settings
-
-# --- CACHED DATA FUNCTIONS ---
-@st.cache_data(ttl=60, show_spinner=False)
-def get_cached_devices(_api):
-    """Caches device list for 60 seconds."""
-    if not _api: return []
-    return _api.get_devices() or []
-
-@st.cache_data(ttl=30, show_spinner=False)
-def get_cached_vdoms(_api, device_name):
-    """Caches VDOM list for 30 seconds."""
-    if not _api: return ["root"]
-    return _api.get_vdoms(device_name)
-
-@st.cache_data(ttl=1, show_spinner=False)
-def get_cached_interfaces(_api, device_name, vdom, adom="root"):
-    """Caches interface list for 1 second. Tries Real-time first."""
-    if not _api: return []
-    
-    # 1. Try Real-time (Direct from Device via Proxy)
-    try:
-        realtime_data = _api.get_interfaces_realtime(device_name, vdom=vdom, adom=adom)
-        if realtime_data:
-            return realtime_data
-    except Exception as e:
-        print(f"Realtime Fetch Error: {e}")
-        
-    # 2. Fallback to FMG DB
-    return _api.get_interfaces(device_name, vdom=vdom, adom=adom)
+from device_service import DeviceService
+import live_status
+import prefetcher
+from fleet_status import FleetStatusService, PHYSICAL_TYPES, STATE_LABELS, STATE_LINK_DOWN, STATE_ADMIN_DOWN
+
+# --- CACHED DATA ---
+# Cihaz/VDOM/port verisi DeviceService'in process geneli SWR cache'inden okunur.
+def render_freshness_hint(result, label):
+    """SWR sonucu eskiyse ve arka planda yenileniyorsa kucuk bir ipucu gosterir."""
+    if result.refreshing:
+        st.caption(f"⏳ {label} {result.age:.0f} sn önce alındı • arka planda yenileniyor…")
 
 # --- INITIALIZATION ---
 UI.init_page()
@@ -61,73 +44,27 @@ if 'devices' not in st.session_state: st.session_state.devices = []
 if 'user_timezone' not in st.session_state: st.session_state.user_timezone = "Europe/Istanbul"
 if 'vdoms_cache' not in st.session_state: st.session_state.vdoms_cache = {}
 if 'optimistic_updates' not in st.session_state: st.session_state.optimistic_updates = {} # {dev_vdom_iface: {status: 1/0, expire: ts}}
-
-if 'health_checks' not in st.session_state:
-    st.session_state.health_checks = {
-        "fmg": {"status": "pending", "message": "Not Checked"},
-        "ldap": {"status": "pending", "message": "Not Checked"}
-    }
+if 'tracked_tasks' not in st.session_state: st.session_state.tracked_tasks = {} # {dev_vdom_iface: {task_id, ..., result}}
 
 if 'saved_config' not in st.session_state: 
     st.session_state.saved_config = ConfigService.load_config()
-    
-    # --- AUTO APPLY DNS ---
-    # Eger konfigde DNS varsa, uygulama acilisinda (ilk yuklemede) sisteme uygula
-    cfg = st.session_state.saved_config
-    p_dns = cfg.get("primary_dns")
-    s_dns = cfg.get("secondary_dns")
-    if p_dns:
-        # Sessizce uygula (Hata olursa loga duser ama UI'i bloklamaz)
-        try:
-            SystemService.update_dns(p_dns, s_dns)
-            print(f"Startup DNS Applied: {p_dns}, {s_dns}")
-        except Exception as e:
-            print(f"Startup DNS Error: {e}")
-
-# --- PERFORM STARTUP HEALTH CHECKS ---
-if st.session_state.health_checks["fmg"]["status"] == "pending":
-    cfg = st.session_state.saved_config
-    fmg_s = cfg.get("fmg_settings", {})
-    ip = fmg_s.get("ip")
-    token = fmg_s.get("token")
-    
-    if ip and token:
-        try:
-            success, msg = SystemService.check_fmg_connectivity(ip, token)
-            st.session_state.health_checks["fmg"] = {"status": "success" if success else "error", "message": msg}
-        except:
-            st.session_state.health_checks["fmg"] = {"status": "error", "message": "Check Failed"}
-    else:
-        st.session_state.health_checks["fmg"] = {"status": "warning", "message": "FMG Not Configured"}
 
-if st.session_state.health_checks["ldap"]["status"] == "pending":
-    try:
-        success, msg = AuthService.check_ldap_connectivity()
-        status = "success" if success else ("warning" if "Disabled" in msg else "error")
-        st.session_state.health_checks["ldap"] = {"status": status, "message": msg}
-    except:
-        st.session_state.health_checks["ldap"] = {"status": "error", "message": "Check Failed"}
+# --- STARTUP HEALTH CHECKS & AUTO CONNECT ---
+# DNS uygulama, FMG/LDAP kontrolleri ve otomatik baglanti process basina arka planda
+# (esanli) calisir ve periyodik yenilenir; oturumlar yalnizca son sonuclari okur.
+SystemService.start_health_checks()
+st.session_state.health_checks = SystemService.get_health_checks()
 
-# --- AUTO CONNECT ---
 if not st.session_state.fmg_connected:
-    cfg = st.session_state.saved_config
-    fmg_s = cfg.get("fmg_settings", {})
-    ip = fmg_s.get("ip")
-    token = fmg_s.get("token")
-    
-    if ip and token:
-        try:
-            # Hizli baslangic icin kisa timeout
-            api = FortiManagerAPI(ip, None, None, token, timeout=2)
-            if api.login():
-                st.session_state.api = api
-                st.session_state.fmg_connected = True
-                st.session_state.fmg_ip = ip
-        except Exception as e:
-            print(f"Auto-connect failed: {e}")
+    auto_api = SystemService.get_auto_connect_api(st.session_state.saved_config)
+    if auto_api:
+        st.session_state.api = auto_api
+        st.session_state.fmg_connected = True
+        st.session_state.fmg_ip = st.session_state.saved_config.get("fmg_settings", {}).get("ip")
 
 # --- CONSTANTS ---
-PHYSICAL_TYPES = ['physical', 'hard-switch', 'fsw', 'root', '0', '4']
+TASK_POLL_SECONDS = 2 # Port task takibinde fragment yenileme araligi
+PREFETCH_SEED_SECONDS = 300 # Son kullanilan/yetkili cihazlarin on-yukleme araligi (oturum basina)
 
 def filter_interfaces_for_display(interfaces, user, device_name, show_sub_ifaces):
     """
@@ -137,9 +74,11 @@ def filter_interfaces_for_display(interfaces, user, device_name, show_sub_ifaces
     if not interfaces: return []
     
     # 1. Yetki Filtresi (Strict Whitelist Check)
-    # User objesindeki merkezi kontrol metodunu kullan
+    # User objesindeki merkezi kontrol metodunu kullan (Toplu/vektorize)
     if user:
-        interfaces = [i for i in interfaces if user.has_access_to_port(device_name, i['name'])]
+        names = [i['name'] for i in interfaces]
+        mask = user.port_access_mask([device_name] * len(names), names)
+        interfaces = [i for i, allowed in zip(interfaces, mask) if allowed]
     
     if not interfaces: return []
 
@@ -238,37 +177,54 @@ def render_dashboard():
     api = st.session_state.api
     
     with st.spinner("Cihazlar getiriliyor..."):
-        devices_res = get_cached_devices(api)
+        devices_state = DeviceService.get_devices(api)
+        device_index = DeviceService.get_device_index(api, devices_state.value)
+    devices_res = device_index.devices
+    render_freshness_hint(devices_state, "Cihaz listesi")
             
     if not devices_res:
         st.info("Yönetilen cihaz bulunamadı.")
         return
 
+    # State management for selected device
+    if 'selected_device_name' not in st.session_state:
+        st.session_state.selected_device_name = devices_res[0]['name']
+
+    # Son kullanilan ve yetkili cihazlarin VDOM/port verisini arka planda isit (oturum basina periyodik)
+    if time.time() - st.session_state.get('prefetch_seeded_at', 0) > PREFETCH_SEED_SECONDS:
+        st.session_state.prefetch_seeded_at = time.time()
+        user = AuthService.get_current_user()
+        recent = LogService.get_recent_devices(user.username, limit=prefetcher.MRU_LIMIT) if user else []
+        prefetcher.prefetch_devices(api, prefetcher.likely_next_devices(
+            devices_res, recent=recent, user=user, exclude=st.session_state.selected_device_name))
+
+    # Filtreleme Secenegi (Sidebar widget'lari fragment icinde olusturulamaz)
+    show_sub_ifaces = st.sidebar.checkbox("Sanal ve Alt Arayüzleri Göster (VLAN vb.)", value=False)
+
+    # Her bolum ayri fragment: etkilesim yalnizca ilgili bolumu yeniden calistirir
+    render_device_grid(api, device_index)
+
+    # Get active device object
+    target_device = next((d for d in devices_res if d['name'] == st.session_state.selected_device_name), None)
+    if not target_device: target_device = devices_res[0] # Fallback
+
+    st.divider()
+    render_port_panel(api, target_device, show_sub_ifaces)
+
+@st.fragment
+def render_device_grid(api, device_index):
+    """Cihaz arama, grid ve sayfalama. Sayfa degisimi yalnizca bu fragment'i yeniler."""
     # --- DEVICE SELECTION GRID ---
     st.markdown("### 🖥️ Yönetilen Cihazlar")
     
-    # Search Bar
-    search_query = st.text_input("🔍 Cihaz Ara (İsim, IP, Model)", "", placeholder="Örn: Ankara, 10.1.1.1, 60F").lower()
-    
-    filtered_devices = devices_res
-    if search_query:
-        filtered_devices = [
-            d for d in devices_res 
-            if search_query in d['name'].lower() 
-            or search_query in d.get('ip', '').lower()
-            or search_query in d.get('platform_str', '').lower()
-        ]
+    # Search Bar (onceden kurulmus indeks uzerinden; tam > onek > alt metin sirali)
+    search_query = st.text_input("🔍 Cihaz Ara (İsim, IP, Model, Açıklama, ADOM, Seri No)", "", placeholder="Örn: Ankara, 10.1.1.1, 60F")
+    filtered_devices = device_index.search(search_query)
         
     if not filtered_devices:
         st.warning("Arama kriterlerine uygun cihaz bulunamadı.")
-        # Eger cihaz yoksa asagiya devam etmemeli, ancak selected_device varsa belki gosterilebilir.
-        # Simdilik return ediyoruz.
         return
 
-    # State management for selected device
-    if 'selected_device_name' not in st.session_state:
-        st.session_state.selected_device_name = filtered_devices[0]['name'] if filtered_devices else None
-
     # --- PAGINATION ---
     ITEMS_PER_PAGE = 18
     if 'device_page' not in st.session_state: st.session_state.device_page = 0
@@ -283,76 +239,49 @@ def render_dashboard():
     end_idx = min(start_idx + ITEMS_PER_PAGE, total_items)
     
     paginated_devices = filtered_devices[start_idx:end_idx]
+    # Gorunen sayfadaki cihazlar bir sonraki secim adayi: arka planda isit
+    prefetcher.prefetch_devices(api, prefetcher.likely_next_devices(
+        paginated_devices, paginated_devices, exclude=st.session_state.selected_device_name))
 
     # Grid Layout: 3 columns
+    # Kart basina tek markdown + buton; markup (kayit, secili) bazinda cache'lenir
     cols = st.columns(3)
     for idx, d in enumerate(paginated_devices):
-        with cols[idx % 3]:
-            name = d['name']
-            ip = d.get('ip', '-')
-            platform = d.get('platform_str', 'FortiGate')
-            version = d.get('os_ver', '-')
-            conn_status = str(d.get('conn_status', '0'))
-            
-            status_color = "green" if conn_status == '1' else "red"
-            status_text = "BAĞLI" if conn_status == '1' else "KOPUK"
-            
-            # Highlight selected device
-            is_selected = st.session_state.selected_device_name == name
-            
-            # Icon selection
-            icon = "🔥" # Default
-            if "40F" in platform: icon = "⚡"
-            elif "60F" in platform: icon = "🚀"
-            elif "VM" in platform: icon = "☁️"
-
-            with st.container(border=True):
-                # Custom Card Header with Icon
-                st.markdown(f"""
-                    <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 10px;">
-                        <span style="font-size: 1.5rem;">{icon}</span>
-                        <h4 style="margin: 0; padding: 0;">{name}</h4>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                st.caption(f"📍 {ip}")
-                st.write(f"**Model:** {platform} (v{version})")
-                
-                # Inline Status
-                st.markdown(f":{status_color}[● {status_text}]")
-                
-                if st.button("Seç", key=f"sel_dev_{name}", use_container_width=True, type="primary" if is_selected else "secondary"):
-                    st.session_state.selected_device_name = name
-                    st.rerun()
+        name = d['name']
+        is_selected = st.session_state.selected_device_name == name
+        with cols[idx % 3].container(border=True):
+            st.markdown(UI.device_card_markup(d, is_selected), unsafe_allow_html=True)
+            if st.button("Seç", key=f"sel_dev_{name}", use_container_width=True, type="primary" if is_selected else "secondary"):
+                st.session_state.selected_device_name = name
+                # Port paneli de degisecegi icin tam rerun
+                st.rerun()
 
     # Pagination Controls
     if total_pages > 1:
         c_prev, c_info, c_next = st.columns([1, 4, 1])
         if c_prev.button("⬅️ Önceki", disabled=(st.session_state.device_page == 0)):
             st.session_state.device_page -= 1
-            st.rerun()
+            st.rerun(scope="fragment")
             
         c_info.markdown(f"<div style='text-align:center; padding-top:10px; color:gray;'>Sayfa {st.session_state.device_page + 1} / {total_pages} (Toplam: {total_items})</div>", unsafe_allow_html=True)
         
         if c_next.button("Sonraki ➡️", disabled=(st.session_state.device_page >= total_pages - 1)):
             st.session_state.device_page += 1
-            st.rerun()
+            st.rerun(scope="fragment")
 
-    # Get active device object
-    target_device = next((d for d in devices_res if d['name'] == st.session_state.selected_device_name), None)
-    if not target_device: target_device = devices_res[0] # Fallback
+@st.fragment
+def render_port_panel(api, target_device, show_sub_ifaces):
+    """VDOM secimi ve port listesi. VDOM degisimi cihaz grid'ini yeniden calistirmaz."""
     sel_dev = target_device['name']
     
     # Cihaz baglanti ve ADOM durumunu kontrol et
     is_dev_connected = str(target_device.get('conn_status', '0')) == '1'
     target_adom = target_device.get('adom', 'root')
 
-    st.divider()
-    
     # VDOM ve Arayüzler
     vdoms = ["root"]
     if sel_dev:
-        vdoms = get_cached_vdoms(api, sel_dev)
+        vdoms = DeviceService.get_vdoms(api, sel_dev).value
     
     col_vdom, col_spacer = st.columns([1, 2])
     with col_vdom:
@@ -370,13 +299,22 @@ def render_dashboard():
     if not is_dev_connected:
         st.error(f"❌ **{sel_dev}** cihazı şu anda FortiManager'a bağlı değil (Disconnected). Port işlemleri yapılamaz.")
 
-    st.subheader(f"🔌 Port Yönetimi: {sel_dev} [{sel_vdom}]")
-    
-    # Filtreleme Secenegi
-    show_sub_ifaces = st.sidebar.checkbox("Sanal ve Alt Arayüzleri Göster (VLAN vb.)", value=False)
-    
-    raw_interfaces = get_cached_interfaces(api, sel_dev, sel_vdom, target_adom)
+    c_title, c_live = st.columns([3, 1])
+    c_title.subheader(f"🔌 Port Yönetimi: {sel_dev} [{sel_vdom}]")
+    live = c_live.toggle("🔴 Canlı Durum", key="live_port_status",
+                         help="Port durumları arka planda periyodik okunur ve sayfa yenilenmeden güncellenir.")
     
+    can_edit = (dash_perm == 2) and is_dev_connected
+    if live:
+        interval = float(cfg.get("dashboard_settings", {}).get("live_interval", live_status.DEFAULT_INTERVAL))
+        st.fragment(render_live_port_list, run_every=max(live_status.MIN_INTERVAL, interval))(
+            api, user, sel_dev, sel_vdom, target_adom, show_sub_ifaces, can_edit, interval)
+    else:
+        interfaces_state = DeviceService.get_interfaces(api, sel_dev, sel_vdom, target_adom)
+        render_freshness_hint(interfaces_state, "Port durumları")
+        render_port_list(api, interfaces_state.value, user, sel_dev, sel_vdom, target_adom, show_sub_ifaces, can_edit)
+
+def render_port_list(api, raw_interfaces, user, sel_dev, sel_vdom, target_adom, show_sub_ifaces, can_edit):
     # Clean Code: Logic helper fonksiyonuna tasindi
     filtered_interfaces = filter_interfaces_for_display(raw_interfaces, user, sel_dev, show_sub_ifaces)
 
@@ -387,191 +325,315 @@ def render_dashboard():
             st.warning("Görüntülenecek port bulunamadı (Yetkiniz olmayabilir veya filtre kriterlerine uymuyor).")
         
     for iface in filtered_interfaces:
-            with st.container(border=True):
-                c1, c2, c3, c4 = st.columns([2, 2, 2, 1.5], gap="medium")
-                
-                # Column 1: Name and Type
-                itype = iface.get('type', 'physical')
-                c1.markdown(f"**{iface['name']}**")
-                c1.caption(f"🏷️ {str(itype).capitalize()}")
-                
-                # Column 2: IP Address
-                ip_val = iface.get('ip', '0.0.0.0 0.0.0.0')
-                if isinstance(ip_val, list) and ip_val: ip_val = ip_val[0]
-                c2.write("🌐 IP Adresi")
-                c2.code(ip_val, language="bash")
-                
-                # Column 3: Status Badges (OPTIMISTIC UI LOGIC)
-                
-                # 1. API'den gelen gercek durum
-                admin_stat = iface.get('status')
-                if admin_stat is None: admin_stat = iface.get('admin-status')
-                raw_stat = str(admin_stat if admin_stat is not None else 'down').lower()
-                is_up = raw_stat in ['1', 'up', 'enable', 'true']
-                
-                # 2. Optimistic Override (Gecici Gorsel Guncelleme)
-                opt_key = f"{sel_dev}_{sel_vdom}_{iface['name']}"
-                opt_data = st.session_state.get('optimistic_updates', {}).get(opt_key)
-                
-                is_optimistic = False
-                if opt_data and time.time() < opt_data['expire']:
-                    # Eger optimistic durum API ile ayniysa artik override etmeye gerek yok
-                    # (API yetismis demektir). Ancak garanti olsun diye sure bitene kadar tutabiliriz.
-                    # Bizim senaryoda API geciktigi icin override ediyoruz.
-                    target_state = (opt_data['status'] == 1)
-                    if is_up != target_state:
-                        is_up = target_state
-                        is_optimistic = True
-                
-                admin_cls = "status-up" if is_up else "status-down"
-                admin_lbl = "AÇIK" if is_up else "KAPALI"
+        render_interface_row(api, iface, sel_dev, sel_vdom, target_adom, can_edit)
+
+def _port_states(interfaces):
+    """{port: (admin, link)} - canli modda degisiklik tespiti icin."""
+    states = {}
+    for i in interfaces or []:
+        admin = i.get('status') if i.get('status') is not None else i.get('admin-status')
+        states[i.get('name')] = (str(admin).lower() in ['1', 'up', 'enable', 'true'],
+                                 None if i.get('link-status') is None else str(i.get('link-status')).lower() in ['1', 'up', 'true'])
+    return states
+
+def render_live_port_list(api, user, sel_dev, sel_vdom, target_adom, show_sub_ifaces, can_edit, interval):
+    """
+    Canli mod: port listesi run_every ile periyodik yeniden cizilir. Veri, ayni
+    (cihaz, vdom, adom) icin tum oturumlarin paylastigi arka plan poller'indan okunur.
+    """
+    key = (sel_dev, sel_vdom, target_adom)
+    poller = live_status.get_poller(key, functools.partial(DeviceService.refresh_interfaces, api, sel_dev, sel_vdom, target_adom), interval)
+    poller.wait_ready(timeout=5)
+    snap = poller.snapshot()
+
+    if snap.fetched_at:
+        tz = pytz.timezone(st.session_state.user_timezone)
+        updated = datetime.datetime.fromtimestamp(snap.fetched_at, tz).strftime("%H:%M:%S")
+        st.caption(f"🔴 Canlı • Son güncelleme: {updated} • Her {poller.interval:.0f} sn")
+    if snap.error:
+        st.caption(f"⚠️ Son okuma başarısız: {snap.error}")
+
+    # Onceki gorunume gore degisen portlari bildir
+    seen = st.session_state.setdefault('live_port_seen', {})
+    prev = seen.get(key)
+    if prev is None or prev[0] != snap.version:
+        states = _port_states(snap.data)
+        if prev is not None:
+            for name, (admin, link) in states.items():
+                old = prev[1].get(name)
+                if old is None: continue
+                if old[0] != admin:
+                    st.toast(f"{name}: {'AÇIK' if admin else 'KAPALI'}", icon="🔌")
+                if old[1] is not None and link is not None and old[1] != link:
+                    st.toast(f"{name}: LINK {'UP' if link else 'DOWN'}", icon="🔗")
+        seen[key] = (snap.version, states)
+
+    render_port_list(api, snap.data or [], user, sel_dev, sel_vdom, target_adom, show_sub_ifaces, can_edit)
+
+@st.fragment
+def render_interface_row(api, iface, sel_dev, sel_vdom, target_adom, can_edit):
+    """
+    Tek port satiri. Ac/Kapat yalnizca bu satiri yeniden calistirir; yeni durum
+    optimistic update ile gosterilir (fragment ilk cagridaki iface verisiyle yeniden calisir).
+    """
+    with st.container(border=True):
+        c1, c2, c3, c4 = st.columns([2, 2, 2, 1.5], gap="medium")
+        
+        # Column 1: Name and Type
+        itype = iface.get('type', 'physical')
+        c1.markdown(f"**{iface['name']}**")
+        c1.caption(f"🏷️ {str(itype).capitalize()}")
+        
+        # Column 2: IP Address
+        ip_val = iface.get('ip', '0.0.0.0 0.0.0.0')
+        if isinstance(ip_val, list) and ip_val: ip_val = ip_val[0]
+        c2.write("🌐 IP Adresi")
+        c2.code(ip_val, language="bash")
+        
+        # Column 3: Status Badges (OPTIMISTIC UI LOGIC)
+        
+        # 1. API'den gelen gercek durum
+        admin_stat = iface.get('status')
+        if admin_stat is None: admin_stat = iface.get('admin-status')
+        raw_stat = str(admin_stat if admin_stat is not None else 'down').lower()
+        is_up = raw_stat in ['1', 'up', 'enable', 'true']
+        
+        # 2. Optimistic Override (Gecici Gorsel Guncelleme)
+        opt_key = f"{sel_dev}_{sel_vdom}_{iface['name']}"
+        opt_data = st.session_state.get('optimistic_updates', {}).get(opt_key)
+        
+        is_optimistic = False
+        if opt_data and time.time() < opt_data['expire']:
+            # Eger optimistic durum API ile ayniysa artik override etmeye gerek yok
+            # (API yetismis demektir). Ancak garanti olsun diye sure bitene kadar tutabiliriz.
+            # Bizim senaryoda API geciktigi icin override ediyoruz.
+            target_state = (opt_data['status'] == 1)
+            if is_up != target_state:
+                is_up = target_state
+                is_optimistic = True
+        
+        admin_cls = "status-up" if is_up else "status-down"
+        admin_lbl = "AÇIK" if is_up else "KAPALI"
+        
+        # Link Status
+        link_stat = iface.get('link-status')
+        link_html = ""
+        if link_stat is not None:
+            is_link_up = str(link_stat).lower() in ['1', 'up', 'true']
+            # Link status override edilmez, fiziksel durumdur.
+            link_cls = "status-up" if is_link_up else "status-down"
+            link_lbl = "LINK: UP" if is_link_up else "LINK: DOWN"
+            link_html = f'<div class="status-badge {link_cls}" style="margin-top:5px;">{link_lbl}</div>'
+        
+        c3.markdown(f"""
+            <div class="status-badge {admin_cls}">{admin_lbl}</div>
+            {link_html}
+        """, unsafe_allow_html=True)
+        
+        # Column 4: Action Button
+        btn_lbl, btn_type, target = ("Kapat", "secondary", "down") if is_up else ("Aç", "primary", "up")
+        btn_key = f"{sel_dev}_{sel_vdom}_{iface['name']}"
+        
+        if c4.button(btn_lbl, key=btn_key, type=btn_type, use_container_width=True, disabled=not can_edit):
+            with st.spinner("İşleniyor..."):
+                # Global ayarı oku (db_update veya direct_proxy)
+                g_cfg = st.session_state.saved_config
+                global_method = g_cfg.get("toggle_method", "db_update")
+                use_script_method = (global_method == "direct_proxy")
                 
-                # Link Status
-                link_stat = iface.get('link-status')
-                link_html = ""
-                if link_stat is not None:
-                    is_link_up = str(link_stat).lower() in ['1', 'up', 'true']
-                    # Link status override edilmez, fiziksel durumdur.
-                    link_cls = "status-up" if is_link_up else "status-down"
-                    link_lbl = "LINK: UP" if is_link_up else "LINK: DOWN"
-                    link_html = f'<div class="status-badge {link_cls}" style="margin-top:5px;">{link_lbl}</div>'
+                success, msg = api.toggle_interface(sel_dev, iface['name'], target, vdom=sel_vdom, adom=target_adom, use_script=use_script_method)
                 
-                c3.markdown(f"""
-                    <div class="status-badge {admin_cls}">{admin_lbl}</div>
-                    {link_html}
-                """, unsafe_allow_html=True)
+                user_name = AuthService.get_current_user().username
+                LogService.log_action(user_name, f"Port {target.upper()}", f"{sel_dev}[{sel_vdom}]", msg)
                 
-                # Column 4: Action Button
-                btn_lbl, btn_type, target = ("Kapat", "secondary", "down") if is_up else ("Aç", "primary", "up")
-                can_edit = (dash_perm == 2) and is_dev_connected
-                btn_key = f"{sel_dev}_{sel_vdom}_{iface['name']}"
+                # Cache temizle (Initial); canli modda poller hemen yeniden okusun
+                DeviceService.invalidate_interfaces(api, sel_dev, sel_vdom, target_adom)
+                live_status.request_refresh((sel_dev, sel_vdom, target_adom))
                 
-                if c4.button(btn_lbl, key=btn_key, type=btn_type, use_container_width=True, disabled=not can_edit):
-                    with st.spinner("İşleniyor..."):
-                        # Global ayarı oku (db_update veya direct_proxy)
-                        g_cfg = st.session_state.saved_config
-                        global_method = g_cfg.get("toggle_method", "db_update")
-                        use_script_method = (global_method == "direct_proxy")
-                        
-                        success, msg = api.toggle_interface(sel_dev, iface['name'], target, vdom=sel_vdom, adom=target_adom, use_script=use_script_method)
-                        
-                        user_name = AuthService.get_current_user().username
-                        LogService.log_action(user_name, f"Port {target.upper()}", f"{sel_dev}[{sel_vdom}]", msg)
-                        
-                        # Cache temizle (Initial)
-                        get_cached_interfaces.clear()
+                if success:
+                    # OPTIMISTIC UPDATE SET
+                    st.session_state.optimistic_updates[opt_key] = {
+                        "status": 1 if target == "up" else 0,
+                        "expire": time.time() + 20 # 20 saniye boyunca bu durumu goster
+                    }
+                    
+                    if "Task:" in msg:
+                        # Task ID'yi al; takip bu satirin altinda ayri bir fragment'ta yapilir
+                        tid = msg.split("Task:")[1].strip().replace(")", "")
+                        st.session_state.tracked_tasks[opt_key] = {
+                            "task_id": tid, "device": sel_dev, "vdom": sel_vdom, "adom": target_adom,
+                            "interface": iface['name'], "target": target, "result": None
+                        }
+                        st.rerun(scope="fragment")
+                    elif use_script_method and ("Direct Update Success" in msg or "Proxy" in msg):
+                        # Proxy/Direct modu icin ozel mesaj
+                        st.success("⚡ Doğrudan komut cihaz üzerine başarıyla gönderildi.")
                         
-                        if success:
-                            # OPTIMISTIC UPDATE SET
-                            st.session_state.optimistic_updates[opt_key] = {
-                                "status": 1 if target == "up" else 0,
-                                "expire": time.time() + 20 # 20 saniye boyunca bu durumu goster
-                            }
-                            
-                            if "Task:" in msg:
-                                # Task ID'yi al ve dogrulama bilgilerini gonder
-                                tid = msg.split("Task:")[1].strip().replace(")", "")
-                                track_task(api, tid, device_name=sel_dev, vdom=sel_vdom, interface_name=iface['name'], target_status=target, adom=target_adom)
-                            elif use_script_method and ("Direct Update Success" in msg or "Proxy" in msg):
-                                # Proxy/Direct modu icin ozel mesaj
-                                st.success("⚡ Doğrudan komut cihaz üzerine başarıyla gönderildi.")
-                                
-                                # AGGRESSIVE CACHE CLEAR
-                                get_cached_interfaces.clear()
-                                # st.cache_data.clear() # Tum app cache'ini silmek performansi etkiler ama gerekirse acilabilir
-                                
-                                time.sleep(1) # Hissedilir bir islem suresi birak, sonra hemen yenile
-                                st.rerun()
-                            else:
-                                st.toast("Başarılı", icon="✅")
-                                get_cached_interfaces.clear()
-                                time.sleep(1); st.rerun()
-                        else:
-                            st.error(f"İşlem Başarısız! \nDetay: {msg}")
-                
+                        time.sleep(1) # Hissedilir bir islem suresi birak, sonra satiri yenile
+                        st.rerun(scope="fragment")
+                    else:
+                        st.toast("Başarılı", icon="✅")
+                        time.sleep(1); st.rerun(scope="fragment")
+                else:
+                    st.error(f"İşlem Başarısız! \nDetay: {msg}")
+
+        if opt_key in st.session_state.tracked_tasks:
+            render_task_tracker(api, opt_key)
+
+def render_task_tracker(api, task_key):
+    """Task bitene kadar yalnizca takip fragment'i periyodik calisir; sayfa bloklanmaz."""
+    task = st.session_state.tracked_tasks.get(task_key)
+    if not task: return
+    st.fragment(_track_task, run_every=None if task.get("result") else TASK_POLL_SECONDS)(api, task_key)
+
+def _track_task(api, task_key):
+    task = st.session_state.tracked_tasks.get(task_key)
+    if not task: return
+
+    if not task.get("result"):
+        status = api.check_task_status(task["task_id"])
+        if not status:
+            task["result"] = {"level": "error", "message": "Task durumu alınamadı.", "log": None}
+        else:
+            pct = int(status.get("percent", 0))
+            state = str(status.get("state", "processing")).lower()
+            if pct >= 100 or state in ["done", "completed", "failed", "error"]:
+                task["result"] = _finish_task(api, task, status, state)
+            else:
+                st.progress(pct, f"İlerleme: %{pct} ({state.upper()})")
+                return
+        # Is bittiyse tam rerun ile periyodik yenilemeyi durdur (port listesi de guncellenir)
+        DeviceService.invalidate_interfaces(api, task["device"], task["vdom"], task["adom"])
+        st.rerun()
 
-def track_task(api, task_id, device_name=None, vdom=None, interface_name=None, target_status=None, adom="root"):
-    p_bar = st.progress(0, "Başlatılıyor...")
-    status_text = st.empty()
+    result = task["result"]
+    getattr(st, result["level"])(result["message"])
+    if result.get("log") is not None:
+        with st.expander("İşlem Detayları (Log)", expanded=True):
+            st.code(result["log"])
+
+    if st.button("Listeyi Güncelle & Kapat", key=f"close_task_{task_key}", type="primary"):
+        st.session_state.tracked_tasks.pop(task_key, None)
+        DeviceService.invalidate_interfaces(api, task["device"], task["vdom"], task["adom"])
+        st.rerun()
+
+def _finish_task(api, task, status, state):
+    """Biten task'in loglarini toplar ve port durumunu dogrular."""
+    # Task loglarini detayli al
+    lines = status.get("line", [])
+    log_content = []
+    if isinstance(lines, list):
+        for l in lines:
+            if isinstance(l, dict):
+                log_content.append(l.get("detail", str(l)))
+            else:
+                log_content.append(str(l))
+    
+    log_text = "\n".join(log_content) if log_content else "Detay bulunamadı."
     
-    while True:
-        status = api.check_task_status(task_id)
-        if not status: 
-            status_text.error("Task durumu alınamadı.")
-            break
+    if state in ["failed", "error"]: 
+        return {"level": "error", "message": f"❌ Task Başarısız! \n{log_text}", "log": None}
+
+    result = {"level": "success", "message": "✅ İşlem Kuyruğu Tamamlandı.", "log": log_text}
+    device_name, interface_name, vdom, adom = task["device"], task["interface"], task["vdom"], task["adom"]
+    
+    # --- FINAL VERIFICATION ---
+    if device_name and interface_name:
+        time.sleep(3) # FMG sync icin bekleme
+        try:
+            fresh_ifaces = []
+            # 1. Realtime Dene
+            rt_data = api.get_interfaces_realtime(device_name, vdom=vdom, adom=adom)
+            if isinstance(rt_data, list):
+                fresh_ifaces = rt_data
             
-        pct = int(status.get("percent", 0))
-        state = str(status.get("state", "processing")).lower()
-        
-        p_bar.progress(pct, f"İlerleme: %{pct} ({state.upper()})")
-        
-        if pct >= 100 or state in ["done", "completed", "failed", "error"]:
-            # Task loglarini detayli al
-            lines = status.get("line", [])
-            log_content = []
-            if isinstance(lines, list):
-                for l in lines:
-                    if isinstance(l, dict):
-                        log_content.append(l.get("detail", str(l)))
-                    else:
-                        log_content.append(str(l))
+            # 2. DB Dene (Eger Realtime bos veya hataliysa)
+            if not fresh_ifaces:
+                db_data = api.get_interfaces(device_name, vdom=vdom, adom=adom)
+                if isinstance(db_data, list):
+                    fresh_ifaces = db_data
             
-            log_text = "\n".join(log_content) if log_content else "Detay bulunamadı."
+            target_iface = None
+            for i in fresh_ifaces:
+                if isinstance(i, dict) and i.get('name') == interface_name:
+                    target_iface = i
+                    break
             
-            if state in ["failed", "error"]: 
-                status_text.error(f"❌ Task Başarısız! \n{log_text}")
-                time.sleep(5)
-            else: 
-                status_text.success("✅ İşlem Kuyruğu Tamamlandı. Durum doğrulanıyor...")
-                
-                # --- FINAL VERIFICATION ---
-                if device_name and interface_name:
-                    time.sleep(3) # FMG sync icin bekleme
-                    try:
-                        fresh_ifaces = []
-                        # 1. Realtime Dene
-                        rt_data = api.get_interfaces_realtime(device_name, vdom=vdom, adom=adom)
-                        if isinstance(rt_data, list):
-                            fresh_ifaces = rt_data
-                        
-                        # 2. DB Dene (Eger Realtime bos veya hataliysa)
-                        if not fresh_ifaces:
-                            db_data = api.get_interfaces(device_name, vdom=vdom, adom=adom)
-                            if isinstance(db_data, list):
-                                fresh_ifaces = db_data
-                        
-                        target_iface = None
-                        for i in fresh_ifaces:
-                            if isinstance(i, dict) and i.get('name') == interface_name:
-                                target_iface = i
-                                break
-                        
-                        if target_iface:
-                            admin_stat = target_iface.get('status')
-                            if admin_stat is None: admin_stat = target_iface.get('admin-status')
-                            is_now_up = str(admin_stat).lower() in ['1', 'up', 'enable', 'true']
-                            
-                            current_label = "UP" if is_now_up else "DOWN"
-                            
-                            if (target_status == "up" and is_now_up) or (target_status == "down" and not is_now_up):
-                                status_text.success(f"🎯 DOĞRULAMA BAŞARILI: Port şu an fiziksel olarak **{current_label}** durumunda.")
-                            else:
-                                status_text.warning(f"⚠️ DOĞRULAMA: İşlem bitti ancak port henüz **{current_label}** görünüyor (Gecikme olabilir).")
-                        else:
-                            # Sessiz gec
-                            pass
-                    except Exception as e:
-                        # Logla ama UI'da hata gosterme
-                        print(f"Verification Logic Error: {e}")
+            if target_iface:
+                admin_stat = target_iface.get('status')
+                if admin_stat is None: admin_stat = target_iface.get('admin-status')
+                is_now_up = str(admin_stat).lower() in ['1', 'up', 'enable', 'true']
                 
-                with st.expander("İşlem Detayları (Log)", expanded=True):
-                    st.code(log_text)
+                current_label = "UP" if is_now_up else "DOWN"
+                target_status = task["target"]
                 
-            break
-        time.sleep(2)
-    
-    if st.button("Listeyi Güncelle & Kapat", type="primary"):
-        st.rerun()
+                if (target_status == "up" and is_now_up) or (target_status == "down" and not is_now_up):
+                    result.update(message=f"🎯 DOĞRULAMA BAŞARILI: Port şu an fiziksel olarak **{current_label}** durumunda.")
+                else:
+                    result.update(level="warning", message=f"⚠️ DOĞRULAMA: İşlem bitti ancak port henüz **{current_label}** görünüyor (Gecikme olabilir).")
+        except Exception as e:
+            # Logla ama UI'da hata gosterme
+            print(f"Verification Logic Error: {e}")
+    return result
+
+def render_fleet_status():
+    st.header("🗺️ Filo Port Durumu")
+
+    if not st.session_state.fmg_connected:
+        st.warning("⚠️ FortiManager bağlantısı yok. Lütfen 'FMG Bağlantısı' menüsünden bağlanın.")
+        return
+
+    api = st.session_state.api
+    c_info, c_refresh = st.columns([4, 1])
+    if c_refresh.button("🔄 Yenile", use_container_width=True):
+        FleetStatusService.invalidate(api)
+
+    with st.spinner("Tüm cihazların port durumları toplanıyor..."):
+        snap_state = FleetStatusService.get_snapshot(api)
+    snap = snap_state.value
+    tz = pytz.timezone(st.session_state.user_timezone)
+    collected = datetime.datetime.fromtimestamp(snap.collected_at, tz).strftime("%H:%M:%S")
+    c_info.caption(f"🕒 {collected} itibarıyla • {snap.table['device'].nunique()} cihaz, {snap.duration:.1f} sn")
+    render_freshness_hint(snap_state, "Filo görünümü")
+
+    if snap.errors:
+        with st.expander(f"⚠️ {len(snap.errors)} cihazdan port bilgisi alınamadı"):
+            st.dataframe(pd.DataFrame(list(snap.errors.items()), columns=["Cihaz", "Hata"]), hide_index=True, use_container_width=True)
+
+    # Yetki: yalnizca kullanicinin gorebilecegi portlar
+    table = FleetStatusService.visible(snap.table, AuthService.get_current_user())
+    if table.empty:
+        st.info("Görüntülenecek port bulunamadı (Yetkiniz olmayabilir).")
+        return
+
+    f1, f2, f3 = st.columns([2, 2, 1])
+    sel_adoms = f1.multiselect("ADOM", sorted(table['adom'].unique()))
+    sel_models = f2.multiselect("Model", sorted(table['model'].unique()))
+    only_down = f3.checkbox("Yalnızca sorunlu cihazlar", help="Link veya admin down portu olan cihazlar")
+    if sel_adoms: table = table[table['adom'].isin(sel_adoms)]
+    if sel_models: table = table[table['model'].isin(sel_models)]
+    if only_down:
+        problem = table.loc[table['state'].isin([STATE_LINK_DOWN, STATE_ADMIN_DOWN]), 'device'].unique()
+        table = table[table['device'].isin(problem)]
+    if table.empty:
+        st.info("Filtre kriterlerine uygun port bulunamadı.")
+        return
+
+    counts = table['state'].value_counts()
+    m = st.columns(len(STATE_LABELS) + 1)
+    m[0].metric("Toplam Port", len(table))
+    for col, (code, label) in zip(m[1:], STATE_LABELS.items()):
+        col.metric(label, int(counts.get(code, 0)))
+
+    st.caption("🟢 Up • 🔴 Link Down • ⚫ Admin Down • ⚪ Bilinmiyor")
+    matrix = FleetStatusService.symbol_matrix(FleetStatusService.status_matrix(table))
+    st.dataframe(matrix, use_container_width=True, height=min(600, 38 + 35 * len(matrix)))
+
+    tab_adom, tab_model = st.tabs(["ADOM Özeti", "Model Özeti"])
+    with tab_adom:
+        st.dataframe(FleetStatusService.summarize(table, "adom"), hide_index=True, use_container_width=True)
+    with tab_model:
+        st.dataframe(FleetStatusService.summarize(table, "model"), hide_index=True, use_container_width=True)
 
 def render_fmg_connection():
     st.header("🔗 FortiManager Bağlantısı")
@@ -586,6 +648,7 @@ def render_fmg_connection():
         st.success(f"✅ Bağlı: **{st.session_state.fmg_ip}**")
         if st.button("Bağlantıyı Kes", type="secondary", disabled=not can_edit):
             if st.session_state.api: st.session_state.api.logout()
+            DeviceService.clear()
             st.session_state.fmg_connected = False
             st.session_state.api = None
             st.session_state.devices = []
@@ -614,18 +677,97 @@ def render_fmg_connection():
                 else:
                     st.error("Bağlantı başarısız.")
 
+LOG_PAGE_SIZES = [25, 50, 100, 250]
+LOG_TIME_RANGES = ["Tümü", "Son 24 Saat", "Son 7 Gün", "Son 30 Gün", "Özel Aralık"]
+
+def _log_time_bounds(choice):
+    """Zaman filtresi secimini (start, end) metinlerine cevirir (kullanici timezone'unda)."""
+    try:
+        tz = pytz.timezone(st.session_state.get('user_timezone', 'Europe/Istanbul'))
+    except Exception:
+        tz = pytz.utc
+    now = datetime.datetime.now(tz)
+    fmt = "%Y-%m-%d %H:%M:%S"
+    if choice == "Son 24 Saat":
+        return (now - datetime.timedelta(days=1)).strftime(fmt), None
+    if choice == "Son 7 Gün":
+        return (now - datetime.timedelta(days=7)).strftime(fmt), None
+    if choice == "Son 30 Gün":
+        return (now - datetime.timedelta(days=30)).strftime(fmt), None
+    if choice == "Özel Aralık":
+        rng = st.date_input("Tarih Aralığı", value=(now.date() - datetime.timedelta(days=7), now.date()), key="log_date_range")
+        if isinstance(rng, (list, tuple)) and len(rng) == 2:
+            # Bitis gunu dahil
+            return rng[0].strftime("%Y-%m-%d"), (rng[1] + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+    return None, None
+
 def render_logs():
     st.header("Audit Logs")
     # Anti-cache: Her renderda taze veri oku
     if st.button("🔄 Logları Yenile"):
         st.rerun()
-        
-    df = LogService.get_logs()
-    if not df.empty:
-        df = df.sort_values(by="Timestamp", ascending=False)
-        st.dataframe(df, use_container_width=True, hide_index=True)
-        st.download_button("Logları İndir (CSV)", df.to_csv(index=False).encode('utf-8'), 'audit_logs.csv', 'text/csv')
-    else: st.info("Kayıt yok.")
+
+    # --- FILTRELER (Sorgu audit store'da calisir, tarayiciya yalnizca sayfa gider) ---
+    options = LogService.get_log_filter_options()
+    c_time, c_user, c_action, c_device = st.columns(4)
+    time_choice = c_time.selectbox("Zaman", LOG_TIME_RANGES, key="log_time_choice")
+    f_user = c_user.selectbox("Kullanıcı", ["Tümü"] + options["user"], key="log_f_user")
+    f_action = c_action.selectbox("İşlem", ["Tümü"] + options["action"], key="log_f_action")
+    f_device = c_device.selectbox("Cihaz", ["Tümü"] + options["device"], key="log_f_device")
+
+    c_text, c_size = st.columns([4, 1])
+    f_text = c_text.text_input("Metin Ara", placeholder="Detay, kullanıcı, işlem veya cihaz içinde ara...", key="log_f_text")
+    page_size = c_size.selectbox("Sayfa Boyutu", LOG_PAGE_SIZES, index=1, key="log_page_size")
+
+    start, end = _log_time_bounds(time_choice)
+    filters = {
+        "start": start, "end": end,
+        "user": None if f_user == "Tümü" else f_user,
+        "action": None if f_action == "Tümü" else f_action,
+        "device": None if f_device == "Tümü" else f_device,
+        "text": f_text.strip() or None
+    }
+
+    # Filtre degisirse ilk sayfaya don
+    signature = (time_choice, f_user, f_action, f_device, f_text, page_size)
+    if st.session_state.get('log_filter_sig') != signature:
+        st.session_state.log_filter_sig = signature
+        st.session_state.log_page = 0
+
+    total = LogService.count_logs(**filters)
+    if total == 0:
+        st.info("Kayıt yok.")
+        return
+
+    total_pages = max(1, (total + page_size - 1) // page_size)
+    if st.session_state.get('log_page', 0) >= total_pages: st.session_state.log_page = 0
+    page = st.session_state.get('log_page', 0)
+
+    df = LogService.get_logs(limit=page_size, offset=page * page_size, **filters)
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    c_prev, c_info, c_next = st.columns([1, 4, 1])
+    if c_prev.button("⬅️ Önceki", disabled=(page == 0), key="log_prev"):
+        st.session_state.log_page -= 1
+        st.rerun()
+    c_info.markdown(f"<div style='text-align:center; padding-top:10px; color:gray;'>Sayfa {page + 1} / {total_pages} (Toplam: {total})</div>", unsafe_allow_html=True)
+    if c_next.button("Sonraki ➡️", disabled=(page >= total_pages - 1), key="log_next"):
+        st.session_state.log_page += 1
+        st.rerun()
+
+    # Filtrelenmis sonuc: tiklaninca store'dan parca parca gzip'li olarak uretilir (satir sinirli)
+    c_fmt, c_dl = st.columns([2, 3])
+    export_fmt = c_fmt.radio("Format", ["csv", "jsonl"], horizontal=True, key="log_export_fmt",
+                             format_func=lambda f: "CSV" if f == "csv" else "JSON Lines")
+    export_rows = min(total, EXPORT_MAX_ROWS)
+    file_name = f"audit_logs_{datetime.datetime.now().strftime('%Y%m%d_%H%M')}.{export_fmt}.gz"
+    c_dl.download_button(
+        f"Logları İndir ({export_rows} kayıt, gzip)",
+        functools.partial(LogService.build_log_export, export_fmt, **filters),
+        file_name, "application/gzip", on_click="ignore"
+    )
+    if total > EXPORT_MAX_ROWS:
+        c_dl.caption(f"İndirme ilk {EXPORT_MAX_ROWS} kayıtla sınırlıdır; daha fazlası için tarih aralığını daraltın.")
 
 def render_guide():
     st.header("📚 Kullanım Kılavuzu")
@@ -652,6 +794,7 @@ def render_guide():
     *   **Port Yetkilendirme:** 
         *   **Global Yetkiler:** Kullanıcının tüm cihazlarda görebileceği ortak portlar.
         *   **Cihaz Bazlı Yetkiler:** Belirli bir cihaz için özel port izinleri.
+        *   **Desen Kuralları:** `port{1-48}` (aralık), `vlan*` (wildcard) ve `@Grup` (cihaz grubu kapsamı) desteklenir.
     *   **E-posta Bildirimleri:** İşlem yapıldığında otomatik e-posta gönderimi ayarları.
     *   **LDAP:** Active Directory entegrasyon ayarları.
 
@@ -667,6 +810,7 @@ def main():
         UI.set_bg_image("MFA Background/Background_B.jpg")
         page = UI.sidebar_menu()
         if page == "Dashboard": render_dashboard()
+        elif page == "Filo Port Durumu": render_fleet_status()
         elif page == "FMG Bağlantısı": render_fmg_connection()
         elif page == "Ayarlar": render_settings()
         elif page == "Audit Logs": render_logs()
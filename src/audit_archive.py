@@ -0,0 +1,184 @@
+import os
+import shutil
+import logging
+import datetime
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from typing import List, Optional
+from audit_store import AuditStore
+
+logger = logging.getLogger(__name__)
+
+# Data directory for OpenShift persistence
+DATA_DIR = "data"
+ARCHIVE_DIR = os.path.join(DATA_DIR, "audit_archive")
+
+# Tipli kolonlar; user/action/device dusuk kardinaliteli oldugu icin dictionary encoded
+ARCHIVE_SCHEMA = pa.schema([
+    ("ts", pa.timestamp("s")),
+    ("user", pa.dictionary(pa.int32(), pa.string())),
+    ("action", pa.dictionary(pa.int32(), pa.string())),
+    ("device", pa.dictionary(pa.int32(), pa.string())),
+    ("details", pa.string()),
+])
+ARCHIVE_COLUMNS = [f.name for f in ARCHIVE_SCHEMA]
+_PARTITIONING = ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive")
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _month_start(value: str) -> datetime.date:
+    return datetime.date(int(value[:4]), int(value[5:7]), 1)
+
+
+def _next_month(d: datetime.date) -> datetime.date:
+    return datetime.date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+
+class AuditArchive:
+    """
+    Yaslanmis audit kayitlarinin aylik bolumlenmis (month=YYYY-MM) Parquet arsivi.
+
+    Tamamlanmis her ay bir kez yazilir. Sorgularda ay bolumleri ve
+    kolon/satir-grubu istatistikleri sayesinde yalnizca gereken dosya ve
+    kolonlar okunur.
+    """
+
+    def __init__(self, directory: str = ARCHIVE_DIR, row_group_size: int = 50000):
+        self.directory = directory
+        self.row_group_size = row_group_size
+        self._lock = threading.Lock()
+
+    def _partition_dir(self, month: str) -> str:
+        return os.path.join(self.directory, f"month={month}")
+
+    def archived_months(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(n.split("=", 1)[1] for n in os.listdir(self.directory)
+                      if n.startswith("month=") and ".tmp" not in n)
+
+    @staticmethod
+    def _to_table(rows) -> pa.Table:
+        cols = list(zip(*rows)) if rows else [()] * 5
+        ts = pd.to_datetime(pd.Series(cols[0], dtype=object), format=_TS_FORMAT, errors="coerce")
+        return pa.table({
+            "ts": pa.array(ts, type=pa.timestamp("s"), from_pandas=True),
+            "user": pa.array(cols[1], type=pa.string()).dictionary_encode(),
+            "action": pa.array(cols[2], type=pa.string()).dictionary_encode(),
+            "device": pa.array(cols[3], type=pa.string()).dictionary_encode(),
+            "details": pa.array(cols[4], type=pa.string()),
+        }, schema=ARCHIVE_SCHEMA)
+
+    def compact(self, store: AuditStore, older_than_days: int = 90) -> List[str]:
+        """
+        Tamamen `older_than_days`'ten eski olan ve henuz arsivlenmemis aylari Parquet'e yazar.
+        Yazilan ay listesini doner. Ay dizini once .tmp olarak yazilip atomik olarak tasinir.
+        """
+        with self._lock:
+            first = store.min_timestamp()
+            if not first:
+                return []
+            cutoff = _month_start((datetime.datetime.now() - datetime.timedelta(days=older_than_days)).strftime(_TS_FORMAT))
+            done = set(self.archived_months())
+            written = []
+
+            month = _month_start(first)
+            while month < cutoff:
+                key = month.strftime("%Y-%m")
+                nxt = _next_month(month)
+                if key not in done:
+                    count = self._write_month(store, key, month.strftime("%Y-%m-%d"), nxt.strftime("%Y-%m-%d"))
+                    if count:
+                        written.append(key)
+                        logger.info(f"Audit Archive: {count} row(s) archived for {key}.")
+                month = nxt
+            return written
+
+    def _write_month(self, store: AuditStore, key: str, start: str, end: str) -> int:
+        # Replikalar ayni ayi ayni anda yazabilir; her process kendi tmp dizinini kullanir
+        tmp_dir = f"{self._partition_dir(key)}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir, exist_ok=True)
+        count = 0
+        writer = None
+        try:
+            for rows in store.iter_rows(batch_size=self.row_group_size, ascending=True, start=start, end=end):
+                if writer is None:
+                    writer = pq.ParquetWriter(os.path.join(tmp_dir, "part-0.parquet"), ARCHIVE_SCHEMA,
+                                              compression="zstd", use_dictionary=["user", "action", "device"])
+                writer.write_table(self._to_table(rows), row_group_size=self.row_group_size)
+                count += len(rows)
+        finally:
+            if writer is not None:
+                writer.close()
+        if count:
+            try:
+                os.replace(tmp_dir, self._partition_dir(key))
+            except OSError:
+                # Baska bir replika once tamamladi
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                return 0
+        else:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return count
+
+    def _dataset(self) -> Optional[ds.Dataset]:
+        if not self.archived_months():
+            return None
+        return ds.dataset(self.directory, format="parquet", partitioning=_PARTITIONING,
+                          exclude_invalid_files=True, ignore_prefixes=[".", "_"])
+
+    @staticmethod
+    def _filter(start: Optional[str], end: Optional[str], user: Optional[str],
+                action: Optional[str], device: Optional[str]):
+        expr = None
+
+        def _and(e):
+            return e if expr is None else expr & e
+
+        # Ay bolumu uzerinden partition pruning + ts uzerinden satir grubu eleme
+        if start:
+            expr = _and(ds.field("month") >= start[:7])
+            expr = _and(ds.field("ts") >= pa.scalar(pd.Timestamp(start).to_pydatetime(), type=pa.timestamp("s")))
+        if end:
+            end_ts = pd.Timestamp(end)
+            # end haric: tam ay basindaki bir bitis o ayi kapsamaz
+            expr = _and(ds.field("month") <= (end_ts - pd.Timedelta(seconds=1)).strftime("%Y-%m"))
+            expr = _and(ds.field("ts") < pa.scalar(end_ts.to_pydatetime(), type=pa.timestamp("s")))
+        for col, value in (("user", user), ("action", action), ("device", device)):
+            if value:
+                expr = _and(ds.field(col) == value)
+        return expr
+
+    def scan(self, columns: Optional[List[str]] = None, start: Optional[str] = None, end: Optional[str] = None,
+             user: Optional[str] = None, action: Optional[str] = None, device: Optional[str] = None) -> pa.Table:
+        """Filtre (predicate) ve kolon secimi (projection) dosya seviyesine indirilerek okunur."""
+        columns = columns or ARCHIVE_COLUMNS + ["month"]
+        dataset = self._dataset()
+        if dataset is None:
+            return pa.table({c: pa.array([], type=ARCHIVE_SCHEMA.field(c).type if c in ARCHIVE_COLUMNS else pa.string())
+                             for c in columns})
+        return dataset.to_table(columns=columns, filter=self._filter(start, end, user, action, device))
+
+    def query(self, columns: Optional[List[str]] = None, **filters) -> pd.DataFrame:
+        """scan() sonucunu DataFrame olarak doner (dictionary kolonlar category olur)."""
+        return self.scan(columns, **filters).to_pandas()
+
+    def count_by(self, group_by: List[str], **filters) -> pd.DataFrame:
+        """
+        Gruplu sayim. Orn: count_by(["month", "device"], action="Port DOWN")
+        -> cihaz bazinda aylik port kapatma sayilari. Yalnizca gruplama kolonlari okunur.
+        """
+        table = self.scan(list(group_by), **filters)
+        if table.num_rows == 0:
+            return pd.DataFrame(columns=list(group_by) + ["count"])
+        # Dictionary kolonlar gruplama icin duz string'e cevrilir
+        table = pa.table({c: (pc.cast(table[c], pa.string()) if pa.types.is_dictionary(table[c].type) else table[c])
+                          for c in group_by})
+        result = table.group_by(list(group_by)).aggregate([([], "count_all")]).to_pandas()
+        result = result.rename(columns={"count_all": "count"})[list(group_by) + ["count"]]
+        return result.sort_values(list(group_by)).reset_index(drop=True)
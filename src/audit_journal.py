@@ -0,0 +1,383 @@
+import os
+import io
+import re
+import csv
+import gzip
+import mmap
+import time
+import logging
+import threading
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Data directory for OpenShift persistence
+DATA_DIR = "data"
+JOURNAL_DIR = os.path.join(DATA_DIR, "audit")
+
+LOG_COLUMNS = ["Timestamp", "User", "Action", "Device", "Details"]
+
+# Sidecar indeks kaydi: blok baslangic offseti, blok uzunlugu, bloktaki min/max zaman.
+# Zaman YYYYMMDDHHMMSS tamsayisi olarak tutulur (kayitlar farkli timezone'larla
+# yazilabildigi icin sirali olmayabilir; bu yuzden blok basina min/max saklanir).
+IDX_DTYPE = np.dtype([("offset", "<i8"), ("length", "<i8"), ("min_ts", "<i8"), ("max_ts", "<i8")])
+
+_SEGMENT_RE = re.compile(r"^audit-(\d{8})-(\d+)\.csv(\.gz)?$")
+_NON_DIGIT = re.compile(r"\D")
+
+
+def ts_key(value: Optional[str]) -> int:
+    """'2026-03-02 10:00:00' -> 20260302100000. Eksik kisimlar sifirla tamamlanir."""
+    digits = _NON_DIGIT.sub("", str(value or ""))[:14]
+    return int(digits.ljust(14, "0")) if digits else 0
+
+
+class _Segment:
+    def __init__(self, seq: int, created: int, compressed: bool, directory: str):
+        self.seq = seq
+        self.created = created
+        self.compressed = compressed
+        base = os.path.join(directory, f"audit-{seq:08d}-{created}")
+        self.path = base + (".csv.gz" if compressed else ".csv")
+        self.idx_path = base + (".gz.idx" if compressed else ".idx")
+
+
+class AuditJournal:
+    """
+    Boyut veya zaman ile donen (rotate), append-only CSV audit segmentleri.
+
+    - Aktif segment duz CSV'dir; her `block_rows` satirda bir blok kapanir ve
+      sidecar .idx dosyasina (offset, uzunluk, min_ts, max_ts) eklenir.
+    - Kapanan segment, her blok ayri bir gzip member'i olacak sekilde
+      sikistirilir; boylece sikistirilmis dosyada da bloklara dogrudan seek
+      yapilabilir (dosya yine standart gzip/zcat ile okunabilir).
+    - Okuyucular .idx dosyalarini mmap ile acar ve yalnizca istenen zaman
+      araligiyla kesisen segment/bloklari okur.
+    - Saklama politikasi: retention_days ve toplam boyut limiti.
+    """
+
+    def __init__(self, directory: str = JOURNAL_DIR, max_segment_bytes: int = 64 * 1024 * 1024,
+                 rotate_interval: float = 24 * 3600, block_rows: int = 1000,
+                 retention_days: int = 365, max_total_bytes: int = 2 * 1024 * 1024 * 1024):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.rotate_interval = rotate_interval
+        self.block_rows = block_rows
+        self.retention_days = retention_days
+        self.max_total_bytes = max_total_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._segments = self._scan()
+        # Kapatilmis ama sikistirilamamis segmentler: aktif olarak yeniden acilmaz, sonra tekrar denenir
+        self._closed_plain = set()
+        self._active = None
+        self._fh = None
+        # Aktif (henuz indekslenmemis) blok: [baslangic offseti, satir, min_ts, max_ts]
+        self._block = None
+
+    # --- Segment Yonetimi ---
+    def _scan(self) -> List[_Segment]:
+        segs = {}
+        for name in os.listdir(self.directory):
+            m = _SEGMENT_RE.match(name)
+            if m:
+                seq = int(m.group(1))
+                seg = _Segment(seq, int(m.group(2)), bool(m.group(3)), self.directory)
+                # Sikistirma yarida kaldiysa duz dosya esastir
+                if seq not in segs or not seg.compressed:
+                    segs[seq] = seg
+        return [segs[k] for k in sorted(segs)]
+
+    def _open_active(self):
+        if self._fh is not None:
+            return
+        last = self._segments[-1] if self._segments else None
+        if last is not None and not last.compressed and last.seq not in self._closed_plain:
+            self._active = last
+        else:
+            self._active = _Segment((last.seq + 1) if last else 1, int(time.time()), False, self.directory)
+            self._segments.append(self._active)
+
+        self._fh = open(self._active.path, "ab")
+        if self._fh.tell() == 0:
+            self._fh.write((",".join(LOG_COLUMNS) + "\r\n").encode("utf-8"))
+            self._fh.flush()
+            open(self._active.idx_path, "wb").close()
+        self._recover_block()
+
+    def _recover_block(self):
+        """Son indekslenen bloktan sonraki satirlari tarayip aktif blogu yeniden kurar (crash sonrasi)."""
+        idx = self._read_index(self._active)
+        start = int(idx["offset"][-1] + idx["length"][-1]) if len(idx) else self._header_length(self._active.path)
+        self._block = [start, 0, None, None]
+        size = self._fh.tell()
+        if size > start:
+            with open(self._active.path, "rb") as f:
+                f.seek(start)
+                for row in csv.reader(io.TextIOWrapper(f, encoding="utf-8", newline="")):
+                    self._track(row[0] if row else "")
+        # Eksik yazilmis son satirlar sonraki kayitla birlesmesin
+        if size > start:
+            with open(self._active.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._fh.write(b"\r\n")
+
+    @staticmethod
+    def _header_length(path: str) -> int:
+        with open(path, "rb") as f:
+            return len(f.readline())
+
+    def _track(self, timestamp: str):
+        key = ts_key(timestamp)
+        block = self._block
+        block[1] += 1
+        block[2] = key if block[2] is None else min(block[2], key)
+        block[3] = key if block[3] is None else max(block[3], key)
+
+    def _close_block(self, end_offset: int):
+        start, rows, lo, hi = self._block
+        if rows:
+            rec = np.array([(start, end_offset - start, lo, hi)], dtype=IDX_DTYPE)
+            with open(self._active.idx_path, "ab") as f:
+                f.write(rec.tobytes())
+        self._block = [end_offset, 0, None, None]
+
+    def _needs_rotation(self) -> bool:
+        return (self._fh.tell() >= self.max_segment_bytes or
+                time.time() - self._active.created >= self.rotate_interval)
+
+    def rotate(self):
+        """Aktif segmenti kapatir, sikistirir ve saklama politikasini uygular."""
+        with self._lock:
+            if self._fh is None:
+                self._open_active()
+            self._fh.flush()
+            if self._fh.tell() <= self._header_length(self._active.path):
+                return  # Bos segment, dondurmeye gerek yok
+            self._fh.flush()
+            self._close_block(self._fh.tell())
+            os.fsync(self._fh.fileno())
+            self._fh.close()
+            self._fh = None
+            self._closed_plain.add(self._active.seq)
+            self._active = None
+            self._compress_closed()
+            self.apply_retention()
+
+    def _compress_closed(self):
+        """Kapali duz segmentleri sikistirir; basarisiz olan sonraki rotate'te tekrar denenir."""
+        for seg in list(self._segments):
+            if seg.compressed or seg is self._active or (seg is self._segments[-1] and seg.seq not in self._closed_plain):
+                continue
+            try:
+                self._compress(seg)
+                self._closed_plain.discard(seg.seq)
+            except Exception as e:
+                self._closed_plain.add(seg.seq)
+                logger.error(f"Audit Journal: compression of {seg.path} failed: {e}")
+
+    def _compress(self, seg: _Segment):
+        """Her blogu ayri gzip member'i olarak yazar; indeks sikistirilmis offsetlerle yeniden uretilir."""
+        idx = self._read_index(seg)
+        gz = _Segment(seg.seq, seg.created, True, self.directory)
+        out_idx = np.zeros(len(idx), dtype=IDX_DTYPE)
+        try:
+            with open(seg.path, "rb") as src, open(gz.path + ".tmp", "wb") as dst:
+                header = src.readline()
+                dst.write(gzip.compress(header))
+                for i, rec in enumerate(idx):
+                    src.seek(int(rec["offset"]))
+                    member = gzip.compress(src.read(int(rec["length"])))
+                    out_idx[i] = (dst.tell(), len(member), rec["min_ts"], rec["max_ts"])
+                    dst.write(member)
+                dst.flush()
+                os.fsync(dst.fileno())
+            with open(gz.idx_path + ".tmp", "wb") as f:
+                f.write(out_idx.tobytes())
+        except Exception:
+            for path in (gz.path + ".tmp", gz.idx_path + ".tmp"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            raise
+        os.replace(gz.idx_path + ".tmp", gz.idx_path)
+        os.replace(gz.path + ".tmp", gz.path)
+        os.remove(seg.path)
+        os.remove(seg.idx_path)
+        self._segments[self._segments.index(seg)] = gz
+
+    def apply_retention(self):
+        """Saklama suresini veya toplam boyutu asan en eski kapali segmentleri siler."""
+        with self._lock:
+            cutoff = ts_key(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - self.retention_days * 86400)))
+            closed = [s for s in self._segments if s is not self._active]
+            total = sum(self._size(s) for s in self._segments)
+            for seg in closed:
+                idx = self._read_index(seg)
+                expired = self.retention_days and len(idx) and int(idx["max_ts"].max()) < cutoff
+                over_cap = self.max_total_bytes and total > self.max_total_bytes
+                if not (expired or over_cap):
+                    break
+                total -= self._size(seg)
+                for path in (seg.path, seg.idx_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                self._segments.remove(seg)
+                self._closed_plain.discard(seg.seq)
+                logger.info(f"Audit Journal: segment {os.path.basename(seg.path)} removed by retention policy.")
+
+    @staticmethod
+    def _size(seg: _Segment) -> int:
+        try:
+            return os.path.getsize(seg.path) + os.path.getsize(seg.idx_path)
+        except OSError:
+            return 0
+
+    # --- Yazma ---
+    def append(self, entries: List[Dict]):
+        """Kayitlari aktif segmente ekler (parti basina tek fsync)."""
+        if not entries:
+            return
+        with self._lock:
+            self._open_active()
+            if self._needs_rotation():
+                self.rotate()
+                self._open_active()
+
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            fh = self._fh
+            for entry in entries:
+                row = [entry.get(c, "") for c in LOG_COLUMNS]
+                writer.writerow(row)
+                self._track(str(row[0]))
+                if self._block[1] >= self.block_rows:
+                    fh.write(buf.getvalue().encode("utf-8"))
+                    buf = io.StringIO()
+                    writer = csv.writer(buf)
+                    self._close_block(fh.tell())
+            fh.write(buf.getvalue().encode("utf-8"))
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    # --- Okuma ---
+    @staticmethod
+    def _read_index(seg: _Segment) -> np.ndarray:
+        """Sidecar indeksi mmap ile okur."""
+        try:
+            size = os.path.getsize(seg.idx_path)
+        except OSError:
+            return np.zeros(0, dtype=IDX_DTYPE)
+        usable = size - size % IDX_DTYPE.itemsize  # Yarim yazilmis kayit yok sayilir
+        if usable <= 0:
+            return np.zeros(0, dtype=IDX_DTYPE)
+        with open(seg.idx_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = np.frombuffer(mm, dtype=IDX_DTYPE, count=usable // IDX_DTYPE.itemsize)
+            result = view.copy()
+            del view  # mmap kapanmadan once buffer referansi birakilmali
+        return result
+
+    def _blocks(self, seg: _Segment, lo: int, hi: int) -> List[Tuple[int, int]]:
+        idx = self._read_index(seg)
+        if not len(idx):
+            return []
+        hit = (idx["max_ts"] >= lo) & (idx["min_ts"] < hi)
+        return [(int(o), int(n)) for o, n in zip(idx["offset"][hit], idx["length"][hit])]
+
+    def _tail(self, seg: _Segment, end: Optional[int]) -> Optional[Tuple[int, int]]:
+        idx = self._read_index(seg)
+        try:
+            start = int(idx["offset"][-1] + idx["length"][-1]) if len(idx) else self._header_length(seg.path)
+            end = os.path.getsize(seg.path) if end is None else end
+        except OSError:
+            return None
+        return (start, end - start) if end > start else None
+
+    def min_timestamp(self) -> Optional[int]:
+        """Journal'daki en eski kaydin zaman anahtari (blok indekslerinden; yoksa None)."""
+        with self._lock:
+            segments = list(self._segments)
+            pending = self._block[2] if self._block and self._block[1] else None
+        mins = [int(idx["min_ts"].min()) for idx in map(self._read_index, segments) if len(idx)]
+        if pending is not None:
+            mins.append(pending)
+        return min(mins) if mins else None
+
+    def covers(self, start: Optional[str]) -> bool:
+        """start'tan itibaren tum kayitlar journal'da mi (journal'dan eski veri yalnizca audit store'da olabilir)."""
+        if not start:
+            return False
+        first = self.min_timestamp()
+        return first is not None and first <= ts_key(start)
+
+    def iter_rows(self, start: Optional[str] = None, end: Optional[str] = None, user: Optional[str] = None,
+                  action: Optional[str] = None, device: Optional[str] = None,
+                  text: Optional[str] = None) -> Iterator[List[Tuple]]:
+        """
+        AuditStore.iter_rows ile ayni filtreler ve satir bicimi; yalnizca zaman araligiyla
+        kesisen bloklar okunur. text buyuk/kucuk harf duyarsiz alt metin aramasidir.
+        """
+        needle = text.lower() if text else None
+        for rows in self.read(start, end):
+            out = []
+            for r in rows:
+                r = tuple((r + [""] * len(LOG_COLUMNS))[:len(LOG_COLUMNS)])
+                if (user and r[1] != user) or (action and r[2] != action) or (device and r[3] != device):
+                    continue
+                if needle and not any(needle in v.lower() for v in r[1:]):
+                    continue
+                out.append(r)
+            if out:
+                yield out
+
+    def read(self, start: Optional[str] = None, end: Optional[str] = None) -> Iterator[List[List[str]]]:
+        """
+        [start, end) araligindaki kayitlari blok blok uretir.
+        Yalnizca indeksi aralikla kesisen bloklar okunur.
+        """
+        lo = ts_key(start) if start else 0
+        hi = ts_key(end) if end else 99999999999999
+        with self._lock:
+            segments = list(self._segments)
+            active = self._active
+            active_end = None
+            if active is not None and self._fh is not None:
+                self._fh.flush()
+                active_end = self._fh.tell()
+
+        for seg in segments:
+            blocks = self._blocks(seg, lo, hi)
+            if not seg.compressed:
+                # Henuz indekslenmemis son satirlar (aktif blok veya crash sonrasi acilmamis segment)
+                tail = self._tail(seg, active_end if seg is active else None)
+                if tail:
+                    blocks.append(tail)
+            if not blocks:
+                continue
+            try:
+                with open(seg.path, "rb") as f:
+                    for offset, length in blocks:
+                        f.seek(offset)
+                        data = f.read(length)
+                        if seg.compressed:
+                            data = gzip.decompress(data)
+                        rows = [r for r in csv.reader(io.StringIO(data.decode("utf-8"), newline=""))
+                                if r and lo <= ts_key(r[0]) < hi]
+                        if rows:
+                            yield rows
+            except FileNotFoundError:
+                continue  # Okuma sirasinda retention ile silinmis
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+                os.fsync(self._fh.fileno())
+                self._fh.close()
+                self._fh = None
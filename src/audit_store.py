@@ -0,0 +1,308 @@
+import io
+import os
+import csv
+import gzip
+import json
+import time
+import sqlite3
+import logging
+import threading
+import pandas as pd
+from typing import BinaryIO, Optional, List, Dict, Tuple, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Data directory for OpenShift persistence
+DATA_DIR = "data"
+AUDIT_DB = os.path.join(DATA_DIR, "audit.db")
+
+LOG_COLUMNS = ["Timestamp", "User", "Action", "Device", "Details"]
+_SELECT = "SELECT ts, user, action, device, details FROM audit_logs"
+
+CSV_IMPORT_KEY = "csv_imported"
+
+# Saklama sonrasi bosalan sayfalar adim adim dosyadan geri verilir (sayfa / adim);
+# adimlar arasinda lock birakilir, yazici ve sorgular uzun sure beklemez
+VACUUM_STEP_PAGES = 256
+VACUUM_STEP_PAUSE = 0.01
+
+EXPORT_CSV = "csv"
+EXPORT_JSONL = "jsonl"
+
+
+def write_export(fileobj: BinaryIO, batches: Iterable[List[Tuple]], fmt: str = EXPORT_CSV, compress: bool = False,
+                 max_rows: Optional[int] = None) -> int:
+    """
+    Kayit partilerini (LOG_COLUMNS sirasinda tuple listeleri) ikili dosya nesnesine yazar:
+    CSV veya JSON lines, istege bagli gzip. Bellekte ayni anda yalnizca bir parti tutulur.
+    max_rows verilirse ilk max_rows satirdan sonrasi yazilmaz.
+    """
+    if fmt not in (EXPORT_CSV, EXPORT_JSONL):
+        raise ValueError(f"Unsupported export format: {fmt}")
+    raw = gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=6) if compress else fileobj
+    text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    count = 0
+    try:
+        if fmt == EXPORT_CSV:
+            writer = csv.writer(text)
+            writer.writerow(LOG_COLUMNS)
+        for rows in batches:
+            if max_rows is not None:
+                rows = rows[:max(0, max_rows - count)]
+                if not rows:
+                    break
+            if fmt == EXPORT_CSV:
+                writer.writerows(rows)
+            else:
+                text.write("".join(json.dumps(dict(zip(LOG_COLUMNS, r)), ensure_ascii=False) + "\n" for r in rows))
+            count += len(rows)
+        text.flush()
+    finally:
+        text.detach()  # Alttaki dosya cagiranindir, kapatilmaz
+        if compress:
+            raw.close()  # gzip trailer'ini yazar
+    return count
+
+
+class AuditStore:
+    """
+    Audit kayitlari icin SQLite (WAL) tabanli, indeksli depo.
+
+    Zaman (ts) 'YYYY-MM-DD HH:MM:SS' metni olarak saklanir; bu format
+    sozluk sirasi ile kronolojik sira ayni oldugundan aralik sorgulari
+    dogrudan indeksi kullanir.
+    """
+
+    def __init__(self, db_path: str = AUDIT_DB, synchronous: str = "NORMAL"):
+        self.db_path = db_path
+        self.synchronous = synchronous if synchronous in ("OFF", "NORMAL", "FULL") else "NORMAL"
+        self._conn = None
+        self._lock = threading.RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Baglantiyi ilk kullanimda acar ve semayi hazirlar."""
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir and not os.path.exists(db_dir):
+                os.makedirs(db_dir, exist_ok=True)
+
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False, isolation_level=None)
+            # Yalnizca yeni veritabaninda etkilidir (tablolar olusmadan once); mevcut
+            # auto_vacuum=NONE dosyalarda bosalan sayfalar yeniden kullanilir
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS audit_logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ts TEXT NOT NULL,
+                    user TEXT,
+                    action TEXT,
+                    device TEXT,
+                    details TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_ts ON audit_logs(ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_user_ts ON audit_logs(user, ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_action_ts ON audit_logs(action, ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_device_ts ON audit_logs(device, ts)")
+            conn.execute("CREATE TABLE IF NOT EXISTS audit_meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _row(entry: Dict) -> Tuple:
+        return tuple("" if entry.get(c) is None else str(entry.get(c)) for c in LOG_COLUMNS)
+
+    @staticmethod
+    def _where(start: Optional[str] = None, end: Optional[str] = None, user: Optional[str] = None,
+               action: Optional[str] = None, device: Optional[str] = None,
+               text: Optional[str] = None) -> Tuple[str, List]:
+        """Filtrelerden WHERE ifadesi uretir. start dahil, end haric."""
+        clauses, params = [], []
+        if start:
+            clauses.append("ts >= ?"); params.append(str(start))
+        if end:
+            clauses.append("ts < ?"); params.append(str(end))
+        for col, value in (("user", user), ("action", action), ("device", device)):
+            if value:
+                clauses.append(f"{col} = ?"); params.append(value)
+        if text:
+            escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            like = f"%{escaped}%"
+            clauses.append(
+                "(details LIKE ? ESCAPE '\\' OR user LIKE ? ESCAPE '\\' OR action LIKE ? ESCAPE '\\' OR device LIKE ? ESCAPE '\\')"
+            )
+            params.extend([like] * 4)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    # --- Yazma ---
+    def insert_many(self, entries: List[Dict]):
+        """Kayitlari tek transaction ile ekler."""
+        if not entries:
+            return
+        rows = [self._row(e) for e in entries]
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT INTO audit_logs (ts, user, action, device, details) VALUES (?, ?, ?, ?, ?)", rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def import_csv(self, csv_path: str, chunk_size: int = 10000) -> int:
+        """
+        Eski audit_logs.csv icerigini bir kez ice aktarir.
+        Islem audit_meta'da isaretlenir; tekrar cagrilirsa (veya baska replika
+        aktardiysa) hicbir sey yapmaz.
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")  # Replikalar arasi tek aktarim
+            try:
+                if conn.execute("SELECT 1 FROM audit_meta WHERE key = ?", (CSV_IMPORT_KEY,)).fetchone():
+                    conn.execute("COMMIT")
+                    return 0
+
+                count = 0
+                if os.path.exists(csv_path):
+                    for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype=str,
+                                             keep_default_na=False, on_bad_lines='skip'):
+                        chunk = chunk.reindex(columns=LOG_COLUMNS, fill_value="")
+                        conn.executemany(
+                            "INSERT INTO audit_logs (ts, user, action, device, details) VALUES (?, ?, ?, ?, ?)",
+                            chunk.itertuples(index=False, name=None)
+                        )
+                        count += len(chunk)
+
+                conn.execute("INSERT INTO audit_meta (key, value) VALUES (?, ?)", (CSV_IMPORT_KEY, str(count)))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        if count:
+            logger.info(f"Audit Store: imported {count} row(s) from {csv_path}.")
+        return count
+
+    def purge_before(self, ts: str, vacuum: bool = False) -> int:
+        """
+        Verilen zamandan eski kayitlari siler (saklama politikasi). vacuum ile silinen
+        sayfalar incremental_vacuum ile kucuk adimlarla dosyadan geri verilir (tam VACUUM
+        yapilmaz); aksi halde bos sayfalar sonraki yazimlarda yeniden kullanilir.
+        """
+        with self._lock:
+            removed = self._connect().execute("DELETE FROM audit_logs WHERE ts < ?", (str(ts),)).rowcount
+        if removed:
+            logger.info(f"Audit Store: {removed} row(s) older than {ts} purged by retention policy.")
+            if vacuum:
+                self.incremental_vacuum()
+        return removed
+
+    def incremental_vacuum(self, step_pages: int = VACUUM_STEP_PAGES) -> int:
+        """Bos sayfalari adim adim dosyadan geri verir; geri verilen sayfa sayisini doner."""
+        released = 0
+        while True:
+            with self._lock:
+                conn = self._connect()
+                if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:  # INCREMENTAL degil
+                    return released
+                free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if not free:
+                    return released
+                step = min(free, int(step_pages))
+                # execute() pragma'yi tek adim calistirir (tek sayfa); executescript sonuna kadar
+                conn.executescript(f"PRAGMA incremental_vacuum({step})")
+                # Adimin WAL'a yazdigi sayfalar ana dosyaya aktarilsin, WAL buyumesin
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                released += step
+            time.sleep(VACUUM_STEP_PAUSE)
+
+    # --- Okuma ---
+    def query(self, start: Optional[str] = None, end: Optional[str] = None, user: Optional[str] = None,
+              action: Optional[str] = None, device: Optional[str] = None, text: Optional[str] = None,
+              limit: Optional[int] = None, offset: int = 0, ascending: bool = False) -> pd.DataFrame:
+        """Filtrelere uyan kayitlari (varsayilan: en yeni once) DataFrame olarak doner."""
+        where, params = self._where(start, end, user, action, device, text)
+        order = "ASC" if ascending else "DESC"
+        sql = f"{_SELECT}{where} ORDER BY ts {order}, id {order}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [int(limit), int(offset)]
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return pd.DataFrame(rows, columns=LOG_COLUMNS)
+
+    def count(self, start: Optional[str] = None, end: Optional[str] = None, user: Optional[str] = None,
+              action: Optional[str] = None, device: Optional[str] = None, text: Optional[str] = None) -> int:
+        where, params = self._where(start, end, user, action, device, text)
+        with self._lock:
+            return self._connect().execute(f"SELECT COUNT(*) FROM audit_logs{where}", params).fetchone()[0]
+
+    def min_timestamp(self) -> Optional[str]:
+        """En eski kaydin zamani (ts indeksi uzerinden)."""
+        with self._lock:
+            return self._connect().execute("SELECT MIN(ts) FROM audit_logs").fetchone()[0]
+
+    def distinct(self, column: str, limit: int = 500) -> List[str]:
+        """Filtre secenekleri icin kolonun farkli degerleri (indeks uzerinden)."""
+        if column not in ("user", "action", "device"):
+            raise ValueError(f"Unsupported column: {column}")
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT DISTINCT {column} FROM audit_logs WHERE {column} != '' ORDER BY {column} LIMIT ?", (limit,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def recent_devices(self, user: str, limit: int = 10) -> List[str]:
+        """Kullanicinin en son islem yaptigi cihaz kayitlari (en yeni once, (user, ts) indeksi)."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT device FROM audit_logs WHERE user = ? AND device != '' "
+                "GROUP BY device ORDER BY MAX(ts) DESC LIMIT ?", (user, int(limit))
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def iter_rows(self, batch_size: int = 5000, ascending: bool = True, after: Optional[Tuple[str, int]] = None,
+                  include_id: bool = False, **filters) -> Iterator[List[Tuple]]:
+        """
+        Filtrelenmis kayitlari parti parti (keyset pagination) uretir; bellek kullanimi sabittir.
+        after=(ts, id) verilirse o kayittan sonrasi okunur (kaldigi yerden devam).
+        include_id ile her satirin sonuna kayit id'si eklenir.
+        """
+        where, params = self._where(**filters)
+        op, order = (">", "ASC") if ascending else ("<", "DESC")
+        last = tuple(after) if after else None
+        while True:
+            clause = where
+            p = list(params)
+            if last is not None:
+                clause += (" AND " if clause else " WHERE ") + f"(ts, id) {op} (?, ?)"
+                p += list(last)
+            with self._lock:
+                rows = self._connect().execute(
+                    f"SELECT ts, user, action, device, details, id FROM audit_logs{clause} ORDER BY ts {order}, id {order} LIMIT ?",
+                    p + [batch_size]
+                ).fetchall()
+            if not rows:
+                return
+            last = (rows[-1][0], rows[-1][5])
+            yield rows if include_id else [r[:5] for r in rows]
+
+    def export_csv(self, path: str, **filters) -> int:
+        """Filtrelenmis kayitlari CSV dosyasina yazar (eski format, baslikli)."""
+        with open(path, "wb") as f:
+            return self.export(f, fmt=EXPORT_CSV, **filters)
+
+    def export(self, fileobj: BinaryIO, fmt: str = EXPORT_CSV, compress: bool = False,
+               batch_size: int = 5000, **filters) -> int:
+        """Filtrelenmis kayitlari ikili dosya nesnesine parti parti yazar (bkz. write_export)."""
+        return write_export(fileobj, self.iter_rows(batch_size=batch_size, **filters), fmt=fmt, compress=compress)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,22 +1,54 @@
 import streamlit as st
+import os
+import hmac
+import atexit
 import datetime
 import ssl
 import logging
-import uuid
 import socket
+import threading
 import bcrypt
-from typing import Optional, List, Dict, Union, Any, Tuple
-from ldap3 import Server, Connection, SCHEMA, Tls
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional, List, Dict, Union, Any, Tuple, Sequence
+from ldap3 import Server, Connection, SCHEMA, Tls, BASE
+from ldap3.utils.conv import escape_filter_chars
 from config_service import ConfigService
+from session_store import SessionStore
+from port_rules import PortPermissionMatcher, get_matcher
+from cache_utils import TTLCache
 
 # Logger Yapilandirmasi
 logger = logging.getLogger(__name__)
 
-# Basit In-Memory Session Store (Tek Pod icin yeterli)
-# Token -> SessionData
-SESSION_STORE = {}
-# Username -> [Token1, Token2] (Ters indeks)
-USER_SESSIONS = {}
+# Kalici Session Store (SQLite/WAL - restart sonrasi korunur, replikalar arasi paylasilir)
+# TTL, idle timeout ve kapasite limitleri session_store modulunde tanimli
+SESSION_STORE = SessionStore()
+
+# Sifre Dogrulama Havuzu (bcrypt CPU yogun; login patlamalari render thread'lerini bloklamasin)
+DEFAULT_BCRYPT_ROUNDS = 12
+PASSWORD_WORKERS = int(os.getenv("AUTH_PASSWORD_WORKERS", 2))
+PASSWORD_QUEUE_LIMIT = int(os.getenv("AUTH_PASSWORD_QUEUE_LIMIT", 16))
+PASSWORD_TIMEOUT = float(os.getenv("AUTH_PASSWORD_TIMEOUT", 10))
+_PASSWORD_POOL = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="pwcheck")
+_PASSWORD_SLOTS = threading.BoundedSemaphore(PASSWORD_QUEUE_LIMIT)
+
+# Basarili login sonrasi yukseltilecek hashler: username -> (eski_deger, yeni_hash)
+# Tek tek degil, kisa bir gecikmeyle toplu olarak config'e yazilir.
+REHASH_FLUSH_DELAY = 2.0
+_PENDING_REHASH = {}
+_REHASH_LOCK = threading.Lock()
+_REHASH_TIMER = None
+
+# AD Nested Grup Cozumleme
+# LDAP_MATCHING_RULE_IN_CHAIN: AD'nin gecisli (transitive) uyelik filtresi
+LDAP_MATCHING_RULE_IN_CHAIN = "1.2.840.113556.1.4.1941"
+NESTED_GROUP_MAX_DEPTH = 10
+DEFAULT_GROUP_CACHE_TTL = 600
+# Tum oturumlarin paylastigi cache: ("user", base_dn, user_dn) -> grup listesi,
+# ("parents", group_dn) -> ust gruplar (iteratif genisletme icin)
+_GROUP_CACHE = TTLCache(ttl=DEFAULT_GROUP_CACHE_TTL, max_entries=8192)
 
 class User:
     def __init__(self, username: str, role: str, user_groups: Optional[List[str]] = None):
@@ -25,27 +57,44 @@ class User:
         self.user_groups = user_groups or [] # LDAP Gruplarini sakla
         self.login_time = datetime.datetime.now()
 
-    def has_access_to_port(self, device_name: str, port_name: str) -> bool:
+    def to_dict(self) -> Dict[str, Any]:
+        """Session store'da saklanacak serilestirilebilir hali."""
+        return {
+            "username": self.username,
+            "role": self.role,
+            "user_groups": self.user_groups,
+            "login_time": self.login_time.isoformat()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "User":
+        user = cls(data["username"], data["role"], user_groups=data.get("user_groups"))
+        if data.get("login_time"):
+            user.login_time = datetime.datetime.fromisoformat(data["login_time"])
+        return user
+
+    def get_port_matcher(self) -> PortPermissionMatcher:
         """
-        Check access dynamically by reloading config.
+        Kullanicinin port kurallarini derlenmis matcher olarak doner.
+        Config dosyasi degismedikce (mtime/size) tekrar yuklenmez ve derlenmez.
         """
-        # 1. Super User / Admin check (Static)
-        if self.username == "admin" or self.role == "Super_User":
-            return True
-            
-        # 2. Load latest config
+        revision = ConfigService.get_revision()
+        cached = getattr(self, "_matcher_cache", None)
+        if cached and revision is not None and cached[0] == revision:
+            return cached[1]
+
         cfg = ConfigService.load_config()
-        
-        # 3. Determine Permission Source
+
+        # Determine Permission Source
         global_allowed = []
         device_allowed = {}
-        
+
         # A. Local User Check
         local_acc = next((u for u in cfg.get("local_accounts", []) if u['user'] == self.username), None)
         if local_acc:
             global_allowed = local_acc.get("global_allowed_ports", [])
             device_allowed = local_acc.get("device_allowed_ports", local_acc.get("allowed_ports", {}))
-        
+
         # B. LDAP User Check (if not local and has groups)
         elif self.user_groups:
             mappings = cfg.get("ldap_settings", {}).get("mappings", [])
@@ -53,74 +102,175 @@ class User:
             _, g_ports, d_ports = AuthService._get_profile_by_ldap_groups(self.user_groups, mappings)
             global_allowed = g_ports or []
             device_allowed = d_ports or {}
-            
-        # 4. Global Check
-        if port_name in global_allowed:
-            return True
-            
-        # 5. Device Specific Check
-        if port_name in device_allowed.get(device_name, []):
+
+        matcher = get_matcher(global_allowed, device_allowed, cfg.get("device_groups", {}))
+        self._matcher_cache = (revision, matcher)
+        return matcher
+
+    def has_access_to_port(self, device_name: str, port_name: str) -> bool:
+        """
+        Check access against compiled port rules (exact, range, wildcard, device group).
+        """
+        # 1. Super User / Admin check (Static)
+        if self.username == "admin" or self.role == "Super_User":
             return True
-            
-        return False
+
+        # 2. Compiled rules (reloaded only when config changes)
+        return self.get_port_matcher().allows(device_name, port_name)
+
+    def port_access_mask(self, devices: Union[Sequence[str], pd.Series], ports: Union[Sequence[str], pd.Series]) -> np.ndarray:
+        """
+        Toplu RBAC: (cihaz, port) ciftleri icin izin maskesi (has_access_to_port ile ayni kurallar).
+        Filo genelindeki goruntuleme/export islemleri icin tek vektorize gecis.
+        """
+        if self.username == "admin" or self.role == "Super_User":
+            return np.ones(len(ports), dtype=bool)
+        return self.get_port_matcher().allowed_mask(devices, ports)
+
+    def filter_allowed_ports(self, df: pd.DataFrame, device_col: str = "device", port_col: str = "port") -> pd.DataFrame:
+        """Arayuz tablosunu kullanicinin yetkili oldugu satirlara indirger."""
+        if df.empty:
+            return df
+        return df[self.port_access_mask(df[device_col], df[port_col])]
 
 class AuthService:
     
     @staticmethod
-    def hash_password(password: str) -> str:
+    def get_bcrypt_rounds(cfg: Optional[Dict[str, Any]] = None) -> int:
+        """Konfigure edilen bcrypt cost faktorunu doner (Env: BCRYPT_ROUNDS)."""
+        if cfg is None:
+            cfg = ConfigService.load_config()
+        sec = cfg.get("security_settings", {})
+        try:
+            return int(ConfigService.get_env_or_config(sec, "bcrypt_rounds", "BCRYPT_ROUNDS", DEFAULT_BCRYPT_ROUNDS))
+        except (TypeError, ValueError):
+            return DEFAULT_BCRYPT_ROUNDS
+
+    @staticmethod
+    def hash_password(password: str, rounds: Optional[int] = None) -> str:
         """Şifreyi bcrypt ile hashler."""
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=rounds or DEFAULT_BCRYPT_ROUNDS)
         hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed.decode('utf-8')
 
+    @staticmethod
+    def _hash_rounds(hashed: str) -> Optional[int]:
+        """'$2b$12$...' formatindaki hash'ten cost faktorunu okur."""
+        try:
+            return int(hashed.split('$')[2])
+        except (AttributeError, IndexError, ValueError):
+            return None
+
+    @staticmethod
+    def _verify_password(password: str, hashed: str, rounds: int) -> Tuple[bool, bool]:
+        """
+        Sifreyi dogrular (Worker thread'de calisir).
+        Returns: (dogru_mu, yeniden_hashlenmeli_mi)
+        """
+        if not hashed:
+            return False, False
+        try:
+            ok = bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError:
+            # Legacy: Hashlenmemis (duz metin) sifre. Basariliysa bcrypt'e yukseltilir.
+            ok = hmac.compare_digest(password.encode('utf-8'), hashed.encode('utf-8'))
+            return ok, ok
+
+        stored_rounds = AuthService._hash_rounds(hashed)
+        return ok, bool(ok and stored_rounds is not None and stored_rounds < rounds)
+
+    @staticmethod
+    def verify_password(password: str, hashed: str, rounds: int = DEFAULT_BCRYPT_ROUNDS) -> Tuple[bool, bool]:
+        """
+        Sifre dogrulamasini sinirli worker havuzunda calistirir.
+        Kuyruk doluysa veya zaman asimi olursa dogrulama basarisiz sayilir.
+        """
+        if not _PASSWORD_SLOTS.acquire(timeout=PASSWORD_TIMEOUT):
+            logger.warning("Password verification queue full, rejecting login attempt.")
+            return False, False
+        try:
+            future = _PASSWORD_POOL.submit(AuthService._verify_password, password, hashed, rounds)
+        except Exception:
+            _PASSWORD_SLOTS.release()
+            raise
+        # Slot is bittiginde birakilir; zaman asiminda is havuzda kalir ve slotu tutmaya devam eder
+        future.add_done_callback(lambda _: _PASSWORD_SLOTS.release())
+        try:
+            return future.result(timeout=PASSWORD_TIMEOUT)
+        except FutureTimeoutError:
+            logger.error("Password verification timed out.")
+            return False, False
+
     @staticmethod
     def check_password(password: str, hashed: str) -> bool:
         """Şifre doğruluğunu kontrol eder."""
+        ok, _ = AuthService.verify_password(password, hashed)
+        return ok
+
+    @staticmethod
+    def _schedule_rehash(username: str, password: str, old_value: str, rounds: int):
+        """Sifreyi arka planda yeniden hashler ve toplu yazim icin kuyruga ekler."""
+        def job():
+            global _REHASH_TIMER
+            new_hash = AuthService.hash_password(password, rounds)
+            with _REHASH_LOCK:
+                _PENDING_REHASH[username] = (old_value, new_hash)
+                if _REHASH_TIMER is None:
+                    _REHASH_TIMER = threading.Timer(REHASH_FLUSH_DELAY, AuthService.flush_password_upgrades)
+                    _REHASH_TIMER.daemon = True
+                    _REHASH_TIMER.start()
+        _PASSWORD_POOL.submit(job)
+
+    @staticmethod
+    def flush_password_upgrades() -> int:
+        """Bekleyen hash yukseltmelerini tek bir config yazimi ile kaydeder."""
+        global _REHASH_TIMER
+        with _REHASH_LOCK:
+            pending = dict(_PENDING_REHASH)
+            _PENDING_REHASH.clear()
+            _REHASH_TIMER = None
+        if not pending:
+            return 0
+
         try:
-            return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
-        except Exception:
-            # Geriye dönük uyumluluk: Eğer şifre hashli değilse düz metin kontrolü yap
-            return password == hashed
+            cfg = ConfigService.load_config()
+            updated = 0
+            for acc in cfg.get("local_accounts", []):
+                item = pending.get(acc.get('user'))
+                # Arada sifre degistiyse eski degerin ustune yazma
+                if item and acc.get('password') == item[0]:
+                    acc['password'] = item[1]
+                    updated += 1
+            if updated:
+                ConfigService.save_config(cfg)
+                logger.info(f"Password hashes upgraded for {updated} account(s).")
+            return updated
+        except Exception as e:
+            logger.error(f"Password Upgrade Error: {e}")
+            return 0
 
     @staticmethod
     def create_session_token(user_obj: User) -> str:
         """Kullanici icin unique token olusturur ve saklar."""
-        token = str(uuid.uuid4())
-        SESSION_STORE[token] = {
-            "user": user_obj,
-            "created_at": datetime.datetime.now()
-        }
-        
-        # Kullaniciya ait tokenlari kaydet
-        if user_obj.username not in USER_SESSIONS:
-            USER_SESSIONS[user_obj.username] = []
-        USER_SESSIONS[user_obj.username].append(token)
-        
-        return token
+        return SESSION_STORE.create(user_obj.username, user_obj.to_dict())
 
     @staticmethod
     def validate_session_token(token: str) -> Optional[User]:
         """Token gecerli mi kontrol eder, gecerliyse user objesini doner."""
-        if token in SESSION_STORE:
-            return SESSION_STORE[token]["user"]
+        session = SESSION_STORE.get(token)
+        if session:
+            return User.from_dict(session["payload"])
         return None
 
     @staticmethod
     def logout_user(username: str):
         """Kullanicinin TUM aktif oturumlarini (tokenlarini) sunucudan siler."""
-        if username in USER_SESSIONS:
-            tokens = USER_SESSIONS[username]
-            for t in tokens:
-                if t in SESSION_STORE:
-                    del SESSION_STORE[t]
-            # Listeyi temizle
-            del USER_SESSIONS[username]
+        SESSION_STORE.delete_user(username)
 
     @staticmethod
     def remove_session_token(token: str):
         """Token'i session store'dan siler (Server-side logout)."""
-        if token in SESSION_STORE:
-            del SESSION_STORE[token]
+        SESSION_STORE.delete(token)
 
     @staticmethod
     def _get_profile_by_ldap_groups(user_groups: List[str], mappings: List[Dict]) -> Tuple[Optional[str], Optional[List[str]], Optional[Dict]]:
@@ -151,6 +301,75 @@ class AuthService:
                 
         return None, None, None
 
+    @staticmethod
+    def _expand_groups_iteratively(conn, direct_groups: List[str], ttl: float) -> List[str]:
+        """
+        memberOf zincirini seviye seviye takip ederek ust gruplari bulur.
+        In-chain kuralini desteklemeyen sunucular icin yedek yontem.
+        Her grubun ust gruplari ayri cache'lenir (kullanicilar arasi paylasilir).
+        """
+        resolved = []
+        seen = set()
+        frontier = list(direct_groups)
+        depth = 0
+        while frontier and depth < NESTED_GROUP_MAX_DEPTH:
+            next_frontier = []
+            for group_dn in frontier:
+                key = group_dn.lower()
+                if key in seen:
+                    continue
+                seen.add(key)
+                resolved.append(group_dn)
+
+                parents = _GROUP_CACHE.get(("parents", key))
+                if parents is None:
+                    parents = []
+                    try:
+                        conn.search(group_dn, "(objectClass=*)", search_scope=BASE, attributes=['memberOf'])
+                        if conn.entries and 'memberOf' in conn.entries[0]:
+                            parents = [str(g) for g in conn.entries[0]['memberOf'].values]
+                    except Exception as e:
+                        logger.warning(f"LDAP Group Expansion Error ({group_dn}): {e}")
+                    _GROUP_CACHE.set(("parents", key), parents, ttl)
+                next_frontier.extend(parents)
+            frontier = next_frontier
+            depth += 1
+        return resolved
+
+    @staticmethod
+    def _resolve_nested_groups(conn, base_dn: str, user_dn: str, direct_groups: List[str], ttl: float = DEFAULT_GROUP_CACHE_TTL) -> List[str]:
+        """
+        Kullanicinin dogrudan ve dolayli (nested) tum grup DN'lerini doner.
+        Once AD in-chain filtresi denenir, sonuc alinamazsa iteratif genisletme yapilir.
+        Sonuc TTL cache'te tutulur; ayni kullanici icin tekrar sorgu yapilmaz.
+        """
+        cache_key = ("user", base_dn.lower(), user_dn.lower())
+        cached = _GROUP_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+        groups = []
+        try:
+            in_chain = f"(member:{LDAP_MATCHING_RULE_IN_CHAIN}:={escape_filter_chars(user_dn)})"
+            conn.search(base_dn, in_chain, attributes=['cn'])
+            groups = [e.entry_dn for e in conn.entries]
+        except Exception as e:
+            logger.warning(f"LDAP In-Chain Search Error: {e}")
+
+        if not groups and direct_groups:
+            groups = AuthService._expand_groups_iteratively(conn, direct_groups, ttl)
+
+        # Dogrudan gruplar her zaman dahil (sira korunur, tekrarlar atilir)
+        merged = []
+        seen = set()
+        for g in list(direct_groups) + groups:
+            if g.lower() not in seen:
+                seen.add(g.lower())
+                merged.append(g)
+
+        _GROUP_CACHE.set(cache_key, merged, ttl)
+        return merged
+
     @staticmethod
     def login(username, password) -> Tuple[bool, str]:
         cfg = ConfigService.load_config()
@@ -159,7 +378,11 @@ class AuthService:
         local_accounts = cfg.get("local_accounts", [])
         for acc in local_accounts:
             if acc['user'] == username:
-                if AuthService.check_password(password, acc.get('password')):
+                rounds = AuthService.get_bcrypt_rounds(cfg)
+                ok, needs_upgrade = AuthService.verify_password(password, acc.get('password'), rounds)
+                if ok:
+                    if needs_upgrade:
+                        AuthService._schedule_rehash(username, password, acc.get('password'), rounds)
                     role = acc.get('profile', 'Standard_User')
                     st.session_state['current_user'] = User(username, role)
                     return True, "Başarılı"
@@ -229,6 +452,11 @@ class AuthService:
                         entry = conn.entries[0]
                         if 'memberOf' in entry:
                             user_groups = [str(g) for g in entry['memberOf'].values]
+                        
+                        # Nested (Ic ice) AD gruplarini coz - Mapping'lerde ust grup yeterli olur
+                        if ldap_config.get("nested_groups", True):
+                            ttl = ldap_config.get("group_cache_ttl", DEFAULT_GROUP_CACHE_TTL)
+                            user_groups = AuthService._resolve_nested_groups(conn, base_dn, entry.entry_dn, user_groups, ttl)
                     
                     conn.unbind()
                     
@@ -257,8 +485,9 @@ class AuthService:
                 if server_host.startswith(prefix):
                     server_host = server_host.replace(prefix, "")
             
-            socket.setdefaulttimeout(timeout)
+            # Soket bazli timeout (global varsayilan degistirilmez; esanli thread'lerden cagrilir)
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                s.settimeout(timeout)
                 s.connect((server_host, int(port)))
             return True
         except:
@@ -278,11 +507,16 @@ class AuthService:
                 
             servers = ldap_cfg.get("servers", [])
             port = ldap_cfg.get("port", 636)
-            
-            for server in servers:
-                if AuthService.is_ldap_reachable(server, port):
+            if not servers:
+                return False, "LDAP Unreachable"
+
+            # Sunucular esanli yoklanir (toplam sure: en yavas tek yoklama); sonuc config sirasina gore
+            with ThreadPoolExecutor(max_workers=len(servers), thread_name_prefix="ldap-probe") as pool:
+                reachable = list(pool.map(lambda srv: AuthService.is_ldap_reachable(srv, port), servers))
+            for server, ok in zip(servers, reachable):
+                if ok:
                     return True, f"LDAP Reachable ({server})"
-                    
+
             return False, "LDAP Unreachable"
         except Exception as e:
             return False, f"LDAP Check Error: {e}"
@@ -326,4 +560,8 @@ class AuthService:
 
     @staticmethod
     def is_authenticated() -> bool:
-        return 'current_user' in st.session_state
\ No newline at end of file
+        return 'current_user' in st.session_state
+
+
+# Kapanista bekleyen hash yukseltmelerini kaybetme
+atexit.register(AuthService.flush_password_upgrades)
@@ -0,0 +1,291 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Hashable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Process geneli paylasilan cache yardimcilari.
+# st.cache_* yalnizca Streamlit script'i icinde anlamli oldugu icin servis
+# katmani (LDAP, SIEM, API) bu siniflari kullanir.
+
+_MISSING = object()
+
+# SWR arka plan yenilemeleri icin process geneli, sinirli havuz: toplu okuyucular
+# (filo sayfasi, prefetch) cok sayida eski kayda denk gelse de FMG'ye giden esanli
+# yenileme sayisi bu degeri asmaz; fazlasi kuyrukta bekler (anahtar basina bir kez).
+SWR_REFRESH_WORKERS = 4
+_REFRESH_EXECUTOR = None
+_REFRESH_EXECUTOR_LOCK = threading.Lock()
+
+
+def _refresh_executor() -> ThreadPoolExecutor:
+    global _REFRESH_EXECUTOR
+    if _REFRESH_EXECUTOR is None:
+        with _REFRESH_EXECUTOR_LOCK:
+            if _REFRESH_EXECUTOR is None:
+                _REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=SWR_REFRESH_WORKERS,
+                                                       thread_name_prefix="swr-refresh")
+    return _REFRESH_EXECUTOR
+
+
+class TTLCache:
+    """Thread-safe, boyut sinirli (LRU) ve sureli anahtar-deger cache'i."""
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            value, expires_at = item
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+        return default if item is _MISSING else item[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket hiz sinirlayici.
+    Saniyede `rate` token dolar, en fazla `capacity` token birikir (burst).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, n: float = 1) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= n:
+                self._tokens -= n
+                return True
+            return False
+
+    def acquire(self, n: float = 1, stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        n token alinana kadar bekler. capacity'den buyuk istekler, kova dolunca
+        borclanarak verilir (sonraki istekler bu borcu bekler).
+        stop_event set edilirse beklemeyi birakip False doner.
+        """
+        need = min(n, self.capacity)
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= need:
+                    self._tokens -= n
+                    return True
+                wait = (need - self._tokens) / self.rate
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Ayni anahtar icin eszamanli cagrilari tek cagriya indirir (request coalescing).
+
+    Anahtar icin calisan bir cagri varsa yeni gelenler onun bitmesini bekler ve
+    ayni sonucu (veya hatayi) paylasir; sonuc saklanmaz, cagri bitince anahtar serbest kalir.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn, *args, **kwargs) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn(*args, **kwargs)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._flights
+
+
+class SWRResult(NamedTuple):
+    value: Any
+    age: float  # Degerin yasi (sn)
+    refreshing: bool  # Arka planda yenileniyor mu
+
+
+class SWRCache:
+    """
+    Stale-while-revalidate cache.
+
+    - yas <= fresh_ttl: deger dogrudan doner.
+    - fresh_ttl < yas <= max_stale: eski deger hemen doner, arka planda yenilenir.
+    - yas > max_stale veya kayit yok: deger beklenerek yuklenir.
+    Ayni anahtar icin yuklemeler SingleFlight ile tek cagriya indirilir.
+    """
+
+    def __init__(self, fresh_ttl: float, max_stale: float, max_entries: int = 1024):
+        self.fresh_ttl = fresh_ttl
+        self.max_stale = max(max_stale, fresh_ttl)
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (value, loaded_at)
+        self._generation = {}  # key -> invalidate sayaci
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def get(self, key: Hashable, loader, *args, **kwargs) -> SWRResult:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                self._data.move_to_end(key)
+        if item is not _MISSING:
+            value, loaded_at = item
+            age = time.monotonic() - loaded_at
+            if age <= self.fresh_ttl:
+                return SWRResult(value, age, False)
+            if age <= self.max_stale:
+                self._refresh_async(key, loader, args, kwargs)
+                return SWRResult(value, age, True)
+        return SWRResult(self._load(key, loader, args, kwargs), 0.0, False)
+
+    def peek(self, key: Hashable) -> Optional[SWRResult]:
+        """Degeri yukleme/yenileme tetiklemeden doner; kayit yoksa veya max_stale asildiysa None."""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            refreshing = key in self._refreshing
+        if item is _MISSING:
+            return None
+        age = time.monotonic() - item[1]
+        return SWRResult(item[0], age, refreshing) if age <= self.max_stale else None
+
+    def load(self, key: Hashable, loader, *args, **kwargs) -> Any:
+        """Beklenerek yukler ve saklar (cache durumundan bagimsiz; Orn: on-isitma)."""
+        return self._load(key, loader, args, kwargs)
+
+    def _load(self, key, loader, args, kwargs):
+        with self._lock:
+            gen = self._generation.get(key, 0)
+        # Invalidate sonrasi gelen cagri eski (invalidate oncesi) yuklemeye katilmaz
+        return self._flight.do((key, gen), self._load_and_store, key, gen, loader, args, kwargs)
+
+    def _load_and_store(self, key, gen, loader, args, kwargs):
+        value = loader(*args, **kwargs)
+        with self._lock:
+            if self._generation.get(key, 0) == gen:
+                self._store(key, value)
+        return value
+
+    def _refresh_async(self, key, loader, args, kwargs):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._load(key, loader, args, kwargs)
+            except Exception as e:
+                # Eski deger max_stale'e kadar kullanilmaya devam eder
+                logger.warning(f"SWR refresh failed for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        _refresh_executor().submit(run)
+
+    def _store(self, key, value):
+        self._data[key] = (value, time.monotonic())
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            old_key, _ = self._data.popitem(last=False)
+            self._generation.pop(old_key, None)
+
+    def set(self, key: Hashable, value: Any):
+        """Disaridan alinan taze degeri yazar (Orn: canli poller sonucu)."""
+        with self._lock:
+            self._store(key, value)
+
+    def is_refreshing(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._refreshing
+
+    def invalidate(self, key: Hashable):
+        """Kaydi siler; sonraki get beklenerek yeniden yukler."""
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation[key] = self._generation.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            for key in self._data:
+                self._generation[key] = self._generation.get(key, 0) + 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
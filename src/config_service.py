@@ -1,8 +1,10 @@
 import json
 import os
+import bcrypt
+import threading
 import streamlit as st
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 # Logger
 logger = logging.getLogger(__name__)
@@ -14,6 +16,12 @@ if not os.path.exists(DATA_DIR):
 
 CONFIG_FILE = os.path.join(DATA_DIR, "fmg_config.json")
 
+# Varsayilan yerel hesaplar (kullanici, ilk sifre, profil); config'e bcrypt hash'i yazilir
+DEFAULT_ACCOUNTS = (("admin", "admin", "Super_User"), ("operator", "operator", "Standard_User"))
+# Hashler process basina bir kez uretilir (load_config her cagrida bcrypt calistirmasin)
+_DEFAULT_HASHES = {}
+_DEFAULT_HASHES_LOCK = threading.Lock()
+
 class ConfigService:
     """Uygulama ayarlarını yöneten servis."""
     
@@ -44,6 +52,30 @@ class ConfigService:
             pass
         return "1.6.0" # Fallback
 
+    @staticmethod
+    def get_revision() -> Optional[Tuple[int, int]]:
+        """Config dosyasinin degisim imzasi (mtime_ns, size). Dosya yoksa None.
+
+        Tam yukleme yapmadan config'in degisip degismedigini anlamak icin kullanilir.
+        """
+        try:
+            st_res = os.stat(CONFIG_FILE)
+            return st_res.st_mtime_ns, st_res.st_size
+        except OSError:
+            return None
+
+    @staticmethod
+    def _default_accounts() -> List[Dict[str, str]]:
+        """Varsayilan hesaplar; sifreler duz metin yerine bcrypt hash'i olarak doner."""
+        with _DEFAULT_HASHES_LOCK:
+            if not _DEFAULT_HASHES:
+                rounds = int(os.getenv("BCRYPT_ROUNDS", 12))
+                for user, password, _ in DEFAULT_ACCOUNTS:
+                    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds))
+                    _DEFAULT_HASHES[user] = hashed.decode('utf-8')
+        return [{"user": user, "password": _DEFAULT_HASHES[user], "profile": profile}
+                for user, _, profile in DEFAULT_ACCOUNTS]
+
     @staticmethod
     def load_config() -> Dict[str, Any]:
         config = {}
@@ -81,6 +113,8 @@ class ConfigService:
                 "port": 636,
                 "use_ssl": True,
                 "base_dn": "dc=example,dc=com",
+                "nested_groups": True,
+                "group_cache_ttl": 600,
                 "mappings": []
             }
             
@@ -101,12 +135,9 @@ class ConfigService:
                 {"name": "Read_Only", "permissions": {"Dashboard": 1, "System": 0, "Logs": 1}}
             ]
             
-        # 5. Local Accounts (Defaults)
+        # 5. Local Accounts (Defaults) - sifreler hashlenmis olarak eklenir
         if "local_accounts" not in config:
-            config["local_accounts"] = [
-                {"user": "admin", "password": "admin", "profile": "Super_User"},
-                {"user": "operator", "password": "operator", "profile": "Standard_User"}
-            ]
+            config["local_accounts"] = ConfigService._default_accounts()
 
         # 6. SIEM Settings
         if "siem_settings" not in config:
@@ -114,12 +145,49 @@ class ConfigService:
                 "enabled": False,
                 "server": "",
                 "port": 514,
-                "protocol": "UDP"
+                "protocol": "UDP",
+                "format": "json",  # json | rfc5424 | cef
+                "replay_rate": 500,  # Kesinti sonrasi spool'dan gonderim hizi (olay/sn)
+                "backfill_rate": 200  # Gecmis log aktarim hizi (olay/sn)
             }
             
         # 7. Port Toggle Method (Default: db_update)
         if "toggle_method" not in config:
             config["toggle_method"] = "db_update"
+
+        # 8. Guvenlik Ayarlari (bcrypt cost faktoru)
+        if "security_settings" not in config:
+            config["security_settings"] = {
+                "bcrypt_rounds": 12
+            }
+
+        # 9. Audit Ayarlari (strict: olay basina fsync bekler, batched: toplu fsync)
+        if "audit_settings" not in config:
+            config["audit_settings"] = {
+                "durability": "batched",
+                "flush_interval": 0.5,
+                # Segmentli audit journal: boyut/zaman ile rotate, eski segmentler silinir
+                "segment_max_mb": 64,
+                "rotate_hours": 24,
+                "retention_days": 365,
+                "max_total_mb": 2048,
+                # Yaslanmis aylar Parquet arsivine (data/audit_archive) yazilir
+                "archive_after_days": 90,
+                "archive_interval_hours": 24
+            }
+
+        # 10. Cihaz Gruplari (Port izinlerinde '@Grup' kapsami icin)
+        if "device_groups" not in config:
+            config["device_groups"] = {}
+
+        # 11. Dashboard Ayarlari (Canli port durumu okuma araligi, sn)
+        if "dashboard_settings" not in config:
+            config["dashboard_settings"] = {
+                "live_interval": 5,
+                "prefetch_workers": 3,
+                "prefetch_rate": 5,
+                "fleet_workers": 8
+            }
             
         return config
 
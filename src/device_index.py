@@ -0,0 +1,110 @@
+import unicodedata
+from typing import Dict, List, Optional, Sequence
+
+# Aranabilir cihaz alanlari (oncelik sirasina gore; siralamada esitlik bozucu)
+SEARCH_FIELDS = ("name", "ip", "platform_str", "desc", "adom", "sn")
+NGRAM = 3
+
+# Eslesme turleri (kucuk olan once listelenir)
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_SUBSTRING = 2
+
+_SEP = "\x00"  # Alanlar arasi ayirici: n-gram'lar alan sinirini asmaz
+
+
+def normalize(value) -> str:
+    """Aksan/buyuk-kucuk harf farkini kaldirir (Orn: 'İSTANBUL' -> 'istanbul', 'Işık' -> 'isik')."""
+    if value is None:
+        return ""
+    # Noktasiz 'ı' ayristirilamaz ve casefold'da korunur; 'i' ile ayni kabul edilir
+    text = unicodedata.normalize("NFKD", str(value).replace("ı", "i"))
+    return "".join(c for c in text if not unicodedata.combining(c)).casefold().strip()
+
+
+class DeviceSearchIndex:
+    """
+    Cihaz listesi icin bir kez olusturulan arama indeksi.
+
+    Her cihazin normalize edilmis alanlari tek bir metinde birlestirilir ve
+    trigram -> cihaz listesi indeksi kurulur. Sorguda yalnizca tum trigram'lari
+    iceren adaylar dogrulanir; sonuclar tam / onek / alt metin eslesmesine gore
+    siralanir. NGRAM (3) karakterden kisa terimler onceden hazirlanmis
+    metinler uzerinde taranir.
+    """
+
+    def __init__(self, devices: Sequence[Dict], fields: Sequence[str] = SEARCH_FIELDS):
+        self.devices = list(devices)
+        self.fields = tuple(fields)
+        self._values: List[tuple] = []
+        self._haystacks: List[str] = []
+        self._grams: Dict[str, set] = {}
+
+        for idx, device in enumerate(self.devices):
+            values = tuple(normalize(device.get(f)) for f in self.fields)
+            haystack = _SEP.join(values)
+            self._values.append(values)
+            self._haystacks.append(haystack)
+            for gram in {haystack[i:i + NGRAM] for i in range(len(haystack) - NGRAM + 1)}:
+                if _SEP not in gram:
+                    self._grams.setdefault(gram, set()).add(idx)
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def _candidates(self, term: str) -> Optional[set]:
+        """Terimin tum trigram'larini iceren cihazlar; kisa terimlerde None (tam tarama)."""
+        if len(term) < NGRAM:
+            return None
+        postings = []
+        for i in range(len(term) - NGRAM + 1):
+            ids = self._grams.get(term[i:i + NGRAM])
+            if not ids:
+                return set()
+            postings.append(ids)
+        postings.sort(key=len)
+        return set.intersection(*postings)
+
+    def _rank(self, idx: int, term: str) -> tuple:
+        best = (RANK_SUBSTRING, len(self.fields))
+        for pos, value in enumerate(self._values[idx]):
+            if value == term:
+                return (RANK_EXACT, pos)
+            at = value.find(term)
+            while at != -1:
+                # Alanin ya da bir kelimenin (FGT-Ankara-01 -> 'ankara') basi onek sayilir
+                if at == 0 or not value[at - 1].isalnum():
+                    best = min(best, (RANK_PREFIX, pos))
+                    break
+                best = min(best, (RANK_SUBSTRING, pos))
+                at = value.find(term, at + 1)
+        return best
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Bosluklu sorgularda tum terimler eslesmelidir.
+        Sonuclar (eslesme turu, alan onceligi, orijinal sira) ile siralanir.
+        """
+        terms = normalize(query).split()
+        if not terms:
+            return self.devices[:limit] if limit else list(self.devices)
+
+        # En secici (en uzun) terimle aday kumesini daralt
+        terms.sort(key=len, reverse=True)
+        candidates = None
+        for term in terms:
+            ids = self._candidates(term)
+            if ids is None:
+                continue
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+
+        haystacks = self._haystacks
+        pool = sorted(candidates) if candidates is not None else range(len(haystacks))
+        matches = [idx for idx in pool if all(t in haystacks[idx] for t in terms)]
+
+        ranked = sorted(matches, key=lambda idx: (tuple(sorted(self._rank(idx, t) for t in terms)), idx))
+        if limit:
+            ranked = ranked[:limit]
+        return [self.devices[idx] for idx in ranked]
@@ -0,0 +1,172 @@
+import logging
+import threading
+from typing import Callable, List, Optional, Tuple
+from api_client import FMG_REQUESTS
+from cache_utils import SWRCache, SWRResult
+from device_index import DeviceSearchIndex
+
+logger = logging.getLogger(__name__)
+
+# Tazelik pencereleri (sn): fresh icinde dogrudan, max_stale'e kadar eski deger + arka plan yenileme
+DEVICES_FRESH, DEVICES_MAX_STALE = 60, 600
+VDOMS_FRESH, VDOMS_MAX_STALE = 30, 300
+INTERFACES_FRESH, INTERFACES_MAX_STALE = 3, 60
+
+_DEVICES = SWRCache(DEVICES_FRESH, DEVICES_MAX_STALE, max_entries=16)
+_VDOMS = SWRCache(VDOMS_FRESH, VDOMS_MAX_STALE)
+_INTERFACES = SWRCache(INTERFACES_FRESH, INTERFACES_MAX_STALE)
+
+_INDEXES = {}  # fmg -> (devices listesi, DeviceSearchIndex)
+_INDEX_LOCK = threading.Lock()
+
+
+class DeviceService:
+    """
+    FMG cihaz/VDOM/port verisi icin process geneli (tum oturumlarin paylastigi)
+    stale-while-revalidate cache katmani. Sonuclar SWRResult olarak doner;
+    UI `age` ve `refreshing` ile "yenileniyor" ipucu gosterebilir.
+    """
+
+    # --- Ham cagrilar (single-flight) ---
+    @staticmethod
+    def fetch_devices(api) -> List[dict]:
+        if not api: return []
+        return FMG_REQUESTS.do(("devices", api.base_url), api.get_devices) or []
+
+    @staticmethod
+    def fetch_vdoms(api, device_name: str) -> List[str]:
+        if not api: return ["root"]
+        return FMG_REQUESTS.do(("vdoms", api.base_url, device_name), api.get_vdoms, device_name)
+
+    @staticmethod
+    def fetch_interfaces(api, device_name: str, vdom: str, adom: str = "root") -> Optional[List[dict]]:
+        """Coalesced per (FMG, device, vdom, adom): concurrent callers share one FMG call."""
+        if not api: return []
+        key = ("interfaces", api.base_url, device_name, vdom, adom)
+        return FMG_REQUESTS.do(key, DeviceService._fetch_interfaces, api, device_name, vdom, adom)
+
+    @staticmethod
+    def _fetch_interfaces(api, device_name, vdom, adom):
+        """Tries Real-time first, falls back to FMG DB."""
+        # 1. Try Real-time (Direct from Device via Proxy)
+        try:
+            realtime_data = api.get_interfaces_realtime(device_name, vdom=vdom, adom=adom)
+            if realtime_data:
+                return realtime_data
+        except Exception as e:
+            print(f"Realtime Fetch Error: {e}")
+
+        # 2. Fallback to FMG DB
+        return api.get_interfaces(device_name, vdom=vdom, adom=adom)
+
+    # --- SWR cache'li okumalar ---
+    @staticmethod
+    def get_devices(api) -> SWRResult:
+        if not api: return SWRResult([], 0.0, False)
+        return _DEVICES.get(api.base_url, DeviceService.fetch_devices, api)
+
+    @staticmethod
+    def get_device_index(api, devices: Optional[List[dict]] = None) -> DeviceSearchIndex:
+        """Cihaz listesi icin arama indeksi; yalnizca liste yenilendiginde yeniden kurulur."""
+        if devices is None:
+            devices = DeviceService.get_devices(api).value
+        key = api.base_url if api else None
+        with _INDEX_LOCK:
+            cached = _INDEXES.get(key)
+            if cached is not None and cached[0] is devices:
+                return cached[1]
+        index = DeviceSearchIndex(devices)
+        with _INDEX_LOCK:
+            _INDEXES[key] = (devices, index)
+        return index
+
+    @staticmethod
+    def get_vdoms(api, device_name: str) -> SWRResult:
+        if not api: return SWRResult(["root"], 0.0, False)
+        return _VDOMS.get((api.base_url, device_name), DeviceService.fetch_vdoms, api, device_name)
+
+    @staticmethod
+    def get_interfaces(api, device_name: str, vdom: str, adom: str = "root") -> SWRResult:
+        if not api: return SWRResult([], 0.0, False)
+        return _INTERFACES.get((api.base_url, device_name, vdom, adom),
+                               DeviceService.fetch_interfaces, api, device_name, vdom, adom)
+
+    @staticmethod
+    def refresh_interfaces(api, device_name: str, vdom: str, adom: str = "root") -> Optional[List[dict]]:
+        """Portlari hemen okur ve cache'i gunceller (Orn: canli durum poller'i)."""
+        data = DeviceService.fetch_interfaces(api, device_name, vdom, adom)
+        if api and data is not None:
+            _INTERFACES.set((api.base_url, device_name, vdom, adom), data)
+        return data
+
+    # --- Toplu okuma (arka plan yenilemesi tetiklemez) ---
+    @staticmethod
+    def _read_through(cache: SWRCache, key, loader, args, max_age: float):
+        """Kayit max_age'den yeniyse doner; degilse cagiranin thread'inde beklenerek yukler."""
+        cached = cache.peek(key)
+        if cached is not None and cached.age <= max_age:
+            return cached.value
+        return cache.load(key, loader, *args)
+
+    @staticmethod
+    def read_vdoms(api, device_name: str, max_age: float = VDOMS_FRESH) -> List[str]:
+        """
+        Toplu okuyucular icin (Orn: filo goruntusu): SWR get'in aksine eski kayitta
+        arka plan yenilemesi baslatmaz; yukleme cagiranin sinirli havuzunda yapilir.
+        """
+        if not api: return ["root"]
+        return DeviceService._read_through(_VDOMS, (api.base_url, device_name),
+                                           DeviceService.fetch_vdoms, (api, device_name), max_age)
+
+    @staticmethod
+    def read_interfaces(api, device_name: str, vdom: str, adom: str = "root",
+                        max_age: float = INTERFACES_FRESH) -> Optional[List[dict]]:
+        """read_vdoms gibi: taze kayit yoksa beklenerek okur ve cache'i gunceller."""
+        if not api: return []
+        return DeviceService._read_through(_INTERFACES, (api.base_url, device_name, vdom, adom),
+                                           DeviceService.fetch_interfaces, (api, device_name, vdom, adom), max_age)
+
+    # --- On-isitma (prefetch) ---
+    @staticmethod
+    def _warm_entry(cache: SWRCache, key, loader, args, throttle) -> Tuple[object, int]:
+        """Kayit yoksa veya omrunun yarisini doldurduysa yukler. (deger, FMG cagri sayisi) doner."""
+        cached = cache.peek(key)
+        if cached is not None and (cached.refreshing or cached.age < cache.max_stale / 2):
+            return cached.value, 0
+        if throttle is not None and throttle() is False:
+            return None, 0
+        return cache.load(key, loader, *args), 1
+
+    @staticmethod
+    def warm(api, device_name: str, adom: str = "root", vdom: Optional[str] = None,
+             throttle: Optional[Callable[[], bool]] = None) -> int:
+        """
+        Cihazin VDOM listesini ve (verilen ya da ilk) VDOM'un portlarini cache'e yukler;
+        boylece cihaz secildiginde veri beklenmeden gelir. Her FMG cagrisindan once
+        `throttle()` cagrilir (hiz siniri; False donerse durulur). Yapilan cagri sayisini doner.
+        """
+        if not api or not device_name:
+            return 0
+        vdoms, calls = DeviceService._warm_entry(_VDOMS, (api.base_url, device_name),
+                                                 DeviceService.fetch_vdoms, (api, device_name), throttle)
+        vdom = vdom or (vdoms[0] if vdoms else None)
+        if not vdom:
+            return calls
+        _, n = DeviceService._warm_entry(_INTERFACES, (api.base_url, device_name, vdom, adom),
+                                         DeviceService.fetch_interfaces, (api, device_name, vdom, adom), throttle)
+        return calls + n
+
+    # --- Invalidation ---
+    @staticmethod
+    def invalidate_interfaces(api, device_name: str, vdom: str, adom: str = "root"):
+        """Port degisikliginden sonra: sonraki okuma beklenerek taze veri alir."""
+        if api:
+            _INTERFACES.invalidate((api.base_url, device_name, vdom, adom))
+
+    @staticmethod
+    def clear():
+        """Tum cihaz/VDOM/port cache'lerini temizler."""
+        for cache in (_DEVICES, _VDOMS, _INTERFACES):
+            cache.clear()
+        with _INDEX_LOCK:
+            _INDEXES.clear()
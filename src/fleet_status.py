@@ -0,0 +1,183 @@
+import time
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Sequence
+from cache_utils import SWRCache, SWRResult
+from config_service import ConfigService
+from device_service import DeviceService
+from port_rules import split_numbered
+
+logger = logging.getLogger(__name__)
+
+PHYSICAL_TYPES = ['physical', 'hard-switch', 'fsw', 'root', '0', '4']
+DEFAULT_WORKERS = 8
+# Filo goruntusu tum oturumlarca paylasilir (sn)
+FLEET_FRESH, FLEET_MAX_STALE = 30, 300
+
+# Port durum kodlari (matris hucreleri)
+STATE_NONE = -1  # Cihazda bu port yok
+STATE_UP = 0
+STATE_LINK_DOWN = 1  # Admin up, link down
+STATE_ADMIN_DOWN = 2
+STATE_UNKNOWN = 3  # Admin up, link bilgisi yok (Orn: FMG DB fallback)
+
+STATE_LABELS = {STATE_UP: "Up", STATE_LINK_DOWN: "Link Down", STATE_ADMIN_DOWN: "Admin Down", STATE_UNKNOWN: "Bilinmiyor"}
+# STATE_NONE..STATE_UNKNOWN sirasiyla (kod + 1 ile indekslenir)
+STATE_SYMBOLS = np.array(["", "🟢", "🔴", "⚫", "⚪"], dtype=object)
+
+TABLE_COLUMNS = ["device", "adom", "model", "vdom", "port", "type", "admin", "link", "state"]
+
+_FLEET = SWRCache(FLEET_FRESH, FLEET_MAX_STALE, max_entries=16)
+
+
+class FleetSnapshot(NamedTuple):
+    table: pd.DataFrame  # TABLE_COLUMNS; cihaz basina fiziksel portlar
+    errors: Dict[str, str]  # cihaz -> hata
+    collected_at: float  # epoch
+    duration: float  # Toplama suresi (sn)
+
+
+def _truthy(values: pd.Series, words: Sequence[str]) -> np.ndarray:
+    return values.astype(str).str.lower().isin(words).to_numpy()
+
+
+def _port_sort_key(port: str):
+    """port2 < port10 siralamasi icin (onek, numara, isim)."""
+    parts = split_numbered(port)
+    return (parts[0], parts[1], port) if parts else (port, -1, port)
+
+
+class FleetStatusService:
+    """
+    Filo geneli port durumu: tum cihazlarin portlari esanli toplanir, tek bir
+    tabloya donusturulur ve durum matrisi / ozetler vektorize hesaplanir.
+    """
+
+    @staticmethod
+    def build_table(records: List[dict]) -> pd.DataFrame:
+        """
+        Ham interface kayitlarindan (device/adom/model/vdom alanlari eklenmis)
+        fiziksel port tablosu. Durum kodu tek gecisle (np.select) hesaplanir.
+        """
+        # object dtype: eksik alanli kayitlar 1 -> 1.0 donusumune yol acmasin
+        df = pd.DataFrame(records, columns=["device", "adom", "model", "vdom", "name", "type",
+                                            "status", "admin-status", "link-status"], dtype=object)
+        if df.empty:
+            return pd.DataFrame(columns=TABLE_COLUMNS)
+
+        names = df["name"].astype(str)
+        lower = names.str.lower()
+        physical = (df["type"].astype(str).isin(PHYSICAL_TYPES)
+                    & ~lower.str.contains("modem", regex=False)
+                    & ~lower.str.contains("ssl.", regex=False))
+        df = df[physical.to_numpy()]
+        names = names[physical.to_numpy()]
+
+        admin_raw = df["status"].where(df["status"].notna(), df["admin-status"])
+        admin = _truthy(admin_raw, ['1', 'up', 'enable', 'true'])
+        link_known = df["link-status"].notna().to_numpy()
+        link = _truthy(df["link-status"], ['1', 'up', 'true'])
+        state = np.select([~admin, ~link_known, link], [STATE_ADMIN_DOWN, STATE_UNKNOWN, STATE_UP], STATE_LINK_DOWN)
+
+        return pd.DataFrame({
+            "device": df["device"].to_numpy(),
+            "adom": df["adom"].fillna("root").to_numpy(),
+            "model": df["model"].fillna("-").to_numpy(),
+            "vdom": df["vdom"].to_numpy(),
+            "port": names.to_numpy(),
+            "type": df["type"].astype(str).to_numpy(),
+            "admin": admin,
+            "link": np.where(link_known, link, np.nan),
+            "state": state.astype(np.int8),
+        }, columns=TABLE_COLUMNS)
+
+    @staticmethod
+    def _collect_device(api, device: dict):
+        name = device.get('name')
+        adom = device.get('adom', 'root')
+        # SWR get kullanilmaz: eski kayitlar icin cihaz basina arka plan yenilemesi baslatirdi.
+        # Taze olmayan veri bu (sinirli) havuzun thread'inde beklenerek okunur.
+        vdoms = DeviceService.read_vdoms(api, name) or ["root"]
+        vdom = vdoms[0]
+        interfaces = DeviceService.read_interfaces(api, name, vdom, adom)
+        if interfaces is None:
+            raise RuntimeError("Port bilgisi alınamadı")
+        extra = {"device": name, "adom": adom, "model": device.get('platform_str'), "vdom": vdom}
+        return [{**i, **extra} for i in interfaces]
+
+    @staticmethod
+    def collect(api, devices: Sequence[dict], workers: int = DEFAULT_WORKERS) -> FleetSnapshot:
+        """
+        Tum cihazlarin (ilk VDOM) portlarini en fazla `workers` esanli FMG cagrisiyla okur.
+        Okumalar paylasilan cihaz cache'inden gecer; taze veri varsa FMG'ye gidilmez,
+        okunan veri cache'e yazilir. Hata veren cihazlar `errors` icinde raporlanir.
+        """
+        start = time.monotonic()
+        records, errors = [], {}
+        if api and devices:
+            with ThreadPoolExecutor(max_workers=max(1, min(int(workers), len(devices))),
+                                    thread_name_prefix="fleet") as pool:
+                futures = {d.get('name'): pool.submit(FleetStatusService._collect_device, api, d) for d in devices}
+                for name, future in futures.items():
+                    try:
+                        records.extend(future.result())
+                    except Exception as e:
+                        logger.warning(f"Fleet Status: {name} failed: {e}")
+                        errors[name] = str(e)
+        table = FleetStatusService.build_table(records)
+        return FleetSnapshot(table, errors, time.time(), time.monotonic() - start)
+
+    @staticmethod
+    def _load_snapshot(api) -> FleetSnapshot:
+        dash = ConfigService.load_config().get("dashboard_settings", {})
+        devices = DeviceService.get_devices(api).value
+        return FleetStatusService.collect(api, devices, dash.get("fleet_workers", DEFAULT_WORKERS))
+
+    @staticmethod
+    def get_snapshot(api) -> SWRResult:
+        """Process geneli (stale-while-revalidate) filo goruntusu."""
+        if not api:
+            return SWRResult(FleetSnapshot(pd.DataFrame(columns=TABLE_COLUMNS), {}, time.time(), 0.0), 0.0, False)
+        return _FLEET.get(api.base_url, FleetStatusService._load_snapshot, api)
+
+    @staticmethod
+    def invalidate(api):
+        if api:
+            _FLEET.invalidate(api.base_url)
+
+    @staticmethod
+    def visible(table: pd.DataFrame, user) -> pd.DataFrame:
+        """Kullanicinin yetkili oldugu portlar (tek vektorize RBAC gecisi)."""
+        if table.empty or user is None:
+            return table
+        return table[user.port_access_mask(table["device"], table["port"])]
+
+    @staticmethod
+    def status_matrix(table: pd.DataFrame) -> pd.DataFrame:
+        """Cihaz x port durum kodu matrisi; cihazda olmayan portlar STATE_NONE."""
+        if table.empty:
+            return pd.DataFrame(dtype=np.int8)
+        matrix = table.pivot_table(index="device", columns="port", values="state", aggfunc="max",
+                                   fill_value=STATE_NONE)
+        ports = sorted(matrix.columns, key=_port_sort_key)
+        return matrix[ports].astype(np.int8)
+
+    @staticmethod
+    def symbol_matrix(matrix: pd.DataFrame) -> pd.DataFrame:
+        """Durum kodu matrisini simgelere cevirir (dizi indeksleme ile)."""
+        return pd.DataFrame(STATE_SYMBOLS[matrix.to_numpy(dtype=np.int16) + 1],
+                            index=matrix.index, columns=matrix.columns)
+
+    @staticmethod
+    def summarize(table: pd.DataFrame, by: str) -> pd.DataFrame:
+        """`by` (adom / model) bazinda cihaz, port ve durum sayilari."""
+        columns = [by, "Cihaz", "Port"] + list(STATE_LABELS.values()) + ["Up %"]
+        if table.empty:
+            return pd.DataFrame(columns=columns)
+        counts = pd.crosstab(table[by], table["state"]).reindex(columns=list(STATE_LABELS), fill_value=0)
+        counts.columns = list(STATE_LABELS.values())
+        summary = counts.assign(Port=counts.sum(axis=1), Cihaz=table.groupby(by)["device"].nunique())
+        summary["Up %"] = (100 * summary[STATE_LABELS[STATE_UP]] / summary["Port"]).round(1)
+        return summary.reset_index()[columns].sort_values("Port", ascending=False, kind="stable")
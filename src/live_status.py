@@ -0,0 +1,134 @@
+import time
+import logging
+import threading
+from typing import Callable, Hashable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 5.0
+MIN_INTERVAL = 2.0
+# Bu kadar sure hic okunmayan poller kendini kapatir
+DEFAULT_IDLE_TIMEOUT = 60.0
+
+
+class LiveSnapshot(NamedTuple):
+    data: Optional[List[dict]]
+    fetched_at: Optional[float]  # Son basarili okuma (epoch)
+    error: Optional[str]
+    version: int  # Veri her degistiginde artar
+
+
+class LiveStatusPoller:
+    """
+    Tek bir (cihaz, vdom, adom) icin arka planda periyodik port durumu okur.
+
+    Ayni anahtari izleyen tum oturumlar ayni poller'i paylasir; FMG'ye aralik
+    basina tek istek gider. Okuyan kalmazsa (idle_timeout) thread kendiliginden durur.
+    """
+
+    def __init__(self, key: Hashable, fetch: Callable[[], Optional[List[dict]]],
+                 interval: float = DEFAULT_INTERVAL, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.key = key
+        self.fetch = fetch
+        self.interval = max(MIN_INTERVAL, float(interval))
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._snapshot = LiveSnapshot(None, None, None, 0)
+        self._last_seen = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name=f"live-status-{key}", daemon=True)
+        self._thread.start()
+
+    def touch(self):
+        self._last_seen = time.monotonic()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive() and not self._stop.is_set()
+
+    def snapshot(self) -> LiveSnapshot:
+        self.touch()
+        with self._lock:
+            return self._snapshot
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Ilk okuma tamamlanana kadar bekler."""
+        return self._ready.wait(timeout)
+
+    def refresh(self):
+        """Bir sonraki okumayi beklemeden hemen yapar (Orn: port degisikliginden sonra)."""
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _idle(self) -> bool:
+        return time.monotonic() - self._last_seen > self.idle_timeout
+
+    def _poll_once(self):
+        try:
+            data = self.fetch()
+            if data is None:
+                raise RuntimeError("No data returned")
+            with self._lock:
+                prev = self._snapshot
+                version = prev.version + 1 if data != prev.data else prev.version
+                self._snapshot = LiveSnapshot(data, time.time(), None, version)
+        except Exception as e:
+            logger.warning(f"Live Status: poll failed for {self.key}: {e}")
+            with self._lock:
+                self._snapshot = self._snapshot._replace(error=str(e))
+        finally:
+            self._ready.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Kayit defteri kilidi altinda: ayni anda yeni okuyucu eklenemez
+            with _POLLERS_LOCK:
+                if self._idle():
+                    self._stop.set()
+                    if _POLLERS.get(self.key) is self:
+                        del _POLLERS[self.key]
+                    break
+            self._poll_once()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+        logger.info(f"Live Status: poller for {self.key} stopped.")
+
+
+_POLLERS = {}
+_POLLERS_LOCK = threading.Lock()
+
+
+def get_poller(key: Hashable, fetch: Callable[[], Optional[List[dict]]],
+               interval: float = DEFAULT_INTERVAL) -> LiveStatusPoller:
+    """Anahtar icin calisan poller'i doner, yoksa baslatir (process geneli paylasilir)."""
+    with _POLLERS_LOCK:
+        poller = _POLLERS.get(key)
+        if poller is None or not poller.is_alive():
+            poller = LiveStatusPoller(key, fetch, interval)
+            _POLLERS[key] = poller
+        else:
+            # En guncel oturumun API nesnesi ve ayarlanan aralik kullanilir
+            poller.fetch = fetch
+            poller.interval = max(MIN_INTERVAL, float(interval))
+        poller.touch()
+        return poller
+
+
+def request_refresh(key: Hashable):
+    """Anahtar icin poller varsa hemen yeniden okumasini ister."""
+    with _POLLERS_LOCK:
+        poller = _POLLERS.get(key)
+    if poller is not None:
+        poller.refresh()
+
+
+def stop_all():
+    with _POLLERS_LOCK:
+        pollers = list(_POLLERS.values())
+        _POLLERS.clear()
+    for poller in pollers:
+        poller.stop()
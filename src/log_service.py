@@ -5,9 +5,23 @@ import pytz
 import sys
 import socket
 import json
+import re
+import queue
+import atexit
+import tempfile
+import threading
 import streamlit as st
 import pandas as pd
+from typing import Optional, List, Tuple
 from config_service import ConfigService
+from siem_transport import SiemTransport
+from siem_spool import SiemSpool, SiemForwarder
+from siem_format import get_formatter, frame, FORMAT_JSON
+from audit_store import AuditStore, LOG_COLUMNS, write_export
+from audit_journal import AuditJournal
+from cache_utils import TTLCache
+from siem_backfill import SiemBackfill
+from audit_archive import AuditArchive
 
 # Data directory for OpenShift persistence
 DATA_DIR = "data"
@@ -15,6 +29,181 @@ if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR, exist_ok=True)
 
 LOG_FILE = os.path.join(DATA_DIR, "audit_logs.csv")
+# Buyuk export'lar icin gecici dosyalar (container /tmp'si kucuk olabilir)
+EXPORT_TMP_DIR = os.getenv("AUDIT_EXPORT_TMP_DIR", DATA_DIR)
+# Indirme butonu veriyi sunucu belleginde tutar; export gzip'li ve satir sayisi sinirli
+EXPORT_MAX_ROWS = int(os.getenv("AUDIT_EXPORT_MAX_ROWS", 200000))
+# Port islemlerinde Device kolonu "CIHAZ[VDOM]" formatindadir
+_DEVICE_VDOM_RE = re.compile(r"^(.+)\[([^\]]+)\]$")
+
+# Audit yazim modlari:
+#   strict  : log_action, kaydin fsync edilmesini bekler (ayni anda gelenler tek fsync paylasir)
+#   batched : log_action hemen doner; kayitlar aralikla/parti halinde fsync edilir
+DURABILITY_STRICT = "strict"
+DURABILITY_BATCHED = "batched"
+
+
+class _Commit:
+    """Strict submit / flush bekleyicisi: parti yazildiginda sonucu (ok) ile isaretlenir."""
+    __slots__ = ("event", "ok")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.ok = False
+
+    def resolve(self, ok: bool):
+        self.ok = ok
+        self.event.set()
+
+    def wait(self, timeout: float) -> bool:
+        return self.event.wait(timeout) and self.ok
+
+
+class AuditWriter:
+    """
+    Audit kayitlarini bellek kuyruguna alip arka plan thread'inde
+    group-commit ile (parti basina tek fsync) CSV'ye yazar. journal verilirse
+    tek dosya yerine donen (rotate) segmentli audit journal'a yazilir.
+    Ayni parti, sorgular icin indeksli audit store'a (SQLite) tek transaction ile eklenir.
+    SIEM gonderimi de commit sonrasi bu thread'de yapilir.
+    """
+
+    def __init__(self, log_file: str = LOG_FILE, durability: str = DURABILITY_BATCHED,
+                 flush_interval: float = 0.5, max_batch: int = 500, siem_sender=None,
+                 store: Optional[AuditStore] = None, journal: Optional[AuditJournal] = None):
+        self.log_file = log_file
+        self.store = store
+        self.journal = journal
+        self.durability = durability if durability in (DURABILITY_STRICT, DURABILITY_BATCHED) else DURABILITY_BATCHED
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.siem_sender = siem_sender
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, log_entry: dict, timeout: float = 10.0) -> bool:
+        """
+        Kaydi kuyruga ekler. Strict modda commit edilene kadar bekler; kaydin
+        partisi diske yazilamadiysa (veya zaman asiminda) False doner.
+        """
+        if self._closed:
+            return False
+        done = _Commit() if self.durability == DURABILITY_STRICT else None
+        self._queue.put((log_entry, done))
+        if done is not None:
+            return done.wait(timeout)
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Kuyruktaki tum kayitlar islenene kadar bekler. Ayni partinin yazimi basarisizsa False."""
+        if self._closed or not self._thread.is_alive():
+            return False
+        done = _Commit()
+        self._queue.put((None, done))
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 10.0):
+        """Bekleyen kayitlari yazar ve thread'i durdurur (shutdown)."""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self.journal is not None:
+            self.journal.close()
+
+    def _drain(self, first) -> list:
+        batch = [first]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, entries: List[dict]):
+        if self.journal is not None:
+            self.journal.append(entries)
+            return
+        file_exists = os.path.exists(self.log_file)
+        with open(self.log_file, "a", newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if not file_exists:
+                writer.writerow(LOG_COLUMNS)
+            writer.writerows([[e.get(c, "") for c in LOG_COLUMNS] for e in entries])
+            f.flush()
+            os.fsync(f.fileno())  # Parti basina tek fsync
+
+    def _run(self):
+        stop = False
+        while not stop:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = self._drain(first)
+            entries = []
+            waiters = []
+            for item in batch:
+                if item is None:
+                    stop = True
+                    continue
+                entry, done = item
+                if entry is not None:
+                    entries.append(entry)
+                if done is not None:
+                    waiters.append(done)
+
+            committed = True
+            if entries:
+                try:
+                    self._write(entries)
+                except Exception as e:
+                    committed = False
+                    print(f"Log Error: {e}")
+                # Kayit defteri (journal/CSV) yazilamadiysa parti store'a ve SIEM'e de gitmez;
+                # aksi halde bekleyene basarisiz denen kayitlar sayfada/SIEM'de gorunurdu
+                if committed and self.store is not None:
+                    try:
+                        self.store.insert_many(entries)
+                    except Exception as e:
+                        print(f"Audit Store Error: {e}")
+
+            # Basari yalnizca parti diske yazildiysa bildirilir
+            for done in waiters:
+                done.resolve(committed)
+
+            # SIEM gonderimi commit sonrasi, istek yolunun disinda
+            if entries and committed and self.siem_sender:
+                for entry in entries:
+                    try:
+                        self.siem_sender(entry)
+                    except Exception as e:
+                        print(f"SIEM Send Error: {e}")
+
+
+_AUDIT_WRITER = None
+_AUDIT_WRITER_LOCK = threading.Lock()
+_AUDIT_STORE = None
+_AUDIT_STORE_LOCK = threading.Lock()
+_AUDIT_JOURNAL = None
+# Audit sayfasi filtre secenekleri (kullanici/aksiyon/cihaz listeleri) kisa sureli cache'lenir
+_FILTER_OPTIONS_CACHE = TTLCache(ttl=30, max_entries=4)
+_SIEM_BACKFILL = None
+_AUDIT_ARCHIVE = None
+_ARCHIVE_TIMER = None
+
+# Process geneli SIEM kanali ve config cache'i ((revision, siem_settings))
+_SIEM_TRANSPORT = None
+_SIEM_CONFIG_CACHE = None
+_SIEM_LOCK = threading.Lock()
+_SIEM_FORWARDER = None
+
 
 class LogService:
     """Merkezi loglama servisi."""
@@ -48,6 +237,73 @@ class LogService:
         except Exception as e:
             return False, f"Bağlantı Hatası: {str(e)}"
 
+    @staticmethod
+    def get_siem_config() -> dict:
+        """SIEM ayarlarini doner; config dosyasi degismedikce diskten tekrar okunmaz."""
+        global _SIEM_CONFIG_CACHE
+        revision = ConfigService.get_revision()
+        cached = _SIEM_CONFIG_CACHE
+        if cached is not None and revision is not None and cached[0] == revision:
+            return cached[1]
+        siem_config = ConfigService.load_config().get("siem_settings", {})
+        _SIEM_CONFIG_CACHE = (revision, siem_config)
+        return siem_config
+
+    @staticmethod
+    def get_siem_transport(siem_config: dict) -> SiemTransport:
+        """Ayarlara uygun, process geneli SIEM kanalini doner. Hedef degisirse eskisi kapatilir."""
+        global _SIEM_TRANSPORT
+        key = (siem_config.get("server"), int(siem_config.get("port", 514)),
+               "TCP" if siem_config.get("protocol", "UDP") == "TCP" else "UDP")
+        with _SIEM_LOCK:
+            if _SIEM_TRANSPORT is None or _SIEM_TRANSPORT.key != key:
+                if _SIEM_TRANSPORT is not None:
+                    _SIEM_TRANSPORT.close()
+                _SIEM_TRANSPORT = SiemTransport(*key)
+            return _SIEM_TRANSPORT
+
+    @staticmethod
+    def close_siem_transport():
+        global _SIEM_TRANSPORT
+        with _SIEM_LOCK:
+            if _SIEM_TRANSPORT is not None:
+                _SIEM_TRANSPORT.close()
+                _SIEM_TRANSPORT = None
+
+    @staticmethod
+    def _encode_siem_message(log_data: dict, siem_config: dict, protocol: str) -> bytes:
+        """Kaydi ayarlardaki formatta (json / rfc5424 / cef) kodlar; TCP icin cerceveler."""
+        formatter = get_formatter(siem_config.get("format", FORMAT_JSON))
+        payload = formatter.format(log_data)
+        if protocol == "TCP":
+            return frame(payload, formatter.framing)
+        return payload
+
+    @staticmethod
+    def deliver_to_siem(log_data: dict, siem_config: dict = None):
+        """Log verisini SIEM'e iletir; hata durumunda exception firlatir (retry icin)."""
+        if siem_config is None:
+            siem_config = LogService.get_siem_config()
+        
+        if not siem_config.get("enabled") or not siem_config.get("server"):
+            return
+
+        # Soket/baglanti ve DNS cozumlemesi tekrar kullanilir; olay basina tek send
+        transport = LogService.get_siem_transport(siem_config)
+        transport.send(LogService._encode_siem_message(log_data, siem_config, transport.protocol))
+
+    @staticmethod
+    def deliver_batch_to_siem(records: List[dict], siem_config: dict = None):
+        """Kayit listesini SIEM'e iletir; TCP'de tek write ile (cercevelenmis) gonderilir."""
+        if siem_config is None:
+            siem_config = LogService.get_siem_config()
+
+        if not records or not siem_config.get("enabled") or not siem_config.get("server"):
+            return
+
+        transport = LogService.get_siem_transport(siem_config)
+        transport.send_batch([LogService._encode_siem_message(r, siem_config, transport.protocol) for r in records])
+
     @staticmethod
     def send_to_siem(log_data: dict, siem_config: dict = None):
         """Log verisini Syslog üzerinden SIEM'e gönderir.
@@ -55,44 +311,54 @@ class LogService:
         Args:
             log_data (dict): Gönderilecek log verisi.
             siem_config (dict, optional): Önceden yüklenmiş SIEM ayarları. 
-                                          Verilmezse diskten okunur. Performans için loop içinde verilmeli.
+                                          Verilmezse cache'lenmis ayarlar kullanilir (dosya degisince yenilenir).
         """
-        if siem_config is None:
-            cfg = ConfigService.load_config()
-            siem_config = cfg.get("siem_settings", {})
-        
-        if not siem_config.get("enabled"):
-            return
-            
-        server = siem_config.get("server")
-        port = siem_config.get("port", 514)
-        protocol = siem_config.get("protocol", "UDP")
-        
-        if not server:
-            return
-
         try:
-            # CEF benzeri veya JSON formatında log oluştur
-            # SIEM sistemleri genellikle JSON'u kolay parse eder
-            message = json.dumps(log_data)
-            
-            if protocol == "UDP":
-                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                sock.sendto(message.encode('utf-8'), (server, int(port)))
-            else: # TCP
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(2)
-                sock.connect((server, int(port)))
-                sock.sendall((message + "\n").encode('utf-8'))
-                sock.close()
+            LogService.deliver_to_siem(log_data, siem_config)
         except Exception as e:
             print(f"SIEM Send Error: {e}")
 
     @staticmethod
-    def send_test_message(user_name: str, server: str, port: int, protocol: str):
+    def get_siem_forwarder() -> SiemForwarder:
+        """Process geneli SIEM spool gondericisini doner (ilk kullanimda baslatir)."""
+        global _SIEM_FORWARDER
+        if _SIEM_FORWARDER is None:
+            with _SIEM_LOCK:
+                if _SIEM_FORWARDER is None:
+                    siem_cfg = LogService.get_siem_config()
+                    _SIEM_FORWARDER = SiemForwarder(
+                        SiemSpool(),
+                        sender=LogService.deliver_to_siem,
+                        batch_sender=LogService.deliver_batch_to_siem,
+                        rate=float(siem_cfg.get("replay_rate", 500))
+                    )
+        return _SIEM_FORWARDER
+
+    @staticmethod
+    def enqueue_for_siem(log_data: dict):
+        """Kaydi kalici SIEM giden kutusuna ekler; SIEM erisilemezse kayit kaybolmaz."""
+        if not LogService.get_siem_config().get("enabled"):
+            return
+        LogService.get_siem_forwarder().submit(log_data)
+
+    @staticmethod
+    def get_siem_backlog() -> int:
+        """SIEM'e henuz teslim edilmemis spool verisi (byte)."""
+        if _SIEM_FORWARDER is None:
+            return 0
+        return _SIEM_FORWARDER.spool.pending_bytes()
+
+    @staticmethod
+    def close_siem_forwarder():
+        global _SIEM_FORWARDER
+        forwarder = _SIEM_FORWARDER
+        if forwarder is not None:
+            forwarder.close()
+            _SIEM_FORWARDER = None
+
+    @staticmethod
+    def send_test_message(user_name: str, server: str, port: int, protocol: str, message_format: str = None):
         """Test amaçlı SIEM logu gönderir (CSV'ye yazmaz)."""
-        from typing import Tuple
-        
         # Timezone handled in log_action usually, repeated here or we can skip strictly
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
@@ -104,23 +370,54 @@ class LogService:
             "Details": "Connection Test Message"
         }
         
-        # Gecici config
-        temp_config = {
-            "enabled": True,
-            "server": server,
-            "port": port,
-            "protocol": protocol
-        }
-        
+        # Gecici hedef: paylasilan kanali bozmamak icin tek seferlik transport
+        transport = SiemTransport(server, port, protocol)
         try:
-            LogService.send_to_siem(log_entry, siem_config=temp_config)
+            siem_config = dict(LogService.get_siem_config(), server=server, port=port, protocol=protocol)
+            if message_format:
+                siem_config["format"] = message_format
+            transport.send(LogService._encode_siem_message(log_entry, siem_config, transport.protocol))
             return True, "Test logu gönderildi."
         except Exception as e:
             return False, f"Gönderim Hatası: {e}"
+        finally:
+            transport.close()
+
+    @staticmethod
+    def get_audit_writer() -> AuditWriter:
+        """Process geneli tek audit writer'i doner (ilk kullanimda baslatir)."""
+        global _AUDIT_WRITER
+        if _AUDIT_WRITER is None:
+            with _AUDIT_WRITER_LOCK:
+                if _AUDIT_WRITER is None:
+                    cfg = ConfigService.load_config()
+                    audit_cfg = cfg.get("audit_settings", {})
+                    durability = ConfigService.get_env_or_config(audit_cfg, "durability", "AUDIT_DURABILITY", DURABILITY_BATCHED)
+                    _AUDIT_WRITER = AuditWriter(
+                        durability=durability,
+                        flush_interval=float(audit_cfg.get("flush_interval", 0.5)),
+                        journal=LogService.get_audit_journal(),
+                        siem_sender=LogService.enqueue_for_siem,
+                        # Store writer'dan once hazirlanir; boylece CSV aktarimi yeni kayitlarla cakismaz
+                        store=LogService.get_audit_store()
+                    )
+                    LogService.schedule_archive_compaction(float(audit_cfg.get("archive_interval_hours", 24)) * 3600)
+                    # atexit LIFO calisir: once writer bosaltilir, sonra spool ve SIEM kanali kapanir
+                    atexit.register(LogService.close_siem_transport)
+                    atexit.register(LogService.close_siem_forwarder)
+                    atexit.register(_AUDIT_WRITER.close)
+        return _AUDIT_WRITER
 
     @staticmethod
-    def log_action(user_name: str, action: str, device: str, details: str):
-        """Kullanıcı işlemini loglar, dosyaya yazar ve konsola basar."""
+    def flush_logs(timeout: float = 10.0) -> bool:
+        """Kuyrukta bekleyen audit kayitlarini diske yazdirir."""
+        if _AUDIT_WRITER is None:
+            return True
+        return _AUDIT_WRITER.flush(timeout)
+
+    @staticmethod
+    def log_action(user_name: str, action: str, device: str, details: str) -> bool:
+        """Kullanıcı işlemini loglar, dosyaya yazar ve konsola basar. Kayit yazilamadiysa False."""
         tz_name = st.session_state.get('user_timezone', 'Europe/Istanbul')
         try:
             tz = pytz.timezone(tz_name)
@@ -142,61 +439,247 @@ class LogService:
         log_msg = f"[{timestamp}] [{user_name}] [{action}] Device:{device} - {details}"
         print(log_msg, file=sys.stdout, flush=True)
 
-        # 2. DOSYA LOGU (CSV)
-        file_exists = os.path.exists(LOG_FILE)
+        # 2. DOSYA LOGU (CSV) + 3. SIEM GÖNDERİMİ
+        # Arka plan writer'i group-commit ile yazar ve SIEM'e iletir (UI thread'ini bloklamaz)
         try:
-            with open(LOG_FILE, "a", newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                if not file_exists:
-                    writer.writerow(["Timestamp", "User", "Action", "Device", "Details"])
-                
-                writer.writerow([timestamp, user_name, action, device, str(details)])
-                f.flush()
-                os.fsync(f.fileno())
-                
-            # 3. SIEM GÖNDERİMİ
-            LogService.send_to_siem(log_entry)
-
+            if not LogService.get_audit_writer().submit(log_entry):
+                print(f"Log Error: audit record not committed: {log_msg}")
+                return False
+            return True
         except Exception as e:
             print(f"Log Error: {e}")
+            return False
 
     @staticmethod
-    def export_past_logs_to_siem():
-        """Mevcut CSV'deki tüm geçmiş logları SIEM'e gönderir."""
-        logs = LogService.get_logs()
-        if logs.empty:
-            return False, "Gönderilecek geçmiş log bulunamadı."
-        
-        cfg = ConfigService.load_config()
-        siem_cfg = cfg.get("siem_settings", {})
-        
+    def get_siem_backfill() -> SiemBackfill:
+        """Process geneli SIEM backfill isini doner (checkpoint diskten yuklenir)."""
+        global _SIEM_BACKFILL
+        if _SIEM_BACKFILL is None:
+            with _AUDIT_STORE_LOCK:
+                if _SIEM_BACKFILL is None:
+                    _SIEM_BACKFILL = SiemBackfill(LogService.get_audit_store(), sender=LogService.deliver_batch_to_siem)
+        return _SIEM_BACKFILL
+
+    @staticmethod
+    def start_siem_backfill(start: Optional[str] = None, end: Optional[str] = None, rate: Optional[float] = None):
+        """Gecmis loglarin SIEM'e aktarimini arka planda baslatir (veya kaldigi yerden surdurur)."""
+        siem_cfg = LogService.get_siem_config()
         if not siem_cfg.get("enabled"):
             return False, "SIEM entegrasyonu aktif değil. Lütfen önce ayarları yapıp kaydedin."
 
-        count = 0
+        LogService.flush_logs()
+        backfill = LogService.get_siem_backfill()
+        # UDP: kucuk partiler (collector bufferini tasirmamak icin), TCP: parti basina tek write
+        batch_size = 500 if siem_cfg.get("protocol", "UDP") == "TCP" else 20
+        rate = float(rate or siem_cfg.get("backfill_rate", 200))
+        if not backfill.start(start, end, rate=rate, batch_size=batch_size):
+            return False, "Aktarım zaten devam ediyor."
+        status = backfill.status()
+        if status.get("sent"):
+            return True, f"Aktarım kaldığı yerden devam ediyor ({status['sent']}/{status['total']})."
+        return True, f"{status['total']} adet log kaydı için aktarım başlatıldı."
+
+    @staticmethod
+    def stop_siem_backfill():
+        """Aktarimi duraklatir; checkpoint sayesinde daha sonra devam edilebilir."""
+        if _SIEM_BACKFILL is not None:
+            _SIEM_BACKFILL.stop()
+
+    @staticmethod
+    def export_past_logs_to_siem():
+        """Mevcut tüm geçmiş logları SIEM'e aktarır (arka plan backfill işi olarak)."""
+        if LogService.count_logs() == 0:
+            return False, "Gönderilecek geçmiş log bulunamadı."
+        return LogService.start_siem_backfill()
+
+    @staticmethod
+    def get_audit_store() -> AuditStore:
+        """Process geneli audit store'u doner; ilk acilista eski CSV bir kez ice aktarilir."""
+        global _AUDIT_STORE
+        if _AUDIT_STORE is None:
+            with _AUDIT_STORE_LOCK:
+                if _AUDIT_STORE is None:
+                    audit_cfg = ConfigService.load_config().get("audit_settings", {})
+                    durability = ConfigService.get_env_or_config(audit_cfg, "durability", "AUDIT_DURABILITY", DURABILITY_BATCHED)
+                    store = AuditStore(synchronous="FULL" if durability == DURABILITY_STRICT else "NORMAL")
+                    try:
+                        store.import_csv(LOG_FILE)
+                        # Journal ile ayni saklama suresi (sonrasi periyodik: apply_audit_retention)
+                        cutoff = LogService._retention_cutoff(audit_cfg)
+                        if cutoff:
+                            store.purge_before(cutoff)
+                    except Exception as e:
+                        print(f"Audit Store Import Error: {e}")
+                    _AUDIT_STORE = store
+        return _AUDIT_STORE
+
+    @staticmethod
+    def _retention_cutoff(audit_cfg: dict) -> Optional[str]:
+        retention_days = int(audit_cfg.get("retention_days", 365))
+        if retention_days <= 0:
+            return None
+        return (datetime.datetime.now() - datetime.timedelta(days=retention_days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    @staticmethod
+    def apply_audit_retention() -> int:
+        """
+        Saklama politikasini (audit_settings.retention_days / max_total_mb) journal'a ve
+        audit store'a uygular; store'dan kayit silindiyse bos sayfalar kucuk adimlarla
+        (incremental vacuum, yaziciyi bekletmeden) geri verilir.
+        """
+        audit_cfg = ConfigService.load_config().get("audit_settings", {})
+        LogService.get_audit_journal().apply_retention()
+        cutoff = LogService._retention_cutoff(audit_cfg)
+        if not cutoff:
+            return 0
+        return LogService.get_audit_store().purge_before(cutoff, vacuum=True)
+
+    @staticmethod
+    def get_audit_journal() -> AuditJournal:
+        """Process geneli segmentli audit journal'i doner (audit_settings ile yapilandirilir)."""
+        global _AUDIT_JOURNAL
+        if _AUDIT_JOURNAL is None:
+            with _AUDIT_STORE_LOCK:
+                if _AUDIT_JOURNAL is None:
+                    audit_cfg = ConfigService.load_config().get("audit_settings", {})
+                    _AUDIT_JOURNAL = AuditJournal(
+                        max_segment_bytes=int(audit_cfg.get("segment_max_mb", 64)) * 1024 * 1024,
+                        rotate_interval=float(audit_cfg.get("rotate_hours", 24)) * 3600,
+                        retention_days=int(audit_cfg.get("retention_days", 365)),
+                        max_total_bytes=int(audit_cfg.get("max_total_mb", 2048)) * 1024 * 1024
+                    )
+                    _AUDIT_JOURNAL.apply_retention()
+        return _AUDIT_JOURNAL
+
+    @staticmethod
+    def _journal_for(filters: dict) -> Optional[AuditJournal]:
+        """
+        Baslangic zamani verilen (zaman sinirli) export'lar, journal araligi kapsiyorsa
+        blok indeksi uzerinden yalnizca ilgili segment/bloklari okur. Journal'dan eski
+        veri (Orn: ice aktarilmis eski CSV) yalnizca audit store'dadir.
+        Metin filtresi store'da SQLite LIKE ile (yalnizca ASCII harf duyarsiz) uygulanir;
+        sonuclar sayfa/sayim ile ayni kalsin diye text iceren okumalar store'a gider.
+        """
+        if filters.get("text"):
+            return None
         try:
-            # Dataframe'i dict listesine cevir
-            records = logs.to_dict(orient='records')
-            for record in records:
-                # OPTIMIZATION: Config'i tekrar tekrar okumamak icin parametre olarak geciyoruz
-                LogService.send_to_siem(record, siem_config=siem_cfg)
-                count += 1
-                # Cok hizli gonderip UDP bufferi sisirmemek icin minik bekleme
-                if count % 10 == 0: 
-                    import time
-                    time.sleep(0.05)
-            
-            return True, f"{count} adet geçmiş log kaydı SIEM'e aktarıldı."
+            journal = LogService.get_audit_journal()
+            return journal if journal.covers(filters.get("start")) else None
         except Exception as e:
-            return False, f"Aktarım sırasında hata: {e}"
+            print(f"Audit Journal Error: {e}")
+            return None
 
     @staticmethod
-    def get_logs() -> pd.DataFrame:
-        """Logları okur."""
-        if not os.path.exists(LOG_FILE):
-            return pd.DataFrame(columns=["Timestamp", "User", "Action", "Device", "Details"])
-        
+    def get_audit_archive() -> AuditArchive:
+        """Aylik bolumlenmis Parquet audit arsivi (analitik sorgular icin)."""
+        global _AUDIT_ARCHIVE
+        if _AUDIT_ARCHIVE is None:
+            _AUDIT_ARCHIVE = AuditArchive()
+        return _AUDIT_ARCHIVE
+
+    @staticmethod
+    def compact_audit_archive() -> List[str]:
+        """Yaslanmis (audit_settings.archive_after_days) tamamlanmis aylari Parquet arsivine yazar."""
+        audit_cfg = ConfigService.load_config().get("audit_settings", {})
+        return LogService.get_audit_archive().compact(
+            LogService.get_audit_store(), older_than_days=int(audit_cfg.get("archive_after_days", 90))
+        )
+
+    @staticmethod
+    def schedule_archive_compaction(interval: float):
+        """
+        Arsiv sikistirmasini ve ardindan saklama politikasini arka planda periyodik
+        calistirir (ilk calisma kisa bir gecikmeyle).
+        """
+        global _ARCHIVE_TIMER
+
+        def _tick(delay):
+            global _ARCHIVE_TIMER
+            _ARCHIVE_TIMER = threading.Timer(delay, _run)
+            _ARCHIVE_TIMER.daemon = True
+            _ARCHIVE_TIMER.start()
+
+        def _run():
+            try:
+                LogService.compact_audit_archive()
+            except Exception as e:
+                print(f"Audit Archive Error: {e}")
+            try:
+                LogService.apply_audit_retention()
+            except Exception as e:
+                print(f"Audit Retention Error: {e}")
+            _tick(interval)
+
+        if _ARCHIVE_TIMER is None and interval > 0:
+            _tick(60)
+
+    @staticmethod
+    def get_logs(limit: Optional[int] = None, offset: int = 0, ascending: bool = False, **filters) -> pd.DataFrame:
+        """
+        Logları okur (en yeni once). Filtreler: start, end, user, action, device, text.
+        Sayfali/sirali okuma audit store'un indeksleri uzerinden yapilir.
+        """
+        # Kuyrukta bekleyen kayitlar da gorunsun
+        LogService.flush_logs()
+        try:
+            return LogService.get_audit_store().query(limit=limit, offset=offset, ascending=ascending, **filters)
+        except Exception as e:
+            print(f"Audit Store Error: {e}")
+            return pd.DataFrame(columns=LOG_COLUMNS)
+
+    @staticmethod
+    def count_logs(**filters) -> int:
+        """Filtrelere uyan log sayisi (sayfalarla ayni kaynak: audit store indeksleri)."""
+        LogService.flush_logs()
+        try:
+            return LogService.get_audit_store().count(**filters)
+        except Exception as e:
+            print(f"Audit Store Error: {e}")
+            return 0
+
+    @staticmethod
+    def get_recent_devices(user_name: str, limit: int = 10) -> List[Tuple[str, str]]:
+        """Kullanicinin son port islemi yaptigi (cihaz, vdom) ciftleri; en yeni once."""
+        recent = []
+        try:
+            for entry in LogService.get_audit_store().recent_devices(user_name, limit=limit):
+                m = _DEVICE_VDOM_RE.match(entry)
+                if m and (m.group(1), m.group(2)) not in recent:
+                    recent.append((m.group(1), m.group(2)))
+        except Exception as e:
+            print(f"Audit Store Error: {e}")
+        return recent
+
+    @staticmethod
+    def get_log_filter_options() -> dict:
+        """Audit filtreleri icin kullanici, aksiyon ve cihaz listelerini doner."""
+        options = _FILTER_OPTIONS_CACHE.get("options")
+        if options is None:
+            try:
+                store = LogService.get_audit_store()
+                options = {col: store.distinct(col) for col in ("user", "action", "device")}
+            except Exception as e:
+                print(f"Audit Store Error: {e}")
+                return {"user": [], "action": [], "device": []}
+            _FILTER_OPTIONS_CACHE.set("options", options)
+        return options
+
+    @staticmethod
+    def build_log_export(fmt: str = "csv", max_rows: int = EXPORT_MAX_ROWS, **filters) -> bytes:
+        """
+        Filtrelenmis loglarin (en fazla max_rows satir) gzip'li export'unu doner.
+        Satirlar gecici dosyaya parti parti yazilir; dosya okunduktan sonra kapatilir
+        (silinir). st.download_button'a callable olarak verilir; yalnizca tiklandiginda
+        uretilir ve Streamlit sonucu bellekte tuttugu icin boyut sinirlidir.
+        """
+        LogService.flush_logs()
+        # Zaman sinirli export'lar yalnizca ilgili journal bloklarini okur
+        journal = LogService._journal_for(filters)
+        batches = journal.iter_rows(**filters) if journal is not None else LogService.get_audit_store().iter_rows(**filters)
         try:
-            return pd.read_csv(LOG_FILE, on_bad_lines='skip')
-        except Exception:
-            return pd.DataFrame(columns=["Timestamp", "User", "Action", "Device", "Details"])
+            with tempfile.TemporaryFile(dir=EXPORT_TMP_DIR) as tmp:
+                write_export(tmp, batches, fmt=fmt, compress=True, max_rows=max_rows)
+                tmp.seek(0)
+                return tmp.read()
+        finally:
+            batches.close()
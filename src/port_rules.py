@@ -0,0 +1,285 @@
+import re
+import json
+import fnmatch
+import hashlib
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Optional, List, Dict, Tuple, Iterable, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# Kural Sozdizimi
+#   Port kurallari : "port1" (tam isim), "port{1-48}" (aralik), "vlan*" / "internal?" (wildcard)
+#   Aralik acikca suslu parantezle yazilir; "port1-4" gibi kurallar tam isim olarak kalir
+#   (eski kurallarin anlami degismez, erisim genislemez).
+#   Cihaz kapsami  : "FW01" (tam isim), "FW-ANK-*" (wildcard), "@Ankara" (device_groups icindeki grup)
+GROUP_PREFIX = "@"
+_WILDCARD_CHARS = set("*?[")
+_RANGE_RE = re.compile(r"^(.*?)\{(\d+)-(\d+)\}$")
+_NUMBERED_RE = re.compile(r"^(.*?)(\d+)$")
+
+
+def is_pattern(rule: str) -> bool:
+    """Kuralin wildcard icerip icermedigini doner."""
+    return any(ch in _WILDCARD_CHARS for ch in rule)
+
+
+def parse_range(rule: str) -> Optional[Tuple[str, int, int]]:
+    """'port{1-48}' -> ('port', 1, 48). Aralik degilse None."""
+    m = _RANGE_RE.match(rule)
+    if not m:
+        return None
+    lo, hi = int(m.group(2)), int(m.group(3))
+    if lo > hi:
+        return None
+    return m.group(1), lo, hi
+
+
+def split_numbered(name: str) -> Optional[Tuple[str, int]]:
+    """'port12' -> ('port', 12), 'port1/12' -> ('port1/', 12). Sonu sayi degilse None."""
+    m = _NUMBERED_RE.match(name)
+    if not m:
+        return None
+    return m.group(1), int(m.group(2))
+
+
+def compact_port_list(ports: Iterable[str], min_run: int = 3) -> List[str]:
+    """
+    Acik port listesini ardisik numaralari araliga cevirerek sikistirir.
+    Orn: ['port1', 'port2', 'port3', 'dmz'] -> ['dmz', 'port{1-3}']
+    Mevcut aralik/wildcard kurallari ve sifir dolgulu isimler oldugu gibi korunur.
+    """
+    passthrough = set()
+    numbered = {}
+    for p in ports:
+        p = str(p).strip()
+        if not p:
+            continue
+        parts = split_numbered(p) if not is_pattern(p) and not parse_range(p) else None
+        # Sifir dolgulu isimler ('port01') araliga cevrilmez: 'port{1-3}' port1..port3'u da kapsardi
+        if parts and p[len(parts[0]):] != str(parts[1]):
+            parts = None
+        if parts:
+            numbered.setdefault(parts[0], set()).add(parts[1])
+        else:
+            passthrough.add(p)
+
+    result = sorted(passthrough)
+    for prefix in sorted(numbered):
+        nums = sorted(numbered[prefix])
+        run_start = prev = nums[0]
+        for n in nums[1:] + [None]:
+            if n is not None and n == prev + 1:
+                prev = n
+                continue
+            if prev - run_start + 1 >= min_run:
+                result.append(f"{prefix}{{{run_start}-{prev}}}")
+            else:
+                result.extend(f"{prefix}{i}" for i in range(run_start, prev + 1))
+            if n is not None:
+                run_start = prev = n
+    return result
+
+
+class PortRuleSet:
+    """Bir port kural listesinin derlenmis hali (tam isim, aralik, wildcard)."""
+
+    def __init__(self, rules: Iterable[str]):
+        self.exact = set()
+        self.ranges = {}  # prefix -> [(lo, hi), ...]
+        patterns = []
+
+        for rule in rules or []:
+            rule = str(rule).strip()
+            if not rule:
+                continue
+            self.exact.add(rule)
+            if is_pattern(rule):
+                patterns.append(fnmatch.translate(rule))
+                continue
+            rng = parse_range(rule)
+            if rng:
+                self.ranges.setdefault(rng[0], []).append((rng[1], rng[2]))
+
+        self.pattern = re.compile("|".join(f"(?:{p})" for p in patterns)) if patterns else None
+
+    def __bool__(self) -> bool:
+        return bool(self.exact or self.ranges or self.pattern)
+
+    def matches(self, port_name: str) -> bool:
+        if port_name in self.exact:
+            return True
+        if self.ranges:
+            parts = split_numbered(port_name)
+            if parts:
+                for lo, hi in self.ranges.get(parts[0], ()):
+                    if lo <= parts[1] <= hi:
+                        return True
+        if self.pattern is not None and self.pattern.match(port_name):
+            return True
+        return False
+
+
+class PortPermissionMatcher:
+    """
+    Global ve cihaz bazli port kurallarini derler.
+    Cihaz kapsami tam isim, wildcard veya '@Grup' olabilir; bir cihaz icin
+    gecerli kural setleri ilk sorguda cozulur ve saklanir.
+    """
+
+    def __init__(self, global_rules: Optional[List[str]] = None,
+                 device_rules: Optional[Dict[str, List[str]]] = None,
+                 device_groups: Optional[Dict[str, List[str]]] = None):
+        self.global_rules = PortRuleSet(global_rules or [])
+
+        exact_rules = {}
+        pattern_rules = []
+        groups = device_groups or {}
+
+        for scope, rules in (device_rules or {}).items():
+            scope = str(scope).strip()
+            if scope.startswith(GROUP_PREFIX):
+                members = groups.get(scope[len(GROUP_PREFIX):], [])
+                if not members:
+                    logger.warning(f"Port Rules: Unknown or empty device group '{scope}'")
+            else:
+                members = [scope]
+
+            for member in members:
+                member = str(member).strip()
+                if not member:
+                    continue
+                if is_pattern(member):
+                    pattern_rules.append((re.compile(fnmatch.translate(member)), rules))
+                else:
+                    exact_rules.setdefault(member, []).extend(rules or [])
+
+        self.device_exact = {dev: PortRuleSet(r) for dev, r in exact_rules.items()}
+        self.device_patterns = [(rx, PortRuleSet(r)) for rx, r in pattern_rules]
+        self._resolved = {}
+
+    def rules_for_device(self, device_name: str) -> List[PortRuleSet]:
+        """Cihaza uygulanan cihaz bazli kural setlerini doner (memoize)."""
+        resolved = self._resolved.get(device_name)
+        if resolved is None:
+            resolved = []
+            if device_name in self.device_exact:
+                resolved.append(self.device_exact[device_name])
+            resolved.extend(rs for rx, rs in self.device_patterns if rx.match(device_name))
+            self._resolved[device_name] = resolved
+        return resolved
+
+    def allows(self, device_name: str, port_name: str) -> bool:
+        if self.global_rules.matches(port_name):
+            return True
+        for rs in self.rules_for_device(device_name):
+            if rs.matches(port_name):
+                return True
+        return False
+
+    def allowed_mask(self, devices: Union[Sequence[str], pd.Series, np.ndarray],
+                     ports: Union[Sequence[str], pd.Series, np.ndarray]) -> np.ndarray:
+        """
+        (cihaz, port) ciftleri icin izin maskesini tek vektorize geciste hesaplar.
+        Sonuc, her satir icin allows(device, port) ile aynidir.
+
+        Cihaz ve port isimleri tamsayi kodlara cevrilir (dictionary encoding);
+        string/regex isleri yalnizca benzersiz degerler uzerinde yapilir,
+        satir bazli tum islemler numpy ile yurutulur.
+        """
+        if len(ports) != len(devices):
+            raise ValueError("devices and ports must have the same length")
+        if len(ports) == 0:
+            return np.zeros(0, dtype=bool)
+
+        dev_codes, dev_uniques = pd.factorize(np.asarray(devices, dtype=object))
+        port_codes, port_uniques = pd.factorize(np.asarray(ports, dtype=object))
+        dev_uniques = [str(d) for d in dev_uniques]
+        port_uniques = [str(p) for p in port_uniques]
+        valid = (dev_codes >= 0) & (port_codes >= 0)
+        # Gecersiz (None/NaN) satirlar icin indeksleme guvenli olsun
+        dev_codes = np.where(valid, dev_codes, 0).astype(np.int64)
+        port_codes = np.where(valid, port_codes, 0).astype(np.int64)
+        n_ports = len(port_uniques)
+
+        # 1. Global kurallar: benzersiz portlarda degerlendir, satirlara yay
+        global_u = np.fromiter((self.global_rules.matches(p) for p in port_uniques), dtype=bool, count=n_ports)
+        result = global_u[port_codes]
+
+        if self.device_exact or self.device_patterns:
+            # Port isimlerini (prefix, numara) olarak ayristir (benzersiz portlar uzerinde)
+            split = [split_numbered(p) for p in port_uniques]
+            pref_index = {}
+            pref_u = np.array([pref_index.setdefault(sp[0], len(pref_index)) if sp else -1 for sp in split], dtype=np.int64)
+            num_u = np.array([sp[1] if sp else -1 for sp in split], dtype=np.int64)
+            port_index = {p: i for i, p in enumerate(port_uniques)}
+            n_prefs = max(len(pref_index), 1)
+
+            # Cihaz bazli kurallari benzersiz cihazlar icin ac (config boyutu kadar is)
+            ex_keys = []
+            rg_keys, rg_lo, rg_hi = [], [], []
+            pattern_sets = {}
+            for d_idx, dev in enumerate(dev_uniques):
+                for rs in self.rules_for_device(dev):
+                    ex_keys.extend(d_idx * n_ports + port_index[p] for p in rs.exact if p in port_index)
+                    for prefix, intervals in rs.ranges.items():
+                        if prefix in pref_index:
+                            for lo, hi in intervals:
+                                rg_keys.append(d_idx * n_prefs + pref_index[prefix]); rg_lo.append(lo); rg_hi.append(hi)
+                    if rs.pattern is not None:
+                        pattern_sets.setdefault(id(rs), (rs.pattern, []))[1].append(d_idx)
+
+            # A. Tam isimler: (cihaz, port) anahtari ile uyelik
+            if ex_keys:
+                result |= np.isin(dev_codes * n_ports + port_codes, np.asarray(ex_keys, dtype=np.int64))
+
+            # B. Araliklar: (cihaz, prefix) anahtari uzerinden join + sayi araligi
+            if rg_keys:
+                row_pref = pref_u[port_codes]
+                row_keys = dev_codes * n_prefs + row_pref
+                candidate = (row_pref >= 0) & ~result & np.isin(row_keys, np.asarray(rg_keys, dtype=np.int64))
+                if candidate.any():
+                    idx = np.flatnonzero(candidate)
+                    rows = pd.DataFrame({"key": row_keys[idx], "num": num_u[port_codes[idx]], "row": idx})
+                    rules = pd.DataFrame({"key": rg_keys, "lo": rg_lo, "hi": rg_hi})
+                    joined = rows.merge(rules, on="key")
+                    in_range = ((joined["num"] >= joined["lo"]) & (joined["num"] <= joined["hi"])).to_numpy()
+                    result[joined["row"].to_numpy()[in_range]] = True
+
+            # C. Wildcard'lar: regex benzersiz portlarda, uygulama ilgili cihaz satirlarinda
+            for pattern, pattern_devs in pattern_sets.values():
+                pat_u = np.fromiter((bool(pattern.match(p)) for p in port_uniques), dtype=bool, count=n_ports)
+                dev_flag = np.zeros(len(dev_uniques), dtype=bool)
+                dev_flag[pattern_devs] = True
+                result |= dev_flag[dev_codes] & pat_u[port_codes]
+
+        return result & valid
+
+
+# Derlenmis matcher cache'i (Ayni kural seti icin tekrar derleme yapilmaz)
+_MATCHER_CACHE = OrderedDict()
+_MATCHER_CACHE_SIZE = 256
+_MATCHER_LOCK = threading.Lock()
+
+
+def get_matcher(global_rules: Optional[List[str]], device_rules: Optional[Dict[str, List[str]]],
+                device_groups: Optional[Dict[str, List[str]]] = None) -> PortPermissionMatcher:
+    """Kural setini derler; ayni icerik icin onceden derlenmis matcher'i doner."""
+    key_src = json.dumps([global_rules or [], device_rules or {}, device_groups or {}], sort_keys=True, default=str)
+    key = hashlib.sha1(key_src.encode('utf-8')).hexdigest()
+
+    with _MATCHER_LOCK:
+        matcher = _MATCHER_CACHE.get(key)
+        if matcher is not None:
+            _MATCHER_CACHE.move_to_end(key)
+            return matcher
+
+    matcher = PortPermissionMatcher(global_rules, device_rules, device_groups)
+    with _MATCHER_LOCK:
+        _MATCHER_CACHE[key] = matcher
+        while len(_MATCHER_CACHE) > _MATCHER_CACHE_SIZE:
+            _MATCHER_CACHE.popitem(last=False)
+    return matcher
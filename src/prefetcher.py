@@ -0,0 +1,134 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+from cache_utils import TokenBucket
+from config_service import ConfigService
+from device_service import DeviceService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 3
+DEFAULT_RATE = 5.0  # Prefetch icin FMG cagrisi / sn
+MAX_PENDING = 100
+MRU_LIMIT = 10
+PERMITTED_LIMIT = 20
+
+
+class Prefetcher:
+    """
+    Arka planda, sinirli is parcacigi (concurrency budget) ve token bucket
+    hiz siniri ile calisan on-yukleme kuyrugu.
+
+    Ayni anahtar kuyruktayken tekrar eklenmez; kuyruk MAX_PENDING ile sinirlidir.
+    Isler eklenme sirasiyla (oncelik sirasi) calisir. Kullanici istekleri bu
+    sinirlara tabi degildir; prefetch yalnizca kendi payini kullanir.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, rate: float = DEFAULT_RATE, max_pending: int = MAX_PENDING):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="prefetch")
+        self._bucket = TokenBucket(rate, capacity=max(1.0, float(rate)))
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def throttle(self) -> bool:
+        """Bir FMG cagrisi icin token bekler. Kapatiliyorsa False."""
+        return self._bucket.acquire(1, stop_event=self._stop)
+
+    def submit(self, key: Hashable, fn: Callable, *args, **kwargs) -> bool:
+        """fn(*args, throttle=..., **kwargs) isini kuyruga ekler. Zaten kuyruktaysa veya kuyruk doluysa False."""
+        with self._lock:
+            if self._stop.is_set() or key in self._pending or len(self._pending) >= self.max_pending:
+                return False
+            self._pending.add(key)
+        try:
+            self._executor.submit(self._run, key, fn, args, kwargs)
+        except RuntimeError:
+            with self._lock:
+                self._pending.discard(key)
+            return False
+        return True
+
+    def _run(self, key, fn, args, kwargs):
+        try:
+            if not self._stop.is_set():
+                fn(*args, throttle=self.throttle, **kwargs)
+        except Exception as e:
+            logger.warning(f"Prefetch: {key} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def close(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_PREFETCHER = None
+_PREFETCHER_LOCK = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    """Process geneli prefetcher (dashboard_settings.prefetch_workers / prefetch_rate)."""
+    global _PREFETCHER
+    if _PREFETCHER is None:
+        with _PREFETCHER_LOCK:
+            if _PREFETCHER is None:
+                dash = ConfigService.load_config().get("dashboard_settings", {})
+                _PREFETCHER = Prefetcher(dash.get("prefetch_workers", DEFAULT_WORKERS),
+                                         float(dash.get("prefetch_rate", DEFAULT_RATE)))
+    return _PREFETCHER
+
+
+def likely_next_devices(devices: Sequence[Dict], page_devices: Sequence[Dict] = (),
+                        recent: Iterable[Tuple[str, str]] = (), user=None,
+                        exclude: Optional[str] = None) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Siradaki olasi cihazlar, oncelik sirasiyla: gorunen grid sayfasi, kullanicinin son
+    kullandigi cihazlar (audit log), kullanicinin cihaz bazli port izni olan cihazlar.
+    (cihaz, adom, vdom) listesi doner; vdom bilinmiyorsa None (ilk VDOM isitilir).
+    """
+    by_name = {d.get('name'): d for d in devices}
+    seen, result = set(), []
+
+    def add(name, vdom=None):
+        device = by_name.get(name)
+        if device is None or name == exclude or (name, vdom) in seen:
+            return
+        seen.add((name, vdom))
+        result.append((name, device.get('adom', 'root'), vdom))
+
+    for d in page_devices:
+        add(d.get('name'))
+    for name, vdom in recent:
+        add(name, vdom)
+
+    # Admin tum cihazlara yetkili; cihaz bazli kural sinyal tasimaz
+    if user is not None and user.username != "admin" and user.role != "Super_User":
+        matcher = user.get_port_matcher()
+        permitted = 0
+        for d in devices:
+            if permitted >= PERMITTED_LIMIT:
+                break
+            if matcher.rules_for_device(d.get('name')):
+                add(d.get('name'))
+                permitted += 1
+    return result
+
+
+def prefetch_devices(api, targets: Iterable[Tuple[str, str, Optional[str]]]) -> int:
+    """(cihaz, adom, vdom) hedeflerinin VDOM ve port verisini arka planda isitir. Kuyruga eklenen is sayisi."""
+    if not api:
+        return 0
+    prefetcher = get_prefetcher()
+    queued = 0
+    for name, adom, vdom in targets:
+        if prefetcher.submit((api.base_url, name, adom, vdom), DeviceService.warm, api, name, adom, vdom):
+            queued += 1
+    return queued
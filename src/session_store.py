@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Data directory for OpenShift persistence
+DATA_DIR = "data"
+SESSION_DB = os.path.join(DATA_DIR, "sessions.db")
+
+# Varsayilan limitler (Environment ile ezilebilir)
+SESSION_TTL = int(os.getenv("SESSION_TTL_SECONDS", 24 * 3600))  # Cookie omru ile ayni (1 gun)
+SESSION_IDLE_TIMEOUT = int(os.getenv("SESSION_IDLE_TIMEOUT_SECONDS", 8 * 3600))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", 10000))
+
+
+class SessionStore:
+    """SQLite (WAL) tabanli, sureli ve kapasite sinirli oturum deposu.
+
+    Oturumlar diskte tutuldugu icin pod restart'larinda kaybolmaz ve ayni
+    volume'u paylasan replikalar tarafindan okunabilir. Sik okunan tokenlar
+    kisa omurlu bir LRU bellek cache'inden dondurulur.
+    """
+
+    # Suresi dolmus oturumlar her N create isleminde bir temizlenir (amortize);
+    # kapasite siniri (max_entries) ise bellekte tutulan satir sayisiyla her create'te
+    # uygulanir. Sayi purge'de tablodan yeniden okunur (diger replikalarin yazdiklari).
+    PURGE_EVERY = 256
+
+    def __init__(self, db_path: str = SESSION_DB, ttl: int = SESSION_TTL,
+                 idle_timeout: int = SESSION_IDLE_TIMEOUT,
+                 max_entries: int = SESSION_MAX_ENTRIES,
+                 cache_size: int = 1024, cache_ttl: float = 5.0,
+                 touch_interval: float = 60.0):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.idle_timeout = idle_timeout
+        self.max_entries = max_entries
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.touch_interval = touch_interval
+
+        self._conn = None
+        self._lock = threading.RLock()
+        # Token -> (row_dict, cached_at)
+        self._cache = OrderedDict()
+        self._creates_since_purge = 0
+        self._rows = 0  # sessions tablosundaki satir sayisi (baglantida okunur)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Baglantiyi ilk kullanimda acar ve semayi hazirlar."""
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir and not os.path.exists(db_dir):
+                os.makedirs(db_dir, exist_ok=True)
+
+            conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    token TEXT PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(username)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_seen ON sessions(last_seen)")
+            self._rows = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    # --- Cache Helpers ---
+    def _cache_put(self, token: str, row: Dict[str, Any]):
+        self._cache[token] = (row, time.time())
+        self._cache.move_to_end(token)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _cache_get(self, token: str) -> Optional[Dict[str, Any]]:
+        item = self._cache.get(token)
+        if not item:
+            return None
+        row, cached_at = item
+        # Diger replikalardaki logout'lari kacirmamak icin cache kisa omurlu
+        if time.time() - cached_at > self.cache_ttl:
+            del self._cache[token]
+            return None
+        self._cache.move_to_end(token)
+        return row
+
+    def _is_expired(self, row: Dict[str, Any], now: float) -> bool:
+        return now >= row["expires_at"] or (now - row["last_seen"]) > self.idle_timeout
+
+    def _evict_overflow(self, conn: sqlite3.Connection) -> int:
+        """Kapasite fazlasi oturumlari (en eski erisim) siler. Lock altinda cagrilir."""
+        overflow = self._rows - self.max_entries
+        if overflow <= 0:
+            return 0
+        tokens = [r[0] for r in conn.execute(
+            "SELECT token FROM sessions ORDER BY last_seen ASC LIMIT ?", (overflow,)
+        )]
+        self._rows -= conn.executemany("DELETE FROM sessions WHERE token = ?", [(t,) for t in tokens]).rowcount
+        # Cache'te silinmis token kalmasin
+        for t in tokens:
+            self._cache.pop(t, None)
+        return len(tokens)
+
+    # --- Public API ---
+    def create(self, username: str, payload: Dict[str, Any]) -> str:
+        """Yeni oturum olusturur ve token doner."""
+        token = str(uuid.uuid4())
+        now = time.time()
+        row = {
+            "username": username,
+            "payload": payload,
+            "created_at": now,
+            "last_seen": now,
+            "expires_at": now + self.ttl
+        }
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO sessions (token, username, payload, created_at, last_seen, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (token, username, json.dumps(payload), now, now, row["expires_at"])
+            )
+            self._rows += 1
+            self._cache_put(token, row)
+
+            self._creates_since_purge += 1
+            if self._creates_since_purge >= self.PURGE_EVERY:
+                self.purge()
+            else:
+                self._evict_overflow(conn)
+        return token
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Token gecerliyse oturum kaydini doner, degilse None."""
+        if not token:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._cache_get(token)
+            if row is None:
+                cur = self._connect().execute(
+                    "SELECT username, payload, created_at, last_seen, expires_at FROM sessions WHERE token = ?",
+                    (token,)
+                )
+                rec = cur.fetchone()
+                if not rec:
+                    return None
+                row = {
+                    "username": rec[0],
+                    "payload": json.loads(rec[1]),
+                    "created_at": rec[2],
+                    "last_seen": rec[3],
+                    "expires_at": rec[4]
+                }
+
+            if self._is_expired(row, now):
+                self.delete(token)
+                return None
+
+            # Idle timeout icin son erisim zamanini guncelle (Her rerun'da yazmamak icin seyrek)
+            if now - row["last_seen"] >= self.touch_interval:
+                row = dict(row, last_seen=now)
+                self._connect().execute("UPDATE sessions SET last_seen = ? WHERE token = ?", (now, token))
+
+            self._cache_put(token, row)
+            return row
+
+    def delete(self, token: str):
+        """Tek bir oturumu siler."""
+        with self._lock:
+            self._cache.pop(token, None)
+            self._rows -= self._connect().execute("DELETE FROM sessions WHERE token = ?", (token,)).rowcount
+
+    def delete_user(self, username: str):
+        """Kullaniciya ait tum oturumlari siler."""
+        with self._lock:
+            for t in [t for t, (row, _) in self._cache.items() if row["username"] == username]:
+                del self._cache[t]
+            self._rows -= self._connect().execute("DELETE FROM sessions WHERE username = ?", (username,)).rowcount
+
+    def purge(self) -> int:
+        """Suresi dolmus oturumlari ve kapasite fazlasini (en eski erisim) temizler."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            removed = conn.execute(
+                "DELETE FROM sessions WHERE expires_at <= ? OR last_seen < ?",
+                (now, now - self.idle_timeout)
+            ).rowcount
+
+            self._rows = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            removed += self._evict_overflow(conn)
+
+            self._creates_since_purge = 0
+            if removed:
+                logger.info(f"Session Store: {removed} expired/evicted session(s) purged.")
+            return removed
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._cache.clear()
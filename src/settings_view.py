@@ -2,10 +2,12 @@ import streamlit as st
 import pandas as pd
 import json
 import time
+import datetime
 import base64
 from config_service import ConfigService
 from auth_service import AuthService
 from system_service import SystemService
+from port_rules import compact_port_list, GROUP_PREFIX
 
 def render_permission_manager(data_obj, unique_key):
     """
@@ -28,6 +30,15 @@ def render_permission_manager(data_obj, unique_key):
 
     # -- MEVCUT YETKILER --
     with st.expander("Mevcut Yetkileri Görüntüle / Düzenle", expanded=True):
+        # Acik port listelerini araliklara cevir (port1, port2, ... port48 -> port{1-48})
+        if st.button("🗜️ Kuralları Sıkıştır", key=f"compact_{unique_key}", help="Ardışık port isimlerini aralık kuralına (örn: port{1-48}) dönüştürerek konfigürasyonu küçültür."):
+            data_obj["global_allowed_ports"] = compact_port_list(data_obj.get("global_allowed_ports", []))
+            data_obj["device_allowed_ports"] = {
+                dev: compact_port_list(ports) for dev, ports in data_obj.get("device_allowed_ports", {}).items()
+            }
+            ConfigService.save_config(st.session_state.saved_config)
+            st.rerun()
+
         # A. Global
         global_ports = data_obj.get("global_allowed_ports", [])
         st.markdown("**🌍 Global İzinler (Tüm Cihazlar)**")
@@ -87,6 +98,14 @@ def render_permission_manager(data_obj, unique_key):
                                 
                         s_ports = st.multiselect("İzin Verilecek Portları Seçin", filtered_names, key=f"perm_ports_{unique_key}")
                         
+                        # Desen Kurallari: aralik (port{1-48}) ve wildcard (vlan*, internal*)
+                        pattern_str = st.text_input("Desen Kuralları (Opsiyonel)", key=f"perm_patterns_{unique_key}", placeholder="port{1-48}, vlan*, internal*", help="Virgülle ayırın. Aralık (port{1-48}) ve wildcard (vlan*) desteklenir.")
+                        s_ports = s_ports + [p.strip() for p in pattern_str.split(",") if p.strip()]
+                        
+                        groups = st.session_state.saved_config.get("device_groups", {})
+                        scope_opts = [s_dev] + [f"{GROUP_PREFIX}{g}" for g in groups]
+                        s_scope = st.selectbox("Cihaz Kapsamı", scope_opts, key=f"perm_scope_{unique_key}", help="Seçili cihaz veya '@' ile başlayan bir cihaz grubu.")
+                        
                         is_global = st.checkbox("🌍 Bu port iznini TÜM CİHAZLAR için (Global) uygula", key=f"perm_glob_{unique_key}", help="İşaretlenirse, seçilen port isimleri sistemdeki tüm cihazlarda yetkili kılınır.")
                         
                         if st.button("Yetkiyi Ekle", key=f"save_perm_btn_{unique_key}", type="primary"):
@@ -102,10 +121,10 @@ def render_permission_manager(data_obj, unique_key):
                                 else:
                                     # Device Merge
                                     if "device_allowed_ports" not in data_obj: data_obj["device_allowed_ports"] = {}
-                                    current_dev_ports = data_obj["device_allowed_ports"].get(s_dev, [])
+                                    current_dev_ports = data_obj["device_allowed_ports"].get(s_scope, [])
                                     updated_dev_ports = list(set(current_dev_ports + s_ports))
-                                    data_obj["device_allowed_ports"][s_dev] = updated_dev_ports
-                                    msg = f"{s_dev} için yetki eklendi!"
+                                    data_obj["device_allowed_ports"][s_scope] = updated_dev_ports
+                                    msg = f"{s_scope} için yetki eklendi!"
                                 
                                 ConfigService.save_config(st.session_state.saved_config)
                                 st.success(msg)
@@ -116,6 +135,27 @@ def render_permission_manager(data_obj, unique_key):
         st.warning("⚠️ Port listesi için FortiManager bağlantısı gereklidir.")
 
 
+def render_backfill_progress():
+    """SIEM backfill ilerlemesini gosterir (fragment olarak periyodik calisir)."""
+    from log_service import LogService
+    backfill = LogService.get_siem_backfill()
+    status = backfill.status()
+    state = status.get("state", "idle")
+    if state == "idle":
+        return
+
+    total = status.get("total") or 0
+    sent = status.get("sent", 0)
+    labels = {"running": "Aktarılıyor", "paused": "Duraklatıldı", "done": "Tamamlandı", "error": "Hata"}
+    st.progress(min(1.0, sent / total) if total else 1.0, text=f"{labels.get(state, state)}: {sent} / {total} kayıt")
+    if state == "error":
+        st.error(f"Aktarım hatası: {status.get('error')} (Devam Et ile kaldığı yerden sürdürülebilir)")
+    # Is bittiyse tam rerun ile periyodik yenilemeyi durdur
+    if state != "running" and not backfill.is_running() and st.session_state.get("bf_was_running"):
+        st.session_state.bf_was_running = False
+        st.rerun()
+    st.session_state.bf_was_running = backfill.is_running()
+
 def render_settings():
     st.header("⚙️ Sistem Yapılandırması")
     
@@ -138,10 +178,9 @@ def render_settings():
         
         if st.button("🔄 Durumu Yenile", use_container_width=True):
             with st.spinner("Kontrol ediliyor..."):
-                st.session_state.health_checks = {
-                    "fmg": {"status": "pending", "message": "Refreshing..."},
-                    "ldap": {"status": "pending", "message": "Refreshing..."}
-                }
+                SystemService.start_health_checks(force=True)
+                SystemService.wait_health_checks(timeout=15)
+                st.session_state.health_checks = SystemService.get_health_checks()
                 st.rerun()
 
     user = AuthService.get_current_user()
@@ -178,7 +217,7 @@ def render_settings():
         if new_pass_1 or new_pass_2:
             if new_pass_1 == new_pass_2:
                 if new_pass_1:
-                    acc['password'] = new_pass_1
+                    acc['password'] = AuthService.hash_password(new_pass_1, AuthService.get_bcrypt_rounds(cfg))
                     st.success("✅ Şifre güncellenecek.")
                     pass_update_ready = True
             else:
@@ -283,6 +322,7 @@ def render_settings():
                 port = 636 if use_ssl else 389
                 c_pi.info(f"Port: {port}")
                 base_dn = st.text_input("Base DN", value=ldap_cfg.get("base_dn", ""), disabled=not can_edit)
+                nested_groups = st.toggle("İç İçe (Nested) Grupları Çöz", value=ldap_cfg.get("nested_groups", True), disabled=not can_edit, help="Açıkken kullanıcının dolaylı üye olduğu üst gruplar da eşleştirmede kullanılır. Sonuçlar önbelleğe alınır.")
                 
                 if st.button("💾 LDAP Ayarlarını Kaydet", type="primary", use_container_width=True, disabled=not can_edit):
                     final_servers = [s.strip() for s in st.session_state.temp_servers if s.strip()]
@@ -293,7 +333,8 @@ def render_settings():
                         "servers": final_servers, 
                         "port": port, 
                         "use_ssl": use_ssl, 
-                        "base_dn": base_dn
+                        "base_dn": base_dn,
+                        "nested_groups": nested_groups
                     })
                     ConfigService.save_config(disk_cfg)
                     st.session_state.saved_config = disk_cfg
@@ -412,13 +453,30 @@ def render_settings():
                         ConfigService.save_config(disk_cfg)
                         st.session_state.saved_config = disk_cfg
                         st.rerun()
+                with st.expander("🗂️ Cihaz Grupları"):
+                    st.caption("Her satıra bir grup: `Grup = FW01, FW-ANK-*`. Port izinlerinde `@Grup` olarak kullanılır.")
+                    groups_txt = "\n".join(f"{g} = {', '.join(m)}" for g, m in cfg.get("device_groups", {}).items())
+                    new_groups_txt = st.text_area("Gruplar", value=groups_txt, label_visibility="collapsed", disabled=not can_edit)
+                    if st.button("Grupları Kaydet", disabled=not can_edit):
+                        new_groups = {}
+                        for line in new_groups_txt.splitlines():
+                            if "=" not in line: continue
+                            g_name, g_members = line.split("=", 1)
+                            if g_name.strip():
+                                new_groups[g_name.strip()] = [m.strip() for m in g_members.split(",") if m.strip()]
+                        disk_cfg = ConfigService.load_config()
+                        disk_cfg["device_groups"] = new_groups
+                        ConfigService.save_config(disk_cfg)
+                        st.session_state.saved_config = disk_cfg
+                        st.rerun()
                 with st.expander("➕ Add User"):
                     un = st.text_input("Kullanıcı")
                     up = st.text_input("Şifre ", type="password")
                     upr = st.selectbox("Profil ", [p['name'] for p in cfg.get("admin_profiles", [])])
                     if st.button("Kullanıcıyı Kaydet"):
                         disk_cfg = ConfigService.load_config()
-                        disk_cfg.get("local_accounts", []).append({"user": un, "profile": upr, "password": up})
+                        hashed_pw = AuthService.hash_password(up, AuthService.get_bcrypt_rounds(disk_cfg))
+                        disk_cfg.get("local_accounts", []).append({"user": un, "profile": upr, "password": hashed_pw})
                         ConfigService.save_config(disk_cfg)
                         st.session_state.saved_config = disk_cfg
                         st.rerun()
@@ -530,6 +588,11 @@ def render_settings():
         else:
             st.caption("Uygulama audit loglarının gerçek zamanlı olarak bir SIEM ürününe (Syslog üzerinden) gönderilmesi.")
         
+        if enabled:
+            backlog = LogService.get_siem_backlog()
+            if backlog > 0:
+                st.caption(f"📮 Teslim bekleyen SIEM kuyruğu: {backlog / 1024:.1f} KB (bağlantı gelince otomatik gönderilir)")
+
         is_siem_enabled = st.toggle("SIEM Gönderimini Aktif Et", value=enabled, disabled=not can_edit)
         
         with st.container(border=True):
@@ -538,14 +601,25 @@ def render_settings():
             siem_host = c_host.text_input("Syslog Sunucu IP/Host", value=siem_cfg.get("server", ""), placeholder="192.168.1.100", disabled=not can_edit)
             siem_port = c_port.number_input("Port", value=siem_cfg.get("port", 514), step=1, disabled=not can_edit)
             siem_proto = c_proto.selectbox("Protokol", options=["UDP", "TCP"], index=0 if siem_cfg.get("protocol") == "UDP" else 1, disabled=not can_edit)
+            fmt_options = ["json", "rfc5424", "cef"]
+            siem_format = st.selectbox(
+                "Mesaj Formatı", options=fmt_options,
+                index=fmt_options.index(siem_cfg.get("format", "json")) if siem_cfg.get("format", "json") in fmt_options else 0,
+                format_func=lambda f: {"json": "JSON Lines", "rfc5424": "Syslog (RFC 5424)", "cef": "CEF (ArcSight)"}[f],
+                help="TCP'de syslog formatları RFC 6587 octet-counting ile çerçevelenir ve toplu gönderilir.",
+                disabled=not can_edit
+            )
             
         if st.button("💾 SIEM Ayarlarını Kaydet", type="primary", disabled=not can_edit):
             disk_cfg = ConfigService.load_config()
+            # Formda olmayan ayarlar (Orn: replay_rate) korunur
             disk_cfg["siem_settings"] = {
+                **disk_cfg.get("siem_settings", {}),
                 "enabled": is_siem_enabled,
                 "server": siem_host,
                 "port": int(siem_port),
-                "protocol": siem_proto
+                "protocol": siem_proto,
+                "format": siem_format
             }
             ConfigService.save_config(disk_cfg)
             st.session_state.saved_config = disk_cfg
@@ -553,7 +627,7 @@ def render_settings():
             time.sleep(1)
             st.rerun()
             
-        col_test, col_export = st.columns(2)
+        col_test, _ = st.columns(2)
         
         if col_test.button("🧪 Test Logu Gönder", disabled=not can_edit, use_container_width=True):
             if not siem_host:
@@ -566,7 +640,8 @@ def render_settings():
                         user.username, 
                         siem_host, 
                         int(siem_port), 
-                        siem_proto
+                        siem_proto,
+                        siem_format
                     )
                     
                     if success:
@@ -575,12 +650,32 @@ def render_settings():
                     else:
                         st.error(msg)
 
-        if col_export.button("📤 Geçmiş Logları Aktar (CSV -> SIEM)", disabled=not can_edit, use_container_width=True, help="Sistemde kayıtlı olan tüm geçmiş logları (CSV) yapılandırılmış SIEM sunucusuna toplu olarak gönderir."):
+        # --- GECMIS LOG AKTARIMI (Backfill): arka planda, hiz sinirli, kaldigi yerden devam eder ---
+        with st.expander("📤 Geçmiş Logları Aktar (Audit Store -> SIEM)"):
             from log_service import LogService
-            if not siem_cfg.get("enabled"):
-                st.warning("Lütfen önce SIEM gönderimini aktif edip ayarları kaydedin.")
-            else:
-                with st.spinner("Geçmiş loglar aktarılıyor..."):
-                    success, msg = LogService.export_past_logs_to_siem()
+            st.caption("Kayıtlar arka planda, belirlenen hızda gönderilir. Duraklatılan veya yarıda kalan aktarım aynı aralık için kaldığı yerden devam eder.")
+            c_range, c_rate = st.columns([3, 1])
+            all_history = c_range.checkbox("Tüm geçmiş", value=True, key="bf_all", disabled=not can_edit)
+            bf_start, bf_end = None, None
+            if not all_history:
+                today = datetime.date.today()
+                rng = c_range.date_input("Tarih Aralığı", value=(today - datetime.timedelta(days=30), today), key="bf_range", disabled=not can_edit)
+                if isinstance(rng, (list, tuple)) and len(rng) == 2:
+                    bf_start = rng[0].strftime("%Y-%m-%d")
+                    bf_end = (rng[1] + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+            bf_rate = c_rate.number_input("Hız (olay/sn)", min_value=1, max_value=10000, value=int(siem_cfg.get("backfill_rate", 200)), step=50, disabled=not can_edit)
+
+            c_run, c_pause = st.columns(2)
+            if c_run.button("▶️ Başlat / Devam Et", disabled=not can_edit, use_container_width=True):
+                if not siem_cfg.get("enabled"):
+                    st.warning("Lütfen önce SIEM gönderimini aktif edip ayarları kaydedin.")
+                else:
+                    success, msg = LogService.start_siem_backfill(bf_start, bf_end, rate=bf_rate)
                     if success: st.success(msg)
-                    else: st.error(msg)
\ No newline at end of file
+                    else: st.error(msg)
+            if c_pause.button("⏸️ Duraklat", disabled=not can_edit, use_container_width=True):
+                LogService.stop_siem_backfill()
+
+            running = LogService.get_siem_backfill().is_running()
+            # Yalnizca aktarim surerken periyodik yenilenir; sayfanin geri kalani bloklanmaz
+            st.fragment(render_backfill_progress, run_every=2 if running else None)()
\ No newline at end of file
@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Callable, List, Optional
+from cache_utils import TokenBucket
+from audit_store import AuditStore, LOG_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Data directory for OpenShift persistence
+DATA_DIR = "data"
+CHECKPOINT_FILE = os.path.join(DATA_DIR, "siem_backfill.json")
+
+STATE_IDLE = "idle"
+STATE_RUNNING = "running"
+STATE_PAUSED = "paused"
+STATE_DONE = "done"
+STATE_ERROR = "error"
+
+
+class SiemBackfill:
+    """
+    Gecmis audit kayitlarini SIEM'e arka planda, hiz sinirli ve kaldigi yerden
+    devam edebilir sekilde aktarir.
+
+    Kayitlar audit store'dan (ts, id) sirasiyla parti parti okunur; her parti
+    gonderildikten sonra son (ts, id) checkpoint dosyasina yazilir. Ayni zaman
+    araligi icin tekrar baslatilirsa checkpoint'ten devam edilir.
+    """
+
+    MAX_RETRIES = 3
+
+    def __init__(self, store: AuditStore, sender: Callable[[List[dict]], None],
+                 checkpoint_path: str = CHECKPOINT_FILE):
+        self.store = store
+        self.sender = sender
+        self.checkpoint_path = checkpoint_path
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._state = self._load_checkpoint() or {"state": STATE_IDLE}
+        # Onceki process calisirken kapandiysa devam ettirilebilir durumdadir
+        if self._state.get("state") == STATE_RUNNING:
+            self._state["state"] = STATE_PAUSED
+
+    # --- Checkpoint ---
+    def _load_checkpoint(self) -> Optional[dict]:
+        try:
+            with open(self.checkpoint_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_checkpoint(self):
+        ckpt_dir = os.path.dirname(self.checkpoint_path)
+        if ckpt_dir and not os.path.exists(ckpt_dir):
+            os.makedirs(ckpt_dir, exist_ok=True)
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._state, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    def _update(self, **changes):
+        with self._lock:
+            self._state.update(changes, updated_at=time.time())
+            self._save_checkpoint()
+
+    # --- Public API ---
+    def status(self) -> dict:
+        """Ilerleme bilgisi (state, sent, total, start, end, error ...)."""
+        with self._lock:
+            return dict(self._state)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, start: Optional[str] = None, end: Optional[str] = None, rate: float = 200.0,
+              batch_size: int = 100) -> bool:
+        """
+        Aktarimi baslatir. Ayni aralik icin yarim kalmis bir is varsa oradan devam eder.
+        Zaten calisiyorsa False doner.
+        """
+        if self.is_running():
+            return False
+
+        with self._lock:
+            prev = self._state
+            resume = (prev.get("state") in (STATE_PAUSED, STATE_ERROR) and
+                      prev.get("start") == start and prev.get("end") == end and prev.get("last"))
+            if not resume:
+                self._state = {"start": start, "end": end, "sent": 0, "last": None, "started_at": time.time()}
+            self._state.update(state=STATE_RUNNING, error=None, rate=rate,
+                               total=self.store.count(start=start, end=end))
+            self._save_checkpoint()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(float(rate), int(batch_size)),
+                                        name="siem-backfill", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Aktarimi duraklatir; checkpoint korunur."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _send_with_retry(self, records: List[dict]):
+        delay = 1.0
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                self.sender(records)
+                return
+            except Exception as e:
+                if attempt == self.MAX_RETRIES - 1 or self._stop.wait(delay):
+                    raise
+                logger.warning(f"SIEM Backfill: send failed ({e}), retrying in {delay:.0f}s.")
+                delay *= 2
+
+    def _run(self, rate: float, batch_size: int):
+        # Kova en fazla bir parti kadar birikir: collector'a ani patlama gitmez
+        bucket = TokenBucket(rate, capacity=max(1.0, min(rate, batch_size)))
+        state = self.status()
+        after = tuple(state["last"]) if state.get("last") else None
+        try:
+            for rows in self.store.iter_rows(batch_size=batch_size, ascending=True, after=after,
+                                             include_id=True, start=state.get("start"), end=state.get("end")):
+                if not bucket.acquire(len(rows), stop_event=self._stop):
+                    break
+                self._send_with_retry([dict(zip(LOG_COLUMNS, r[:5])) for r in rows])
+                last = rows[-1]
+                self._update(sent=self.status()["sent"] + len(rows), last=[last[0], last[5]])
+                if self._stop.is_set():
+                    break
+            else:
+                self._update(state=STATE_DONE)
+                logger.info(f"SIEM Backfill: completed, {self.status()['sent']} record(s) sent.")
+                return
+            self._update(state=STATE_PAUSED)
+        except Exception as e:
+            logger.error(f"SIEM Backfill: stopped with error: {e}")
+            self._update(state=STATE_ERROR, error=str(e))
@@ -0,0 +1,138 @@
+import json
+import socket
+import datetime
+from typing import Dict
+
+# SIEM mesaj formatlari.
+#   json    : Her olay tek satir JSON (varsayilan, onceki davranis)
+#   rfc5424 : Syslog (RFC 5424) basligi + structured data
+#   cef     : ArcSight Common Event Format
+# TCP uzerinde syslog formatlari RFC 6587 octet-counting ile, JSON ise satir sonu ile ayrilir.
+
+FORMAT_JSON = "json"
+FORMAT_RFC5424 = "rfc5424"
+FORMAT_CEF = "cef"
+
+FRAMING_NEWLINE = "newline"
+FRAMING_OCTET = "octet"
+
+APP_NAME = "forticam"
+# RFC 5612 dokumantasyon PEN'i; kendi PEN'iniz varsa sd_id ile degistirin
+DEFAULT_SD_ID = "forticam@32473"
+
+# Syslog: facility 13 (log audit), severity 5 (notice)
+DEFAULT_FACILITY = 13
+DEFAULT_SEVERITY = 5
+
+
+def _utc_now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+# CEF 'rt' icin Ingilizce ay kisaltmalari (strftime('%b') locale'e baglidir)
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+class JsonFormatter:
+    framing = FRAMING_NEWLINE
+
+    def format(self, record: dict) -> bytes:
+        return json.dumps(record).encode('utf-8')
+
+
+class Rfc5424Formatter:
+    """
+    <PRI>1 TIMESTAMP HOST APP PROCID MSGID [SD] MSG
+    Sabit kisimlar (PRI, HOST, APP) bir kez hesaplanir; olay basina yalnizca
+    zaman, MSGID, SD ve mesaj eklenir.
+    """
+    framing = FRAMING_OCTET
+
+    _SD_ESCAPE = str.maketrans({'\\': '\\\\', '"': '\\"', ']': '\\]'})
+
+    def __init__(self, hostname: str = None, app_name: str = APP_NAME, sd_id: str = DEFAULT_SD_ID,
+                 facility: int = DEFAULT_FACILITY, severity: int = DEFAULT_SEVERITY):
+        host = self._header_token(hostname or socket.gethostname(), 255)
+        app = self._header_token(app_name, 48)
+        self._pri = f"<{facility * 8 + severity}>1 "
+        self._host_app = f" {host} {app} - "
+        self._sd_open = f"[{sd_id}"
+
+    @staticmethod
+    def _header_token(value, max_len: int) -> str:
+        # Baslik alanlari bosluksuz, yazdirilabilir ASCII olmali
+        token = "".join(ch if 33 <= ord(ch) <= 126 else "_" for ch in str(value or ""))[:max_len]
+        return token or "-"
+
+    def format(self, record: dict) -> bytes:
+        msgid = self._header_token(record.get("Action"), 32)
+        params = " ".join(
+            f'{name}="{str(record.get(key, "")).translate(self._SD_ESCAPE)}"'
+            for name, key in (("user", "User"), ("device", "Device"), ("action", "Action"), ("eventTime", "Timestamp"))
+        )
+        # Baslik zamani gonderim anidir; olayin kendi zamani SD icindeki eventTime'dadir
+        line = f"{self._pri}{_utc_now()}{self._host_app}{msgid} {self._sd_open} {params}] {record.get('Details', '')}"
+        return line.encode('utf-8')
+
+
+class CefFormatter:
+    """CEF:0|Vendor|Product|Version|SignatureID|Name|Severity|Extension"""
+    framing = FRAMING_OCTET
+
+    _HEADER_ESCAPE = str.maketrans({'\\': '\\\\', '|': '\\|', '\n': ' ', '\r': ' '})
+    _EXT_ESCAPE = str.maketrans({'\\': '\\\\', '=': '\\=', '\n': '\\n', '\r': '\\r'})
+
+    def __init__(self, vendor: str = "FortiCam", product: str = "FortiCam", version: str = "1.0",
+                 severity: int = 3):
+        self._prefix = "CEF:0|{}|{}|{}|".format(*(str(v).translate(self._HEADER_ESCAPE) for v in (vendor, product, version)))
+        self._severity = f"|{severity}|"
+
+    @staticmethod
+    def _receipt_time(timestamp) -> str:
+        """
+        'rt' CEF'te epoch ms veya 'MMM dd yyyy HH:mm:ss' olmali. Audit zamani ofsetsiz
+        yerel saattir ('%Y-%m-%d %H:%M:%S'); duvar saati korunarak ikinci bicime cevrilir.
+        Ayristirilamazsa gonderim ani (epoch ms) kullanilir.
+        """
+        try:
+            ts = datetime.datetime.strptime(str(timestamp), "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            return str(int(datetime.datetime.now(datetime.timezone.utc).timestamp() * 1000))
+        return f"{_MONTHS[ts.month - 1]} {ts:%d %Y %H:%M:%S}"
+
+    def format(self, record: dict) -> bytes:
+        action = str(record.get("Action", "")).translate(self._HEADER_ESCAPE)
+        ext = " ".join(
+            f"{name}={str(record.get(key, '')).translate(self._EXT_ESCAPE)}"
+            for name, key in (("suser", "User"), ("dhost", "Device"), ("msg", "Details"))
+        )
+        rt = self._receipt_time(record.get("Timestamp"))
+        return f"{self._prefix}{action}|{action}{self._severity}rt={rt} {ext}".encode('utf-8')
+
+
+FORMATTERS = {
+    FORMAT_JSON: JsonFormatter,
+    FORMAT_RFC5424: Rfc5424Formatter,
+    FORMAT_CEF: CefFormatter,
+}
+
+_FORMATTER_CACHE: Dict[tuple, object] = {}
+
+
+def get_formatter(name: str = FORMAT_JSON, **kwargs):
+    """Formatter ornegini doner (ayni ayarlar icin tekrar olusturulmaz)."""
+    name = (name or FORMAT_JSON).lower()
+    if name not in FORMATTERS:
+        raise ValueError(f"Unknown SIEM format: {name}")
+    key = (name, tuple(sorted(kwargs.items())))
+    formatter = _FORMATTER_CACHE.get(key)
+    if formatter is None:
+        formatter = _FORMATTER_CACHE[key] = FORMATTERS[name](**kwargs)
+    return formatter
+
+
+def frame(payload: bytes, framing: str) -> bytes:
+    """TCP akisi icin mesaj cercevesi (RFC 6587)."""
+    if framing == FRAMING_OCTET:
+        return str(len(payload)).encode('ascii') + b" " + payload
+    return payload + b"\n"
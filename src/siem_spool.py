@@ -0,0 +1,281 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Data directory for OpenShift persistence
+DATA_DIR = "data"
+SPOOL_DIR = os.path.join(DATA_DIR, "siem_spool")
+ACK_FILE = "ack.json"
+SEGMENT_SUFFIX = ".spool"
+
+DEFAULT_SEGMENT_BYTES = 4 * 1024 * 1024
+DEFAULT_MAX_SPOOL_BYTES = 256 * 1024 * 1024
+
+# Spool icindeki konum: (segment_no, byte_offset)
+Position = Tuple[int, int]
+
+
+class SiemSpool:
+    """
+    SIEM icin diske yazilan, segmentli (append-only, JSON lines) giden kutusu.
+
+    Teslim edilen son kaydin konumu ack dosyasinda saklanir; restart veya
+    kesinti sonrasi yalnizca teslim edilmemis kuyruk (tail) tekrar okunur.
+    Tamamen teslim edilmis segmentler silinir. Toplam boyut max_bytes'i
+    asarsa en eski segmentler (uyari ile) atilir.
+    """
+
+    def __init__(self, spool_dir: str = SPOOL_DIR, segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+                 max_bytes: int = DEFAULT_MAX_SPOOL_BYTES):
+        self.spool_dir = spool_dir
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        os.makedirs(spool_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._fh = None
+        self._segments = self._scan_segments() or [1]
+        self._ack = self._load_ack()
+
+    # --- Dosya Yardimcilari ---
+    def _path(self, seg: int) -> str:
+        return os.path.join(self.spool_dir, f"{seg:012d}{SEGMENT_SUFFIX}")
+
+    def _scan_segments(self) -> List[int]:
+        segs = []
+        for name in os.listdir(self.spool_dir):
+            if name.endswith(SEGMENT_SUFFIX):
+                try:
+                    segs.append(int(name[:-len(SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+        return sorted(segs)
+
+    def _size(self, seg: int) -> int:
+        try:
+            return os.path.getsize(self._path(seg))
+        except OSError:
+            return 0
+
+    def _load_ack(self) -> Position:
+        try:
+            with open(os.path.join(self.spool_dir, ACK_FILE), "r") as f:
+                data = json.load(f)
+            return int(data["segment"]), int(data["offset"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return self._segments[0], 0
+
+    def _save_ack(self):
+        path = os.path.join(self.spool_dir, ACK_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"segment": self._ack[0], "offset": self._ack[1]}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)  # Atomik: yarim yazilmis ack olmaz
+
+    def _writer(self):
+        if self._fh is None:
+            path = self._path(self._segments[-1])
+            self._fh = open(path, "ab")
+            # Onceki cokmeden kalan yarim satir, yeni kayitla birlesmesin
+            if self._fh.tell() > 0:
+                with open(path, "rb") as r:
+                    r.seek(-1, os.SEEK_END)
+                    if r.read(1) != b"\n":
+                        self._fh.write(b"\n")
+        return self._fh
+
+    def _roll(self):
+        fh = self._writer()
+        fh.flush()
+        os.fsync(fh.fileno())
+        fh.close()
+        self._fh = None
+        self._segments.append(self._segments[-1] + 1)
+
+    def _normalized_ack(self) -> Position:
+        seg, off = self._ack
+        if seg not in self._segments:
+            # Ack edilen segment silinmis (kapasite) -> mevcut ilk segmentten devam
+            later = [s for s in self._segments if s > seg]
+            seg, off = (later[0], 0) if later else (self._segments[-1], self._size(self._segments[-1]))
+        return seg, off
+
+    def _enforce_cap(self):
+        total = sum(self._size(s) for s in self._segments)
+        while total > self.max_bytes and len(self._segments) > 1:
+            seg = self._segments.pop(0)
+            size = self._size(seg)
+            os.remove(self._path(seg))
+            total -= size
+            logger.warning(f"SIEM Spool: capacity exceeded, dropped {size} bytes of undelivered events (segment {seg}).")
+
+    # --- Public API ---
+    def append(self, record: dict):
+        """Kaydi spool'a ekler (isletim sistemine flush edilir)."""
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            fh = self._writer()
+            if fh.tell() >= self.segment_bytes:
+                self._roll()
+                fh = self._writer()
+                self._enforce_cap()
+            fh.write(line)
+            fh.flush()
+
+    def read_batch(self, max_records: int = 100) -> List[Tuple[Optional[dict], Position]]:
+        """
+        Ack konumundan itibaren en fazla max_records kayit doner.
+        Her eleman (kayit, kayittan sonraki konum) ciftidir; bozuk satirlar
+        icin kayit None doner (yine de ack edilebilir).
+        """
+        items = []
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+            seg, off = self._normalized_ack()
+            while len(items) < max_records:
+                path = self._path(seg)
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        f.seek(off)
+                        while len(items) < max_records:
+                            line = f.readline()
+                            if not line.endswith(b"\n"):
+                                break  # EOF veya henuz tamamlanmamis satir
+                            off += len(line)
+                            try:
+                                record = json.loads(line)
+                            except ValueError:
+                                if line.strip():
+                                    logger.warning(f"SIEM Spool: skipping corrupt record in segment {seg}.")
+                                record = None
+                            items.append((record, (seg, off)))
+                if len(items) >= max_records or seg == self._segments[-1]:
+                    break
+                # Segment bitti, bir sonrakine gec
+                seg, off = next(s for s in self._segments if s > seg), 0
+                items.append((None, (seg, 0)))
+        return items
+
+    def ack(self, position: Position):
+        """Verilen konuma kadar olan kayitlari teslim edildi olarak isaretler."""
+        with self._lock:
+            self._ack = position
+            self._save_ack()
+            # Tamamen teslim edilmis segmentleri sil (aktif yazim segmenti haric)
+            while len(self._segments) > 1 and self._segments[0] < position[0]:
+                seg = self._segments.pop(0)
+                try:
+                    os.remove(self._path(seg))
+                except OSError:
+                    pass
+
+    def pending_bytes(self) -> int:
+        """Henuz teslim edilmemis veri miktari (byte)."""
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+            seg, off = self._normalized_ack()
+            return sum(self._size(s) for s in self._segments if s >= seg) - off
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+                os.fsync(self._fh.fileno())
+                self._fh.close()
+                self._fh = None
+
+
+class SiemForwarder:
+    """
+    Spool'u arka plan thread'inde SIEM'e bosaltir.
+    Gonderim hatasinda ustel geri cekilme (backoff) ile tekrar dener;
+    kesinti sonrasi birikmis kayitlari saniyede en fazla `rate` olay hiziyla gonderir.
+    """
+
+    def __init__(self, spool: SiemSpool, sender: Callable[[dict], None], rate: float = 500.0,
+                 batch_size: int = 100, backoff_initial: float = 1.0, backoff_max: float = 60.0,
+                 batch_sender: Optional[Callable[[List[dict]], None]] = None):
+        self.spool = spool
+        self.sender = sender
+        # Verilirse parti tek cagri ile gonderilir (TCP'de tek write); hata olursa parti tekrar denenir
+        self.batch_sender = batch_sender
+        self.rate = rate
+        self.batch_size = batch_size
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.last_error = None
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="siem-forwarder", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: dict):
+        """Kaydi spool'a yazar ve gonderici thread'i uyandirir."""
+        self.spool.append(record)
+        self._wake.set()
+
+    def wait_idle(self, timeout: float = 10.0) -> bool:
+        """Spool bosalana kadar bekler (test/shutdown icin)."""
+        deadline = time.monotonic() + timeout
+        while self.spool.pending_bytes() > 0:
+            if time.monotonic() >= deadline:
+                return False
+            self._wake.set()
+            time.sleep(0.02)
+        return True
+
+    def close(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self.spool.close()
+
+    def _run(self):
+        backoff = self.backoff_initial
+        while not self._stop.is_set():
+            self._wake.clear()
+            items = self.spool.read_batch(self.batch_size)
+            if not items:
+                self._wake.wait(1.0)
+                continue
+
+            delivered = None
+            sent = 0
+            try:
+                if self.batch_sender is not None:
+                    records = [r for r, _ in items if r is not None]
+                    if records:
+                        self.batch_sender(records)
+                    sent, delivered = len(records), items[-1][1]
+                else:
+                    for record, position in items:
+                        if record is not None:
+                            self.sender(record)
+                            sent += 1
+                        delivered = position
+            except Exception as e:
+                # Basarili kisim ack edilir; kalan kuyruk backoff sonrasi tekrar denenir
+                if delivered is not None:
+                    self.spool.ack(delivered)
+                self.last_error = str(e)
+                logger.warning(f"SIEM Forwarder: delivery failed ({e}), retrying in {backoff:.1f}s.")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.backoff_max)
+                continue
+
+            self.spool.ack(delivered)
+            self.last_error = None
+            backoff = self.backoff_initial
+            # Replay hiz limiti: parti, rate'e gore yayilir
+            if sent and self.rate > 0:
+                self._stop.wait(sent / self.rate)
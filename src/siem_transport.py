@@ -0,0 +1,148 @@
+import time
+import socket
+import logging
+import threading
+from typing import List, Tuple
+from cache_utils import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DNS_TTL = 300
+# TCP'de tek write ile gonderilecek azami parti boyutu
+MAX_TCP_WRITE = 64 * 1024
+# Process geneli DNS cache: (host, port) -> (ip, port)
+_DNS_CACHE = TTLCache(ttl=DEFAULT_DNS_TTL, max_entries=256)
+
+
+def resolve_address(server: str, port: int, ttl: float = DEFAULT_DNS_TTL) -> Tuple[str, int]:
+    """Sunucu adresini cozer; sonucu TTL suresince cache'ler."""
+    key = (server, int(port))
+    addr = _DNS_CACHE.get(key)
+    if addr is None:
+        infos = socket.getaddrinfo(server, int(port), socket.AF_INET)
+        addr = infos[0][4][:2]
+        _DNS_CACHE.set(key, addr, ttl)
+    return addr
+
+
+class SiemTransport:
+    """
+    SIEM/Syslog icin uzun omurlu gonderim kanali.
+    UDP soketi tekrar kullanilir; TCP baglantisi acik tutulur (keep-alive),
+    koptugunda bir kez yeniden baglanip tekrar denenir.
+    """
+
+    def __init__(self, server: str, port: int, protocol: str = "UDP",
+                 timeout: float = 2.0, dns_ttl: float = DEFAULT_DNS_TTL):
+        self.server = server
+        self.port = int(port)
+        self.protocol = "TCP" if str(protocol).upper() == "TCP" else "UDP"
+        self.timeout = timeout
+        self.dns_ttl = dns_ttl
+        self._sock = None
+        self._addr = None
+        self._resolved_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def key(self) -> Tuple[str, int, str]:
+        return self.server, self.port, self.protocol
+
+    def _open(self):
+        self._addr = resolve_address(self.server, self.port, self.dns_ttl)
+        self._resolved_at = time.monotonic()
+        if self.protocol == "UDP":
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            return
+
+        sock = socket.create_connection(self._addr, timeout=self.timeout)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # Linux: olu baglantilari ~1 dk icinde tespit et
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+        self._sock = sock
+
+    def _reset(self, forget_dns: bool = False):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        if forget_dns:
+            _DNS_CACHE.pop((self.server, self.port))
+
+    def _revalidate_address(self):
+        """
+        DNS TTL doldugunda adresi yeniden cozer. UDP'de gonderim hatasi olusmadigi icin
+        adres degisikligi ancak boyle fark edilir; TCP'de yeni adrese yeniden baglanilir.
+        Cozumleme basarisizsa eski adresle devam edilir (bir sonraki TTL'de tekrar denenir).
+        """
+        if time.monotonic() - self._resolved_at < self.dns_ttl:
+            return
+        self._resolved_at = time.monotonic()
+        try:
+            addr = resolve_address(self.server, self.port, self.dns_ttl)
+        except OSError as e:
+            logger.warning(f"SIEM transport: could not re-resolve {self.server}: {e}, keeping {self._addr}.")
+            return
+        if addr != self._addr:
+            logger.info(f"SIEM transport: {self.server} now resolves to {addr[0]} (was {self._addr[0]}).")
+            if self.protocol == "UDP":
+                self._addr = addr
+            else:
+                self._reset()
+
+    def _send_once(self, data: bytes):
+        if self._sock is not None:
+            self._revalidate_address()
+        if self._sock is None:
+            self._open()
+        if self.protocol == "UDP":
+            self._sock.sendto(data, self._addr)
+        else:
+            self._sock.sendall(data)
+
+    def send(self, data: bytes):
+        """Veriyi gonderir. Hata olursa baglanti (ve DNS) yenilenip bir kez daha denenir."""
+        with self._lock:
+            try:
+                self._send_once(data)
+            except OSError as e:
+                logger.warning(f"SIEM transport error ({self.server}:{self.port}/{self.protocol}): {e}, reconnecting.")
+                self._reset(forget_dns=True)
+                self._send_once(data)
+
+    def send_batch(self, messages: List[bytes]):
+        """
+        Birden cok mesaji gonderir. TCP'de (onceden cercevelenmis) mesajlar
+        MAX_TCP_WRITE boyutunda parcalar halinde tek write ile yazilir;
+        UDP'de her mesaj ayri datagramdir.
+        """
+        if self.protocol == "UDP":
+            chunks = messages
+        else:
+            chunks, buf, size = [], [], 0
+            for msg in messages:
+                if buf and size + len(msg) > MAX_TCP_WRITE:
+                    chunks.append(b"".join(buf))
+                    buf, size = [], 0
+                buf.append(msg)
+                size += len(msg)
+            if buf:
+                chunks.append(b"".join(buf))
+
+        with self._lock:
+            for chunk in chunks:
+                try:
+                    self._send_once(chunk)
+                except OSError as e:
+                    logger.warning(f"SIEM transport error ({self.server}:{self.port}/{self.protocol}): {e}, reconnecting.")
+                    self._reset(forget_dns=True)
+                    self._send_once(chunk)
+
+    def close(self):
+        with self._lock:
+            self._reset()
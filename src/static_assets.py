@@ -0,0 +1,107 @@
+import os
+import re
+import glob
+import base64
+import hashlib
+import logging
+import functools
+import mimetypes
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+# Kaynak CSS dosyalari (dogrudan servis edilmez)
+ASSETS_DIR = os.path.join(_SRC_DIR, "assets")
+# Streamlit static serving dizini (ana script'in yanindaki ./static); icerik calisma aninda uretilir
+STATIC_DIR = os.path.join(_SRC_DIR, "static")
+STATIC_URL = "app/static"
+
+
+def _resolve(path: str) -> Optional[str]:
+    """Goreli yolu calisma dizinine, bir ust dizine ya da proje kokune gore cozer."""
+    path = path.replace("\\", os.sep).replace("/", os.sep)
+    for candidate in (path, os.path.join("..", path), os.path.join(os.path.dirname(_SRC_DIR), path)):
+        if os.path.isfile(candidate):
+            return os.path.abspath(candidate)
+    return None
+
+
+def static_serving_enabled() -> bool:
+    try:
+        import streamlit as st
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+@functools.lru_cache(maxsize=64)
+def _publish(abs_path: str, mtime_ns: int, size: int) -> Optional[str]:
+    """Dosyayi icerik hash'li isimle static dizinine kopyalar; URL'yi doner."""
+    with open(abs_path, "rb") as f:
+        data = f.read()
+    stem, ext = os.path.splitext(os.path.basename(abs_path))
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "-", stem).strip("-") or "asset"
+    name = f"{slug}.{hashlib.sha256(data).hexdigest()[:12]}{ext.lower()}"
+    target = os.path.join(STATIC_DIR, name)
+
+    try:
+        if not os.path.exists(target):
+            os.makedirs(STATIC_DIR, exist_ok=True)
+            tmp = f"{target}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, target)
+            # Ayni varligin eski surumlerini temizle
+            stale = re.compile(rf"{re.escape(slug)}\.[0-9a-f]{{12}}{re.escape(ext.lower())}")
+            for old in glob.glob(os.path.join(STATIC_DIR, f"{glob.escape(slug)}.*")):
+                if old != target and stale.fullmatch(os.path.basename(old)):
+                    os.remove(old)
+    except OSError as e:
+        logger.warning(f"Static Assets: could not publish {abs_path}: {e}")
+        return None
+    return f"{STATIC_URL}/{name}"
+
+
+def asset_url(path: str) -> Optional[str]:
+    """
+    Varligin hash'li static URL'si (Orn: app/static/Background_M.3f2a9c1e0b7d.jpg).
+    Icerik degisince URL de degisir; tarayici cache'i guvenle kullanilir.
+    Static serving kapaliysa veya dosya yoksa None.
+    """
+    abs_path = _resolve(path)
+    if not abs_path or not static_serving_enabled():
+        return None
+    st_res = os.stat(abs_path)
+    return _publish(abs_path, st_res.st_mtime_ns, st_res.st_size)
+
+
+@functools.lru_cache(maxsize=16)
+def _data_uri(abs_path: str, mtime_ns: int) -> str:
+    mime = mimetypes.guess_type(abs_path)[0] or "application/octet-stream"
+    with open(abs_path, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode()}"
+
+
+def image_src(path: str) -> Optional[str]:
+    """<img src> / CSS url() icin kaynak: static URL, yoksa (static serving kapali) data URI."""
+    url = asset_url(path)
+    if url:
+        return url
+    abs_path = _resolve(path)
+    return _data_uri(abs_path, os.stat(abs_path).st_mtime_ns) if abs_path else None
+
+
+def stylesheet(name: str, extra_css: str = "") -> str:
+    """
+    assets/<name> stil dosyasi icin <style> blogu. Static serving aciksa yalnizca
+    @import referansi gonderilir; degilse icerik satir ici eklenir.
+    """
+    path = os.path.join(ASSETS_DIR, name)
+    url = asset_url(path)
+    if url:
+        css = f'@import url("{url}");'
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            css = f.read()
+    return f"<style>{css}{extra_css}</style>"
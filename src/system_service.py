@@ -1,7 +1,29 @@
 import os
+import time
 import base64
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 from OpenSSL import crypto
 from api_client import FortiManagerAPI
+from config_service import ConfigService
+from auth_service import AuthService
+
+logger = logging.getLogger(__name__)
+
+# Baslangic kontrolleri (DNS, FMG, LDAP, otomatik baglanti) process basina calisir;
+# sonuclar bu aralikla arka planda yenilenir (sn)
+HEALTH_REFRESH_SECONDS = 300
+AUTO_CONNECT_TIMEOUT = 2
+
+_HEALTH_LOCK = threading.Lock()
+_HEALTH_EXECUTOR = ThreadPoolExecutor(max_workers=3, thread_name_prefix="health")
+_HEALTH_CHECKS = {
+    "fmg": {"status": "pending", "message": "Not Checked"},
+    "ldap": {"status": "pending", "message": "Not Checked"}
+}
+_HEALTH_STATE = {"checked_at": None, "runner": None, "dns": None, "auto_connect": None}
 
 class SystemService:
     """Uygulamanın (Docker) sistem ayarlarını yönetir."""
@@ -72,3 +94,123 @@ class SystemService:
             return True, f"Sertifika başarıyla çıkarıldı: {cert_path}, {key_path}. Uygulamanın HTTPS ile açılması için restart gerekebilir."
         except Exception as e:
             return False, f"Sertifika işleme hatası: {e}"
+
+    # --- Baslangic kontrolleri (process geneli) ---
+    @staticmethod
+    def _fmg_health(ip, token) -> Dict[str, str]:
+        if not (ip and token):
+            return {"status": "warning", "message": "FMG Not Configured"}
+        try:
+            success, msg = SystemService.check_fmg_connectivity(ip, token)
+            return {"status": "success" if success else "error", "message": msg}
+        except Exception:
+            return {"status": "error", "message": "Check Failed"}
+
+    @staticmethod
+    def _ldap_health() -> Dict[str, str]:
+        try:
+            success, msg = AuthService.check_ldap_connectivity()
+            status = "success" if success else ("warning" if "Disabled" in msg else "error")
+            return {"status": status, "message": msg}
+        except Exception:
+            return {"status": "error", "message": "Check Failed"}
+
+    @staticmethod
+    def _auto_connect(ip, token) -> bool:
+        """(ip, token) ciftini dogrular; istemci saklanmaz (oturumlar kendi istemcisini olusturur)."""
+        try:
+            # Hizli baslangic icin kisa timeout
+            return FortiManagerAPI(ip, None, None, token, timeout=AUTO_CONNECT_TIMEOUT).login()
+        except Exception as e:
+            print(f"Auto-connect failed: {e}")
+            return False
+
+    @staticmethod
+    def _run_startup_checks():
+        cfg = ConfigService.load_config()
+        fmg_s = cfg.get("fmg_settings", {})
+        ip, token = fmg_s.get("ip"), fmg_s.get("token")
+
+        # 1. DNS (ag kontrollerinden once; ayni degerler process basina bir kez uygulanir)
+        dns = (cfg.get("primary_dns"), cfg.get("secondary_dns"))
+        if dns[0] and _HEALTH_STATE["dns"] != dns:
+            try:
+                SystemService.update_dns(*dns)
+                print(f"Startup DNS Applied: {dns[0]}, {dns[1]}")
+            except Exception as e:
+                print(f"Startup DNS Error: {e}")
+            _HEALTH_STATE["dns"] = dns
+
+        # 2. FMG, LDAP ve otomatik baglanti esanli (toplam sure: en yavas kontrol)
+        fmg_f = _HEALTH_EXECUTOR.submit(SystemService._fmg_health, ip, token)
+        ldap_f = _HEALTH_EXECUTOR.submit(SystemService._ldap_health)
+        auto_f = None
+        if ip and token and _HEALTH_STATE["auto_connect"] != (ip, token):
+            auto_f = _HEALTH_EXECUTOR.submit(SystemService._auto_connect, ip, token)
+
+        results = {"fmg": fmg_f.result(), "ldap": ldap_f.result()}
+        verified = auto_f.result() if auto_f else _HEALTH_STATE["auto_connect"] == (ip, token)
+        with _HEALTH_LOCK:
+            _HEALTH_CHECKS.update(results)
+            # Token iptal edildiyse / FMG erisilemiyorsa yeni oturumlar otomatik baglanmaz
+            ok = verified and results["fmg"]["status"] == "success"
+            _HEALTH_STATE["auto_connect"] = (ip, token) if ok else None
+            _HEALTH_STATE["checked_at"] = time.monotonic()
+
+    @staticmethod
+    def _startup_runner():
+        try:
+            SystemService._run_startup_checks()
+        except Exception as e:
+            logger.error(f"Startup checks failed: {e}")
+            with _HEALTH_LOCK:
+                _HEALTH_STATE["checked_at"] = time.monotonic()
+
+    @staticmethod
+    def start_health_checks(force: bool = False) -> bool:
+        """
+        Baslangic kontrollerini arka planda baslatir. Calisiyorsa veya sonuclar
+        HEALTH_REFRESH_SECONDS'dan yeniyse (force degilse) bir sey yapmaz.
+        Oturumlar beklemeden get_health_checks() ile son sonuclari okur.
+        """
+        with _HEALTH_LOCK:
+            runner = _HEALTH_STATE["runner"]
+            if runner is not None and runner.is_alive():
+                return False
+            checked_at = _HEALTH_STATE["checked_at"]
+            if not force and checked_at is not None and time.monotonic() - checked_at < HEALTH_REFRESH_SECONDS:
+                return False
+            runner = threading.Thread(target=SystemService._startup_runner, name="startup-checks", daemon=True)
+            _HEALTH_STATE["runner"] = runner
+            runner.start()
+        return True
+
+    @staticmethod
+    def wait_health_checks(timeout: float) -> bool:
+        """Calisan kontrollerin bitmesini bekler (Orn: 'Durumu Yenile')."""
+        runner = _HEALTH_STATE["runner"]
+        if runner is not None:
+            runner.join(timeout)
+            return not runner.is_alive()
+        return True
+
+    @staticmethod
+    def get_health_checks() -> Dict[str, Dict[str, str]]:
+        """Son kontrol sonuclari (ilk kontrol bitene kadar 'pending')."""
+        with _HEALTH_LOCK:
+            return {k: dict(v) for k, v in _HEALTH_CHECKS.items()}
+
+    @staticmethod
+    def get_auto_connect_api(cfg: dict) -> Optional[FortiManagerAPI]:
+        """
+        Konfigurasyondaki FMG (ip, token) arka planda dogrulandiysa oturuma ozel yeni
+        bir API istemcisi doner (yoksa None). Istemciler oturumlar arasinda paylasilmaz;
+        bir oturumun logout()'u digerlerini etkilemez.
+        """
+        fmg_s = cfg.get("fmg_settings", {})
+        ip, token = fmg_s.get("ip"), fmg_s.get("token")
+        with _HEALTH_LOCK:
+            verified = ip and token and _HEALTH_STATE["auto_connect"] == (ip, token)
+        if not verified:
+            return None
+        return FortiManagerAPI(ip, None, None, token, timeout=AUTO_CONNECT_TIMEOUT)
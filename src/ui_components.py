@@ -1,144 +1,68 @@
 import streamlit as st
-import os
-import base64
 import time
 import datetime
+import html
+import functools
 import extra_streamlit_components as stx
 from auth_service import AuthService
+from static_assets import image_src, stylesheet
 
 # Singleton Cookie Manager
 # st.cache_resource KALDIRILDI: Widget iceren fonksiyonlar cache'lenmemeli.
 def get_cookie_manager():
     return stx.CookieManager(key="cookie_manager")
 
-@st.cache_data(show_spinner=False)
-def get_base64_image(image_path):
-    """Görüntüyü base64 olarak önbelleğe alıp döndürür."""
-    if not image_path: return None
-    
-    # Normalize path safely using chr(92) for backslash to avoid SyntaxError
-    backslash = chr(92)
-    if backslash in image_path:
-        image_path = image_path.replace(backslash, os.sep)
-    # Replace forward slash with os.sep
-    if "/" in image_path:
-        image_path = image_path.replace("/", os.sep)
-    
-    if not os.path.exists(image_path):
-        # Farklı çalışma dizinleri için bir üst dizini kontrol et
-        parent_path = os.path.join("..", image_path)
-        if os.path.exists(parent_path):
-            image_path = parent_path
-        else:
-            return None
-
-    try:
-        with open(image_path, "rb") as f:
-            return base64.b64encode(f.read()).decode()
-    except:
-        return None
+# Cihaz kartinda gosterilen alanlar ve varsayilanlari (kart cache anahtari bunlardan olusur)
+DEVICE_CARD_FIELDS = (("name", ""), ("ip", "-"), ("platform_str", "FortiGate"), ("os_ver", "-"), ("conn_status", "0"))
+
+@functools.lru_cache(maxsize=4096)
+def _device_card_markup(record, selected):
+    """Kart HTML'i; ayni (kayit, secili) icin bir kez uretilir."""
+    name, ip, platform, version, conn_status = (html.escape(v) for v in record)
+    is_up = conn_status == '1'
+    status_color = "#15803d" if is_up else "#b91c1c"
+    status_text = "BAĞLI" if is_up else "KOPUK"
+
+    # Icon selection
+    icon = "🔥" # Default
+    if "40F" in platform: icon = "⚡"
+    elif "60F" in platform: icon = "🚀"
+    elif "VM" in platform: icon = "☁️"
+
+    accent = "border-left: 3px solid #5D5FEF; padding-left: 10px;" if selected else "padding-left: 13px;"
+    # Tek satir: girintili HTML markdown tarafindan kod blogu sanilir
+    return (
+        f'<div style="{accent}">'
+        f'<div style="display: flex; align-items: center; gap: 10px; margin-bottom: 10px;">'
+        f'<span style="font-size: 1.5rem;">{icon}</span><h4 style="margin: 0; padding: 0;">{name}</h4></div>'
+        f'<div style="color: gray; font-size: 0.875rem; margin-bottom: 6px;">📍 {ip}</div>'
+        f'<div style="margin-bottom: 6px;"><b>Model:</b> {platform} (v{version})</div>'
+        f'<div style="color: {status_color}; font-weight: 600;">● {status_text}</div>'
+        f'</div>'
+    )
 
 class UI:
     """UI bilesenlerini ve sayfa duzenini yonetir."""
 
+    @staticmethod
+    def device_card_markup(device, selected=False):
+        """Cihaz kartinin tum metin icerigi tek HTML blogu olarak (memoize edilir)."""
+        record = tuple(str(device.get(f) if device.get(f) is not None else default) for f, default in DEVICE_CARD_FIELDS)
+        return _device_card_markup(record, bool(selected))
+
     @staticmethod
     def set_bg_image(image_path):
-        """Arka plan resmini ayarlar."""
-        bin_str = get_base64_image(image_path)
-        if not bin_str:
+        """Tema stillerini ve arka plan resmini ayarlar (static serving ile yalnizca referans gonderilir)."""
+        src = image_src(image_path)
+        if not src:
             return
 
-        ext = os.path.splitext(image_path)[1].lower().replace(".", "")
-        if ext == "jpg": ext = "jpeg"
-        
-        # Safe string formatting
-        page_bg_img = """
-        <style>
-            /* Air-gap optimization: Removed external font import */
-            
-            html, body, [class*="css"] {
-                font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif;
-                color: #171717;
-            }
-
-            .stApp {
-                background-image: url("data:image/%s;base64,%s") !important;
-                background-size: cover !important;
-                background-position: center center !important;
-                background-repeat: no-repeat !important;
-                background-attachment: fixed !important;
-            }
-            
-            /* Glassmorphism Container for Main App */
-            .block-container {
-                background-color: rgba(255, 255, 255, 0.82);
-                padding: 2.5rem;
-                border-radius: 24px;
-                margin-top: 2rem;
-                box-shadow: 0 12px 40px 0 rgba(31, 38, 135, 0.18);
-                backdrop-filter: blur(16px);
-                -webkit-backdrop-filter: blur(16px);
-                border: 1px solid rgba(255, 255, 255, 0.45);
-                max-width: 98% !important;
-            }
-            
-            /* Enhanced Device Card Component */
-            .device-card {
-                background: rgba(255, 255, 255, 0.6);
-                border-radius: 16px;
-                padding: 1.5rem;
-                border: 1px solid rgba(255, 255, 255, 0.5);
-                box-shadow: 0 4px 15px rgba(0, 0, 0, 0.05);
-                transition: all 0.3s ease;
-                margin-bottom: 1rem;
-            }
-            .device-card:hover {
-                transform: translateY(-5px);
-                box-shadow: 0 12px 30px rgba(0, 0, 0, 0.1);
-                background: rgba(255, 255, 255, 0.8);
-                border-color: #5D5FEF;
-            }
-            
-            /* Status Badge Base */
-            .status-badge {
-                padding: 4px 12px;
-                border-radius: 20px;
-                font-weight: 700;
-                font-size: 0.85rem;
-                display: inline-block;
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-            }
-            .status-up {
-                background-color: rgba(34, 197, 94, 0.15);
-                color: #15803d;
-                border: 1px solid rgba(34, 197, 94, 0.3);
-                box-shadow: 0 0 15px rgba(34, 197, 94, 0.1);
-            }
-            .status-down {
-                background-color: rgba(239, 68, 68, 0.15);
-                color: #b91c1c;
-                border: 1px solid rgba(239, 68, 68, 0.3);
-                box-shadow: 0 0 15px rgba(239, 68, 68, 0.1);
-            }
-            
-            /* Inputs */
-            .stTextInput > div > div > input, .stSelectbox > div > div > div {
-                border-radius: 8px !important;
-                border: 1px solid #e2e8f0 !important;
-                padding: 0.5rem 1rem !important;
-            }
-            .stTextInput > div > div > input:focus {
-                border-color: #5D5FEF !important;
-                box-shadow: 0 0 0 3px rgba(93, 95, 239, 0.1) !important;
-            }
-        </style>
-        """
-        
-        # Inject dynamic values using f-string or replacement to avoid % formatting conflicts with CSS
-        page_bg_img = page_bg_img.replace("data:image/%s;base64,%s", f"data:image/{ext};base64,{bin_str}")
-        
-        st.markdown(page_bg_img, unsafe_allow_html=True)
+        bg_css = (
+            f'.stApp {{ background-image: url("{src}") !important; background-size: cover !important; '
+            'background-position: center center !important; background-repeat: no-repeat !important; '
+            'background-attachment: fixed !important; }'
+        )
+        st.markdown(stylesheet("theme.css", bg_css), unsafe_allow_html=True)
 
     @staticmethod
     def init_page():
@@ -148,87 +72,8 @@ class UI:
             layout="wide",
             initial_sidebar_state="expanded"
         )
-        # Global Styles
-        st.markdown("""
-        <style>
-            /* Hide Streamlit Default Elements (Footer & MainMenu) */
-            #MainMenu { visibility: hidden; }
-            footer { visibility: hidden; }
-            
-            /* HEADER DUZELTMESI */
-            header { 
-                visibility: visible !important; 
-                background: transparent !important;
-            }
-            
-            .stAppDeployButton, [data-testid="stHeaderActionElements"] {
-                display: none !important;
-            }
-
-            [data-testid="stSidebar"] { 
-                background-color: #f8fafc; 
-                border-right: 1px solid #e2e8f0;
-            }
-
-            /* Global Glass Card */
-            div[data-testid="stExpander"] {
-                background: rgba(255, 255, 255, 0.4);
-                border-radius: 16px;
-                border: 1px solid rgba(255, 255, 255, 0.5);
-                box-shadow: 0 4px 12px rgba(0, 0, 0, 0.03);
-            }
-
-            /* Button Styles */
-            .stButton > button {
-                border-radius: 10px;
-                font-weight: 600;
-                border: none;
-                transition: all 0.25s cubic-bezier(0.4, 0, 0.2, 1);
-                padding: 0.6rem 1.2rem;
-            }
-            .stButton > button:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 8px 20px -4px rgba(0, 0, 0, 0.2);
-            }
-            
-            /* Primary Button Glow */
-            .stButton > button[kind="primary"] {
-                background: linear-gradient(135deg, #4f46e5 0%, #3b82f6 100%);
-                box-shadow: 0 4px 14px 0 rgba(59, 130, 246, 0.3);
-            }
-            
-            /* Secondary/Kapat Button */
-            .stButton > button[kind="secondary"] {
-                background: #f1f5f9;
-                color: #475569;
-            }
-            .stButton > button[kind="secondary"]:hover {
-                background: #e2e8f0;
-                color: #1e293b;
-            }
-            
-            /* Sidebar Navigation */
-            section[data-testid="stSidebar"] .stRadio > label {
-                padding: 10px 15px;
-                border-radius: 8px;
-                margin-bottom: 5px;
-                transition: background-color 0.2s;
-                cursor: pointer;
-            }
-            section[data-testid="stSidebar"] .stRadio > label:hover {
-                background-color: #f1f5f9;
-            }
-            
-            /* FIX: Sidebar Toggle Button (Hamburger Menu) Visibility */
-            [data-testid="stSidebarCollapsedControl"] {
-                display: block !important;
-                visibility: visible !important;
-                z-index: 1000000 !important;
-                color: #334155 !important;
-                background-color: transparent !important;
-            }
-        </style>
-        """, unsafe_allow_html=True)
+        # Global Styles (src/assets/app.css)
+        st.markdown(stylesheet("app.css"), unsafe_allow_html=True)
 
     @staticmethod
     def login_screen():
@@ -245,190 +90,30 @@ class UI:
                 st.session_state['current_user'] = user
                 st.rerun()
         
-        logo_path = "MFA Logo/yeni_Bakanlık Logo.png"
-        logo_data = get_base64_image(logo_path)
+        logo_src = image_src("MFA Logo/yeni_Bakanlık Logo.png")
         
         # Background handling
-        bg_path = "MFA Background/Background_B.jpg"
-        bg_data = get_base64_image(bg_path)
+        bg_src = image_src("MFA Background/Background_B.jpg")
         
-        bg_css = ""
-        if bg_data:
-            bg_css = f"""
-                background-image: url("data:image/jpeg;base64,{bg_data}") !important;
-                background-size: cover !important;
-                background-position: center center !important;
-                background-repeat: no-repeat !important;
-                background-attachment: fixed !important;
-            """
+        if bg_src:
+            bg_css = (
+                f'background-image: url("{bg_src}") !important; background-size: cover !important; '
+                'background-position: center center !important; background-repeat: no-repeat !important; '
+                'background-attachment: fixed !important;'
+            )
         else:
             bg_css = "background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%) !important;"
 
         # Logo handling
         logo_html = ""
-        if logo_data:
-            logo_html = f'<img src="data:image/png;base64,{logo_data}" style="height: 80px; width: auto; display: block; margin: 0 auto 20px auto;">'
+        if logo_src:
+            logo_html = f'<img src="{logo_src}" style="height: 80px; width: auto; display: block; margin: 0 auto 20px auto;">'
         else:
             # Fallback icon if logo missing
             logo_html = '<div style="text-align: center; margin-bottom: 20px;"><svg xmlns="http://www.w3.org/2000/svg" width="60" height="60" viewBox="0 0 24 24" fill="#007bff" stroke="none"><path d="M12 1L3 5v6c0 5.55 3.84 10.74 9 12 5.16-1.26 9-6.45 9-12V5l-9-4zm0 10.99h7c-.53 4.12-3.28 7.79-7 8.94V12H5V6.3l7-3.11v8.8z"/></svg></div>'
 
-        # --- LOGIN SPECIFIC CSS ---
-        # Note: Using .format() or f-string with double braces for CSS is tricky.
-        # Ideally split css or use simple string concat.
-        
-        login_style = """
-            <style>
-                /* 1. HIDE SIDEBAR & DEFAULT ELEMENTS */
-                [data-testid="stSidebar"], 
-                [data-testid="collapsedControl"],
-                #MainMenu, 
-                footer, 
-                header {
-                    display: none !important; 
-                }
-
-                /* 2. PAGE BACKGROUND */
-                .stApp {
-                    %s
-                }
-
-                /* 3. CARD CONTAINER */
-                .block-container {
-                    background-color: rgba(255, 255, 255, 0.85);
-                    width: 90%% !important; 
-                    max-width: 450px !important;
-                    padding: 40px !important; 
-                    padding-bottom: 60px !important; 
-                    margin-top: 8vh !important;
-                    margin-left: auto !important;
-                    margin-right: auto !important;
-                    border-radius: 24px;
-                    box-shadow: 0 8px 32px 0 rgba(0, 0, 0, 0.3);
-                    border: 1px solid rgba(255, 255, 255, 0.6);
-                    backdrop-filter: blur(12px);
-                    -webkit-backdrop-filter: blur(12px);
-                    box-sizing: border-box !important; 
-                    overflow: hidden !important; 
-                }
-                
-                /* Remove default padding */
-                .element-container {
-                    margin-bottom: 1rem;
-                }
-
-                /* 4. FORM BODY PADDING */
-                [data-testid="stForm"] {
-                    padding: 0 !important;
-                    border: none !important;
-                }
-
-                /* 5. INPUTS */
-                div[data-baseweb="input"], div[data-baseweb="base-input-container"] {
-                    background-color: transparent !important;
-                    border: none !important;
-                    box-shadow: none !important;
-                    height: auto !important;
-                    min-height: 54px !important;
-                    overflow: visible !important;
-                }
-
-                .stTextInput > div > div > input {
-                    background-color: rgba(255, 255, 255, 0.95) !important;
-                    border: 1px solid #cbd5e1 !important;
-                    color: #1e293b !important;
-                    border-radius: 12px !important;
-                    padding-left: 45px !important;
-                    height: 50px !important;
-                    line-height: normal !important;
-                    font-size: 15px !important;
-                    transition: all 0.2s ease-in-out;
-                    box-shadow: inset 0 1px 2px rgba(0,0,0,0.05) !important;
-                    width: 100% !important;
-                }
-                
-                /* Ensure full width for password visibility container */
-                .stTextInput > div {
-                    width: 100% !important;
-                }
-
-                .stTextInput > div > div > input:focus {
-                    border-color: #4f46e5 !important;
-                    background-color: #ffffff !important;
-                    box-shadow: 0 0 0 4px rgba(79, 70, 229, 0.1) !important;
-                    outline: none !important;
-                }
-
-                /* Label Styling */
-                .stTextInput label {
-                    display: block !important;
-                    color: #475569 !important;
-                    font-size: 0.75rem !important;
-                    font-weight: 700 !important;
-                    text-transform: uppercase !important;
-                    letter-spacing: 0.05em !important;
-                    margin-bottom: 0.5rem !important;
-                    margin-left: 4px !important;
-                }
-
-                /* Input Icons - Updated to match Turkish labels */
-                input[aria-label="Kullanıcı Adı"] {
-                    background-image: url("data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 448 512' fill='%2364748b'%3E%3Cpath d='M224 256c70.7 0 128-57.3 128-128S294.7 0 224 0 96 57.3 96 128s57.3 128 128 128zm89.6 32h-16.7c-22.2 10.2-46.9 16-72.9 16s-50.6-5.8-72.9-16h-16.7C60.2 288 0 348.2 0 422.4V464c0 26.5 21.5 48 48 48h352c26.5 0 48-21.5 48-48v-41.6c0-74.2-60.2-134.4-134.4-134.4z'/%3E%3C/svg%3E");
-                    background-repeat: no-repeat;
-                    background-position: 15px center;
-                    background-size: 16px;
-                }
-                input[aria-label="Şifre"] {
-                    background-image: url("data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 448 512' fill='%2364748b'%3E%3Cpath d='M400 224h-24v-72C376 68.2 307.8 0 224 0S72 68.2 72 152v72H48c-26.5 0-48 21.5-48 48v192c0 26.5 21.5 48 48 48h352c26.5 0 48-21.5 48-48V272c0-26.5-21.5-48-48-48zm-104 0H152v-72c0-39.7 32.3-72 72-72s72 32.3 72 72v72z'/%3E%3C/svg%3E"); 
-                    background-repeat: no-repeat;
-                    background-position: 15px center;
-                    background-size: 14px;
-                }
-
-                /* Hide Streamlit form instructions */
-                [data-testid="InputInstructions"] {
-                    display: none !important;
-                }
-
-                /* Hide Password Visibility Toggle */
-                [data-testid="stTextInputPasswordVisibility"] {
-                    display: none !important;
-                }
-
-                .stButton > button {
-                    width: 100%% !important;
-                    background: linear-gradient(135deg, #4f46e5 0%%, #3b82f6 100%%) !important;
-                    color: white !important;
-                    border-radius: 12px !important;
-                    height: 54px !important;
-                    font-weight: 700 !important;
-                    font-size: 1rem !important;
-                    border: none !important;
-                    margin-top: 20px !important;
-                    box-shadow: 0 4px 12px rgba(59, 130, 246, 0.3) !important;
-                    transition: all 0.3s ease;
-                }
-                .stButton > button:hover {
-                    transform: translateY(-2px);
-                    box-shadow: 0 8px 20px rgba(59, 130, 246, 0.4) !important;
-                    filter: brightness(1.1);
-                }
-                
-                .stAlert {
-                    background-color: rgba(254, 226, 226, 0.9) !important;
-                    border: 1px solid #fecaca !important;
-                    color: #991b1b !important;
-                    border-radius: 8px !important;
-                }
-
-                [data-testid="InputInstructions"] { display: none !important; }
-
-            </style>
-        """
-        
-        # Inject background CSS safely without % formatting conflicts
-        login_style = login_style.replace("%s", bg_css)
-        
-        st.markdown(login_style, unsafe_allow_html=True)
+        # --- LOGIN SPECIFIC CSS --- (src/assets/login.css; arka plan satir ici)
+        st.markdown(stylesheet("login.css", f".stApp {{ {bg_css} }}"), unsafe_allow_html=True)
 
         # CARD CONTENT
         st.markdown(f"""
@@ -504,10 +189,9 @@ class UI:
                 unsafe_allow_html=True
             )
             
-            logo_path = "MFA Logo/yeni_Bakanlık Logo.png"
-            logo_data = get_base64_image(logo_path)
-            if logo_data:
-                 st.markdown(f'<img src="data:image/png;base64,{logo_data}" style="width: 140px; margin-bottom: 20px;">', unsafe_allow_html=True)
+            logo_src = image_src("MFA Logo/yeni_Bakanlık Logo.png")
+            if logo_src:
+                 st.markdown(f'<img src="{logo_src}" style="width: 140px; margin-bottom: 20px;">', unsafe_allow_html=True)
 
             st.title("🛡️ FortiCam")
             st.caption(f"👤 {user.username} ({user.role})")
@@ -516,6 +200,7 @@ class UI:
             # Fallback: Eger user_rights bos gelirse (profil bulunamazsa), varsayilan olarak Dashboard goster.
             if user_rights.get("Dashboard", 0) >= 1 or not user_rights: 
                 options.append("Dashboard")
+                options.append("Filo Port Durumu")
             
             if user_rights.get("FMG_Conn", 0) >= 1: options.append("FMG Bağlantısı")
             if user_rights.get("System", 0) >= 1 or user_rights.get("Auth", 0) >= 1: options.append("Ayarlar")
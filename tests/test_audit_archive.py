@@ -0,0 +1,64 @@
+import os
+import sys
+import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from audit_store import AuditStore
+from audit_archive import AuditArchive
+import pyarrow.parquet as pq
+
+
+def _store(tmp_path):
+    store = AuditStore(str(tmp_path / "audit.db"))
+    rows = []
+    for month in (1, 2, 3):
+        for i in range(30):
+            rows.append({"Timestamp": f"2025-{month:02d}-{1 + i % 28:02d} 10:00:00",
+                         "User": "ali" if i % 2 else "admin",
+                         "Action": "Port DOWN" if i % 3 == 0 else "Port UP",
+                         "Device": f"FW0{i % 2 + 1}[root]", "Details": f"port{i}"})
+    # Henuz yaslanmamis kayit (arsive girmemeli)
+    rows.append({"Timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "User": "admin",
+                 "Action": "Port UP", "Device": "FW01[root]", "Details": "recent"})
+    store.insert_many(rows)
+    return store
+
+
+class TestAuditArchive:
+    def test_compaction_writes_monthly_partitions_once(self, tmp_path):
+        store = _store(tmp_path)
+        archive = AuditArchive(str(tmp_path / "archive"))
+        assert archive.compact(store, older_than_days=90)[:3] == ["2025-01", "2025-02", "2025-03"]
+        assert archive.compact(store, older_than_days=90) == []
+
+        meta = pq.read_schema(str(tmp_path / "archive" / "month=2025-02" / "part-0.parquet"))
+        assert str(meta.field("device").type).startswith("dictionary")
+        assert str(meta.field("ts").type).startswith("timestamp")
+        df = archive.query()
+        assert len(df) == 90
+        assert "recent" not in set(df["details"])
+
+    def test_predicate_and_projection_pushdown(self, tmp_path):
+        archive = AuditArchive(str(tmp_path / "archive"))
+        archive.compact(_store(tmp_path), older_than_days=90)
+
+        table = archive.scan(["device"], start="2025-02-01", end="2025-03-01", action="Port DOWN")
+        assert table.column_names == ["device"]
+        assert table.num_rows == 10
+
+        fragments = list(archive._dataset().get_fragments(filter=archive._filter("2025-02-01", "2025-03-01", None, None, None)))
+        assert len(fragments) == 1  # Yalnizca Subat bolumu
+
+    def test_count_by_month_and_device(self, tmp_path):
+        archive = AuditArchive(str(tmp_path / "archive"))
+        archive.compact(_store(tmp_path), older_than_days=90)
+        df = archive.count_by(["month", "device"], action="Port DOWN", end="2025-03-01")
+        assert list(df.columns) == ["month", "device", "count"]
+        assert df["count"].sum() == 20
+        assert set(df["month"]) == {"2025-01", "2025-02"}
+
+    def test_empty_archive(self, tmp_path):
+        archive = AuditArchive(str(tmp_path / "archive"))
+        assert archive.query().empty
+        assert archive.count_by(["month"]).empty
@@ -0,0 +1,112 @@
+import os
+import sys
+import gzip
+import time
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from audit_journal import AuditJournal, ts_key, LOG_COLUMNS
+
+
+def _entry(month, day, i):
+    return {"Timestamp": f"2026-{month:02d}-{day:02d} 10:{i // 60:02d}:{i % 60:02d}", "User": "admin",
+            "Action": "Port UP", "Device": "FW01[root]", "Details": f"ok {i}"}
+
+
+def _rows(journal, start=None, end=None):
+    return [r for block in journal.read(start, end) for r in block]
+
+
+class TestAuditJournal:
+    def test_ts_key(self):
+        assert ts_key("2026-03-02 10:00:05") == 20260302100005
+        assert ts_key("2026-03") == 20260300000000
+
+    def test_append_and_range_read_active_segment(self, tmp_path):
+        journal = AuditJournal(str(tmp_path), block_rows=10)
+        journal.append([_entry(3, 1, i) for i in range(25)])
+        journal.append([_entry(3, 2, i) for i in range(5)])
+        assert len(_rows(journal)) == 30
+        assert len(_rows(journal, "2026-03-02", "2026-03-03")) == 5
+        assert [r[4] for r in _rows(journal, "2026-03-01 10:00:20", "2026-03-01 10:00:22")] == ["ok 20", "ok 21"]
+
+    def test_rotation_compresses_with_seekable_blocks(self, tmp_path):
+        journal = AuditJournal(str(tmp_path), block_rows=10)
+        journal.append([_entry(3, 1, i) for i in range(30)])
+        journal.append([_entry(4, 1, i) for i in range(30)])
+        journal.rotate()
+        journal.append([_entry(5, 1, i) for i in range(3)])
+
+        names = sorted(os.listdir(tmp_path))
+        assert any(n.endswith(".csv.gz") for n in names)
+        assert any(n.endswith(".gz.idx") for n in names)
+        # Sikistirilmis segment standart gzip olarak da okunabilir
+        gz = [n for n in names if n.endswith(".csv.gz")][0]
+        with gzip.open(tmp_path / gz, "rt", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert lines[0] == ",".join(LOG_COLUMNS)
+        assert len(lines) == 61
+
+        # "Nisan" sorgusu yalnizca ilgili bloklari acar
+        with patch('audit_journal.gzip.decompress', wraps=gzip.decompress) as mock_dec:
+            april = _rows(journal, "2026-04", "2026-05")
+        assert len(april) == 30
+        assert mock_dec.call_count == 3
+        assert len(_rows(journal, "2026-05")) == 3
+
+    def test_size_based_rotation(self, tmp_path):
+        journal = AuditJournal(str(tmp_path), max_segment_bytes=1000, block_rows=5)
+        for i in range(10):
+            journal.append([_entry(3, 1, i * 5 + j) for j in range(5)])
+        assert len([n for n in os.listdir(tmp_path) if n.endswith(".csv.gz")]) >= 2
+        assert len(_rows(journal)) == 50
+
+    def test_reopen_recovers_active_block(self, tmp_path):
+        journal = AuditJournal(str(tmp_path), block_rows=10)
+        journal.append([_entry(3, 1, i) for i in range(15)])
+        journal.close()
+
+        reopened = AuditJournal(str(tmp_path), block_rows=10)
+        reopened.append([_entry(3, 1, 15 + i) for i in range(10)])
+        reopened.rotate()
+        assert [r[4] for r in _rows(reopened)] == [f"ok {i}" for i in range(25)]
+
+    def test_failed_compression_is_not_reopened_as_active(self, tmp_path):
+        journal = AuditJournal(str(tmp_path), block_rows=10)
+        journal.append([_entry(3, 1, i) for i in range(12)])
+        with patch.object(AuditJournal, '_compress', side_effect=OSError("disk full")):
+            journal.rotate()
+        assert not [n for n in os.listdir(tmp_path) if n.endswith(".tmp")]
+        journal.append([_entry(4, 1, i) for i in range(3)])
+        plain = sorted(n for n in os.listdir(tmp_path) if n.endswith(".csv"))
+        assert len(plain) == 2  # Yeni aktif segment acildi
+
+        # Sonraki rotate'te basarisiz segment de sikistirilir
+        journal.rotate()
+        assert not [n for n in os.listdir(tmp_path) if n.endswith(".csv")]
+        assert len(_rows(journal)) == 15
+
+    def test_iter_rows_filters_and_coverage(self, tmp_path):
+        journal = AuditJournal(str(tmp_path), block_rows=10)
+        assert journal.covers("2026-03-01") is False
+        journal.append([_entry(3, 1, i) for i in range(10)])
+        journal.append([{**_entry(3, 2, 0), "User": "ali", "Details": "Port DOWN ok"}])
+        journal.close()
+
+        # Yeniden acilista indekslenmemis son satirlar da okunur
+        reopened = AuditJournal(str(tmp_path), block_rows=10)
+        assert reopened.covers("2026-03-01 10:00:00") and not reopened.covers("2026-02-28")
+        assert [r[1] for b in reopened.iter_rows(start="2026-03-02") for r in b] == ["ali"]
+        assert sum(len(b) for b in reopened.iter_rows(start="2026-03-01", text="port down")) == 1
+        assert sum(len(b) for b in reopened.iter_rows(start="2026-03-01", user="admin", end="2026-03-02")) == 10
+
+    def test_retention_removes_expired_segments(self, tmp_path):
+        journal = AuditJournal(str(tmp_path), block_rows=10, retention_days=30)
+        journal.append([{**_entry(1, 1, 0), "Timestamp": "2020-01-01 00:00:00"}])
+        journal.rotate()
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        journal.append([{**_entry(1, 1, 1), "Timestamp": now}])
+        journal.rotate()
+        rows = _rows(journal)
+        assert [r[0] for r in rows] == [now]
@@ -0,0 +1,150 @@
+import os
+import sys
+import csv
+import threading
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from audit_store import AuditStore, LOG_COLUMNS, write_export
+
+
+def _entry(day, i, user="admin", action="Port UP", device="FW01[root]"):
+    return {"Timestamp": f"2026-03-{day:02d} 10:00:{i:02d}", "User": user, "Action": action, "Device": device, "Details": f"port{i} 50%_done"}
+
+
+class TestAuditStore:
+    def test_filters_order_and_count(self, tmp_path):
+        store = AuditStore(str(tmp_path / "audit.db"))
+        store.insert_many([_entry(1, i) for i in range(5)])
+        store.insert_many([_entry(2, i, user="ali", action="Port DOWN") for i in range(3)])
+        store.insert_many([_entry(3, 0, device="FW02[root]")])
+
+        df = store.query()
+        assert list(df.columns) == LOG_COLUMNS
+        assert df.iloc[0]["Timestamp"] == "2026-03-03 10:00:00"  # En yeni once
+
+        assert store.count() == 9
+        assert store.count(user="ali") == 3
+        assert store.count(action="Port DOWN", user="admin") == 0
+        assert store.count(device="FW02[root]") == 1
+        # start dahil, end haric
+        assert store.count(start="2026-03-02", end="2026-03-03") == 3
+        page = store.query(user="admin", limit=2, offset=1, ascending=True)
+        assert list(page["Details"]) == ["port1 50%_done", "port2 50%_done"]
+
+    def test_recent_devices_most_recent_first(self, tmp_path):
+        store = AuditStore(str(tmp_path / "audit.db"))
+        store.insert_many([_entry(1, 0, device="FW01[root]"), _entry(2, 0, device="FW02[dmz]"),
+                           _entry(3, 0, device="FW01[root]"), _entry(4, 0, device="FW03[root]", user="ali"),
+                           _entry(4, 1, device="")])
+        assert store.recent_devices("admin") == ["FW01[root]", "FW02[dmz]"]
+        assert store.recent_devices("admin", limit=1) == ["FW01[root]"]
+
+    def test_text_search_escapes_like_wildcards(self, tmp_path):
+        store = AuditStore(str(tmp_path / "audit.db"))
+        store.insert_many([_entry(1, 1), {"Timestamp": "2026-03-01 11:00:00", "User": "x", "Action": "a", "Device": "d", "Details": "50 done"}])
+        assert store.count(text="50%") == 1
+        assert store.count(text="port1") == 1
+        assert store.count(text="ali") == 0
+
+    def test_csv_import_runs_once(self, tmp_path):
+        csv_path = tmp_path / "audit_logs.csv"
+        with open(csv_path, "w", newline='', encoding='utf-8') as f:
+            w = csv.writer(f)
+            w.writerow(LOG_COLUMNS)
+            for i in range(4):
+                e = _entry(1, i)
+                w.writerow([e[c] for c in LOG_COLUMNS])
+
+        store = AuditStore(str(tmp_path / "audit.db"))
+        assert store.import_csv(str(csv_path)) == 4
+        assert store.import_csv(str(csv_path)) == 0
+        store.close()
+        # Yeniden acilista (veya baska replikada) tekrar aktarilmaz
+        assert AuditStore(str(tmp_path / "audit.db")).import_csv(str(csv_path)) == 0
+        assert AuditStore(str(tmp_path / "audit.db")).count() == 4
+
+    def test_export_csv_streams_all_rows(self, tmp_path):
+        store = AuditStore(str(tmp_path / "audit.db"))
+        store.insert_many([_entry(1, i % 60) for i in range(120)])
+        out = tmp_path / "export.csv"
+        assert store.export_csv(str(out), user="admin") == 120
+        with open(out, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == LOG_COLUMNS
+        assert len(rows) == 121
+        # Ayni timestamp'li kayitlar da kaybolmadan (ts, id) sirasiyla gelir
+        assert len(list(store.iter_rows(batch_size=7))) == 18
+
+    def test_purge_with_vacuum_releases_disk_space(self, tmp_path):
+        db = tmp_path / "audit.db"
+        store = AuditStore(str(db))
+        store.insert_many([{**_entry(1, i % 60), "Details": "x" * 500} for i in range(2000)])
+        store.insert_many([_entry(5, 0)])
+        def disk_usage():
+            return sum(os.path.getsize(p) for p in (db, tmp_path / "audit.db-wal") if os.path.exists(p))
+
+        before = disk_usage()
+        assert store.purge_before("2026-03-02", vacuum=True) == 2000
+        assert disk_usage() < before / 2
+        assert store.count() == 1
+        conn = store._connect()
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+    def test_incremental_vacuum_releases_lock_between_steps(self, tmp_path):
+        store = AuditStore(str(tmp_path / "audit.db"))
+        store.insert_many([{**_entry(1, i % 60), "Details": "x" * 500} for i in range(2000)])
+        with store._lock:
+            store._connect().execute("DELETE FROM audit_logs")
+        steps = []
+
+        def lock_free(_):
+            # Adimlar arasinda baska bir thread (Orn: audit yazici) lock'u alabilmeli
+            probe = threading.Thread(target=lambda: steps.append(store._lock.acquire(blocking=False) and (store._lock.release() or True)))
+            probe.start()
+            probe.join()
+
+        with patch('audit_store.time.sleep', side_effect=lock_free):
+            released = store.incremental_vacuum(step_pages=16)
+        assert released > 16
+        # Her adimdan sonra lock serbest (yazici araya girebilir)
+        assert len(steps) > 1 and all(steps)
+
+    def test_distinct_values_for_filters(self, tmp_path):
+        store = AuditStore(str(tmp_path / "audit.db"))
+        store.insert_many([_entry(1, 0), _entry(1, 1, user="ali"), _entry(1, 2, user="ali", device="")])
+        assert store.distinct("user") == ["admin", "ali"]
+        assert store.distinct("device") == ["FW01[root]"]
+
+    def test_page_and_count_match_for_filtered_query(self, tmp_path):
+        store = AuditStore(str(tmp_path / "audit.db"))
+        store.insert_many([_entry(1 + i // 60, i % 60, user="ali" if i % 3 == 0 else "admin") for i in range(300)])
+        filters = {"user": "ali", "start": "2026-03-02"}
+        total = store.count(**filters)
+        pages = [store.query(limit=25, offset=o, **filters) for o in range(0, total, 25)]
+        assert sum(len(p) for p in pages) == total
+        assert all(p["User"].eq("ali").all() for p in pages)
+
+    def test_streaming_export_formats(self, tmp_path):
+        import io
+        import gzip
+        import json
+        store = AuditStore(str(tmp_path / "audit.db"))
+        store.insert_many([_entry(1, i) for i in range(30)])
+
+        buf = io.BytesIO()
+        assert store.export(buf, fmt="jsonl", compress=True, batch_size=7, user="admin") == 30
+        assert not buf.closed  # Dosya cagirana ait
+        lines = gzip.decompress(buf.getvalue()).decode("utf-8").splitlines()
+        assert len(lines) == 30
+        assert json.loads(lines[0])["Details"] == "port0 50%_done"
+
+        buf = io.BytesIO()
+        assert store.export(buf, fmt="csv", start="2026-03-01 10:00:20") == 10
+        assert buf.getvalue().decode("utf-8").splitlines()[0] == ",".join(LOG_COLUMNS)
+
+        # Satir siniri parti ortasinda da uygulanir
+        buf = io.BytesIO()
+        assert write_export(buf, store.iter_rows(batch_size=7), fmt="csv", max_rows=10) == 10
+        assert len(buf.getvalue().decode("utf-8").splitlines()) == 11
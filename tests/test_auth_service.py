@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, patch
 from src.auth_service import AuthService, User
+from src.session_store import SessionStore
 
 class TestAuthServiceConnectivity:
 
@@ -117,4 +118,142 @@ class TestUserRBAC:
             assert u.has_access_to_port("FW01", "lan1") is True # Global match
             assert u.has_access_to_port("FW01", "dmz") is True # Device match
             assert u.has_access_to_port("FW01", "lan2") is False # No match
-            assert u.has_access_to_port("FW02", "dmz") is False # Device mismatch
\ No newline at end of file
+            assert u.has_access_to_port("FW02", "dmz") is False # Device mismatch
+
+class TestSessionTokens:
+    def test_token_roundtrip_and_logout(self, tmp_path):
+        store = SessionStore(db_path=str(tmp_path / "sessions.db"))
+        with patch('src.auth_service.SESSION_STORE', store):
+            token = AuthService.create_session_token(User("operator", "Standard_User", user_groups=["CN=Ops"]))
+            user = AuthService.validate_session_token(token)
+            assert user.username == "operator"
+            assert user.user_groups == ["CN=Ops"]
+
+            AuthService.logout_user("operator")
+            assert AuthService.validate_session_token(token) is None
+        store.close()
+
+class TestPasswordUpgrade:
+    @patch('src.auth_service.bcrypt')
+    def test_legacy_plaintext_verified_and_flagged(self, mock_bcrypt):
+        mock_bcrypt.checkpw.side_effect = ValueError("Invalid salt")
+        assert AuthService.verify_password("secret", "secret", 12) == (True, True)
+        assert AuthService.verify_password("wrong", "secret", 12) == (False, False)
+
+    @patch('src.auth_service.bcrypt')
+    def test_weak_hash_flagged_for_rehash(self, mock_bcrypt):
+        mock_bcrypt.checkpw.return_value = True
+        assert AuthService.verify_password("secret", "$2b$10$abcdefghijklmnopqrstuv", 12) == (True, True)
+        assert AuthService.verify_password("secret", "$2b$12$abcdefghijklmnopqrstuv", 12) == (True, False)
+
+    def test_timed_out_check_keeps_its_slot_until_done(self):
+        import threading
+        release = threading.Event()
+
+        def slow_verify(password, hashed, rounds):
+            release.wait(5)
+            return True, False
+
+        with patch('src.auth_service._PASSWORD_SLOTS', threading.BoundedSemaphore(1)) as slots, \
+             patch('src.auth_service.PASSWORD_TIMEOUT', 0.05), \
+             patch('src.auth_service.AuthService._verify_password', side_effect=slow_verify):
+            assert AuthService.verify_password("secret", "$2b$12$x") == (False, False)
+            # Zaman asimina ugrayan is hala calisiyor; slot bos sayilmamali
+            assert not slots.acquire(blocking=False)
+            release.set()
+            for _ in range(100):
+                if slots.acquire(timeout=0.05):
+                    break
+            else:
+                raise AssertionError("slot not released after the job finished")
+            slots.release()
+
+    def test_flush_writes_pending_upgrades_once(self):
+        import src.auth_service as auth_module
+        auth_module._PENDING_REHASH.update({
+            "operator": ("operator", "$2b$12$newhash"),
+            "ghost": ("x", "$2b$12$other")
+        })
+        cfg = {"local_accounts": [
+            {"user": "admin", "password": "$2b$12$keep", "profile": "Super_User"},
+            {"user": "operator", "password": "operator", "profile": "Standard_User"}
+        ]}
+        with patch('src.auth_service.ConfigService.load_config', return_value=cfg), \
+             patch('src.auth_service.ConfigService.save_config') as mock_save:
+            assert AuthService.flush_password_upgrades() == 1
+            mock_save.assert_called_once()
+        assert cfg["local_accounts"][1]["password"] == "$2b$12$newhash"
+        assert cfg["local_accounts"][0]["password"] == "$2b$12$keep"
+        assert not auth_module._PENDING_REHASH
+
+class TestBulkRBAC:
+    def test_port_access_mask_matches_has_access(self):
+        import pandas as pd
+        with patch('src.auth_service.ConfigService.load_config') as mock_config:
+            mock_config.return_value = {
+                "local_accounts": [{
+                    "user": "operator",
+                    "global_allowed_ports": ["lan1"],
+                    "device_allowed_ports": {"FW01": ["port{1-4}"]}
+                }]
+            }
+            u = User("operator", "Standard_User")
+            df = pd.DataFrame({"device": ["FW01", "FW01", "FW02", "FW02"], "port": ["port3", "port5", "lan1", "port3"]})
+            mask = u.port_access_mask(df["device"], df["port"])
+            assert mask.tolist() == [u.has_access_to_port(d, p) for d, p in zip(df["device"], df["port"])]
+            assert len(u.filter_allowed_ports(df)) == 2
+
+    def test_port_access_mask_admin_all_allowed(self):
+        u = User("admin", "Super_User")
+        assert u.port_access_mask(["FW01", "FW02"], ["a", "b"]).tolist() == [True, True]
+
+class _FakeEntry:
+    def __init__(self, dn, member_of=None):
+        self.entry_dn = dn
+        self._member_of = member_of
+
+    def __contains__(self, attr):
+        return attr == 'memberOf' and self._member_of is not None
+
+    def __getitem__(self, attr):
+        return MagicMock(values=self._member_of)
+
+
+class TestNestedGroups:
+    def setup_method(self):
+        import src.auth_service as auth_module
+        auth_module._GROUP_CACHE.clear()
+
+    def test_in_chain_result_is_cached(self):
+        conn = MagicMock()
+        conn.entries = [_FakeEntry("CN=Leaf,DC=x"), _FakeEntry("CN=Top,DC=x")]
+        groups = AuthService._resolve_nested_groups(conn, "DC=x", "CN=alice,DC=x", ["CN=Leaf,DC=x"])
+        assert groups == ["CN=Leaf,DC=x", "CN=Top,DC=x"]
+        assert "1.2.840.113556.1.4.1941" in conn.search.call_args[0][1]
+
+        conn.search.reset_mock()
+        assert AuthService._resolve_nested_groups(conn, "DC=x", "CN=alice,DC=x", ["CN=Leaf,DC=x"]) == groups
+        conn.search.assert_not_called()
+
+    def test_iterative_fallback_handles_cycles(self):
+        parents = {
+            "CN=Leaf,DC=x": ["CN=Mid,DC=x"],
+            "CN=Mid,DC=x": ["CN=Top,DC=x"],
+            "CN=Top,DC=x": ["CN=Mid,DC=x"],  # dongu
+        }
+        conn = MagicMock()
+
+        def fake_search(base, flt, **kwargs):
+            if "1.2.840.113556.1.4.1941" in flt:
+                conn.entries = []  # In-chain desteklenmiyor
+            else:
+                conn.entries = [_FakeEntry(base, parents.get(base, []))]
+        conn.search.side_effect = fake_search
+
+        groups = AuthService._resolve_nested_groups(conn, "DC=x", "CN=bob,DC=x", ["CN=Leaf,DC=x"])
+        assert groups == ["CN=Leaf,DC=x", "CN=Mid,DC=x", "CN=Top,DC=x"]
+
+    def test_nested_group_matches_top_level_mapping(self):
+        mappings = [{"group_dn": "CN=Top,DC=x", "profile": "Standard_User"}]
+        profile, _, _ = AuthService._get_profile_by_ldap_groups(["CN=Leaf,DC=x", "CN=Top,DC=x"], mappings)
+        assert profile == "Standard_User"
@@ -0,0 +1,201 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cache_utils import TTLCache
+
+
+class TestTTLCache:
+    def test_set_get_and_expiry(self):
+        cache = TTLCache(ttl=0.05)
+        cache.set("k", [1, 2])
+        assert cache.get("k") == [1, 2]
+        time.sleep(0.06)
+        assert cache.get("k") is None
+        assert cache.get("k", "default") == "default"
+
+    def test_per_entry_ttl_and_pop(self):
+        cache = TTLCache(ttl=60)
+        cache.set("short", 1, ttl=0)
+        cache.set("long", 2)
+        assert cache.get("short") is None
+        assert cache.pop("long") == 2
+        assert cache.get("long") is None
+
+    def test_lru_capacity(self):
+        cache = TTLCache(ttl=60, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert len(cache) == 2
+
+
+class TestTokenBucket:
+    def test_rate_limits_after_burst(self):
+        from cache_utils import TokenBucket
+        bucket = TokenBucket(rate=100, capacity=10)
+        assert bucket.try_acquire(10) is True
+        assert bucket.try_acquire(1) is False
+        start = time.monotonic()
+        assert bucket.acquire(5) is True
+        # 5 token / 100 per sn ~ 50ms
+        assert time.monotonic() - start >= 0.04
+
+    def test_acquire_stops_on_event(self):
+        import threading
+        from cache_utils import TokenBucket
+        bucket = TokenBucket(rate=1, capacity=1)
+        bucket.try_acquire(1)
+        stop = threading.Event()
+        stop.set()
+        assert bucket.acquire(1, stop_event=stop) is False
+
+
+class TestSingleFlight:
+    def _run_concurrently(self, flight, key, fn, n=10):
+        import threading
+        results, errors = [], []
+
+        def worker():
+            try:
+                results.append(flight.do(key, fn))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(2)
+        return results, errors
+
+    def test_concurrent_callers_share_one_call(self):
+        from cache_utils import SingleFlight
+        flight = SingleFlight()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return ["port1"]
+
+        results, errors = self._run_concurrently(flight, ("interfaces", "fw1"), fetch)
+        assert len(calls) == 1
+        assert results == [["port1"]] * 10 and not errors
+        assert not flight.in_flight(("interfaces", "fw1"))
+
+        # Cagri bittikten sonra sonuc saklanmaz
+        flight.do(("interfaces", "fw1"), fetch)
+        assert len(calls) == 2
+
+    def test_error_is_shared_by_waiters(self):
+        from cache_utils import SingleFlight
+        flight = SingleFlight()
+
+        def failing():
+            time.sleep(0.1)
+            raise RuntimeError("FMG timeout")
+
+        results, errors = self._run_concurrently(flight, "devices", failing, n=5)
+        assert not results
+        assert len(errors) == 5 and all(str(e) == "FMG timeout" for e in errors)
+
+
+class TestSWRCache:
+    def test_serves_stale_value_and_refreshes_in_background(self):
+        import threading
+        from cache_utils import SWRCache
+        cache = SWRCache(fresh_ttl=0.05, max_stale=10)
+        release = threading.Event()
+        values = iter(["v1", "v2"])
+
+        def loader():
+            value = next(values)
+            if value == "v2":
+                release.wait(2)
+            return value
+
+        first = cache.get("k", loader)
+        assert first.value == "v1" and not first.refreshing
+        assert cache.get("k", loader).age < 0.05
+
+        time.sleep(0.06)
+        stale = cache.get("k", loader)
+        assert stale.value == "v1" and stale.refreshing  # Beklemeden eski deger
+        assert cache.is_refreshing("k")
+
+        release.set()
+        deadline = time.time() + 2
+        while cache.is_refreshing("k") and time.time() < deadline:
+            time.sleep(0.01)
+        fresh = cache.get("k", loader)
+        assert fresh.value == "v2" and not fresh.refreshing
+
+    def test_hard_expiry_and_invalidate_load_synchronously(self):
+        from cache_utils import SWRCache
+        cache = SWRCache(fresh_ttl=0, max_stale=0.05)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return len(calls)
+
+        assert cache.get("k", loader).value == 1
+        time.sleep(0.06)
+        # max_stale asildi: eski deger donmez
+        result = cache.get("k", loader)
+        assert result.value == 2 and not result.refreshing
+
+        cache.invalidate("k")
+        assert cache.get("k", loader).value == 3
+
+    def test_failed_refresh_keeps_stale_value(self):
+        from cache_utils import SWRCache
+        cache = SWRCache(fresh_ttl=0, max_stale=10)
+        cache.set("k", "old")
+
+        def failing():
+            raise RuntimeError("FMG down")
+
+        assert cache.get("k", failing).value == "old"
+        deadline = time.time() + 2
+        while cache.is_refreshing("k") and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache.get("k", failing).value == "old"
+
+    def test_background_refreshes_are_bounded(self):
+        import threading
+        import cache_utils
+        from cache_utils import SWRCache
+        cache = SWRCache(fresh_ttl=0, max_stale=10)
+        lock = threading.Lock()
+        release = threading.Event()
+        running, peak = [0], [0]
+
+        def loader(key):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            release.wait(2)
+            with lock:
+                running[0] -= 1
+            return key
+
+        keys = [f"k{i}" for i in range(cache_utils.SWR_REFRESH_WORKERS * 5)]
+        for key in keys:
+            cache.set(key, "old")
+        # Toplu okuyucu: tum kayitlar eski, hepsi yenileme ister
+        assert all(cache.get(key, loader, key).refreshing for key in keys)
+        time.sleep(0.1)
+        assert peak[0] == cache_utils.SWR_REFRESH_WORKERS
+
+        release.set()
+        deadline = time.time() + 5
+        while any(cache.is_refreshing(k) for k in keys) and time.time() < deadline:
+            time.sleep(0.01)
+        assert [cache.peek(k).value for k in keys] == keys
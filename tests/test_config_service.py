@@ -32,6 +32,22 @@ def test_default_config_loading():
     assert "toggle_method" in config
     assert config["toggle_method"] == "db_update"
 
+def test_default_accounts_are_seeded_hashed():
+    """Varsayilan hesaplar duz metin sifreyle degil, bcrypt hash'iyle eklenir."""
+    import config_service
+    if os.path.exists(CONFIG_FILE): os.remove(CONFIG_FILE)
+    config_service._DEFAULT_HASHES.clear()
+    with patch('config_service.bcrypt') as mock_bcrypt:
+        mock_bcrypt.hashpw.side_effect = lambda pw, salt: b"$2b$12$" + pw[::-1]
+        first = ConfigService.load_config()["local_accounts"]
+        second = ConfigService.load_config()["local_accounts"]
+    assert [a["user"] for a in first] == ["admin", "operator"]
+    assert all(a["password"].startswith("$2b$12$") for a in first)
+    assert first == second
+    # Hashler process basina bir kez uretilir
+    assert mock_bcrypt.hashpw.call_count == 2
+    config_service._DEFAULT_HASHES.clear()
+
 def test_migration_legacy_fmg_ip():
     """Eski config yapisindan (root fmg_ip) yeni yapiya (fmg_settings) gecis."""
     legacy_data = {
@@ -0,0 +1,49 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from device_index import DeviceSearchIndex, normalize
+
+DEVICES = [
+    {"name": "FGT-Ankara-01", "ip": "10.1.1.1", "platform_str": "FortiGate-60F", "adom": "root", "sn": "FGT60F0001"},
+    {"name": "Ankara", "ip": "10.1.1.2", "platform_str": "FortiGate-40F", "adom": "root", "sn": "FGT40F0002"},
+    {"name": "FGT-İstanbul-01", "ip": "10.2.1.1", "platform_str": "FortiGate-VM64", "desc": "Merkez Ankara yedek",
+     "adom": "Bolge", "sn": "FGVM0003"},
+    {"name": "AnkaraDC", "ip": "172.16.0.1", "platform_str": "FortiGate-100F", "adom": "DC", "sn": "FG100F0004"},
+]
+
+
+class TestDeviceSearchIndex:
+    def test_ranking_exact_then_prefix_then_substring(self):
+        index = DeviceSearchIndex(DEVICES)
+        names = [d["name"] for d in index.search("ankara")]
+        # Tam eslesme, isimde (kelime) onek (liste sirasi korunur), sonra aciklamadaki kelime
+        assert names == ["Ankara", "FGT-Ankara-01", "AnkaraDC", "FGT-İstanbul-01"]
+
+    def test_normalizes_case_and_turkish_characters(self):
+        index = DeviceSearchIndex(DEVICES)
+        assert normalize("İSTANBUL") == "istanbul"
+        assert [d["name"] for d in index.search("ISTANBUL")] == ["FGT-İstanbul-01"]
+
+    def test_dotless_i_matches_ascii_query(self):
+        assert normalize("IŞIK") == normalize("Işık") == "isik"
+        index = DeviceSearchIndex([{"name": "FGT-Işık-01"}, {"name": "FGT-Ankara-01"}])
+        assert [d["name"] for d in index.search("isik")] == ["FGT-Işık-01"]
+        assert [d["name"] for d in index.search("ışık")] == ["FGT-Işık-01"]
+
+    def test_searches_serial_and_adom_fields(self):
+        index = DeviceSearchIndex(DEVICES)
+        assert [d["name"] for d in index.search("fg100f")] == ["AnkaraDC"]
+        assert [d["name"] for d in index.search("bolge")] == ["FGT-İstanbul-01"]
+
+    def test_multi_term_and_short_queries(self):
+        index = DeviceSearchIndex(DEVICES)
+        assert [d["name"] for d in index.search("ankara 40f")] == ["Ankara"]
+        assert len(index.search("10")) == 4  # 3 IP + FG100F seri no
+        assert index.search("zzz") == []
+        assert index.search("  ") == DEVICES
+
+    def test_terms_do_not_match_across_fields(self):
+        index = DeviceSearchIndex([{"name": "abc", "ip": "def"}])
+        assert index.search("cde") == []
@@ -0,0 +1,128 @@
+import os
+import sys
+import threading
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from device_service import DeviceService
+from fleet_status import (FleetStatusService, STATE_ADMIN_DOWN, STATE_LINK_DOWN, STATE_NONE,
+                          STATE_UNKNOWN, STATE_UP)
+
+
+def _iface(name, status=1, link=1, itype="physical"):
+    return {"name": name, "status": status, "link-status": link, "type": itype}
+
+
+class _FleetApi:
+    base_url = "https://fmg-fleet.test/jsonrpc"
+
+    def __init__(self, ports):
+        self.ports = ports
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+        self.barrier = threading.Barrier(2, timeout=2)
+
+    def get_vdoms(self, device_name):
+        return ["root"]
+
+    def get_interfaces_realtime(self, device_name, vdom="root", adom="root"):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            self.barrier.wait()  # En az iki cihaz ayni anda okunmali
+        except threading.BrokenBarrierError:
+            pass
+        with self.lock:
+            self.active -= 1
+        return self.ports.get(device_name)
+
+    def get_interfaces(self, device_name, vdom="root", adom="root"):
+        return None
+
+
+class _User:
+    def port_access_mask(self, devices, ports):
+        return np.asarray(ports) != "port2"
+
+
+class TestFleetStatus:
+    def test_build_table_states_and_physical_filter(self):
+        records = [
+            {**_iface("port1"), "device": "FW1", "adom": "root", "model": "60F", "vdom": "root"},
+            {**_iface("port2", link=0), "device": "FW1", "adom": "root", "model": "60F", "vdom": "root"},
+            {**_iface("port3", status=0, link=1), "device": "FW1", "adom": "root", "model": "60F", "vdom": "root"},
+            {"name": "wan1", "admin-status": "up", "type": "physical", "device": "FW1", "adom": "root", "model": "60F", "vdom": "root"},
+            {**_iface("vlan10", itype="vlan"), "device": "FW1", "adom": "root", "model": "60F", "vdom": "root"},
+            {**_iface("modem"), "device": "FW1", "adom": "root", "model": "60F", "vdom": "root"},
+        ]
+        table = FleetStatusService.build_table(records)
+        assert dict(zip(table["port"], table["state"])) == {
+            "port1": STATE_UP, "port2": STATE_LINK_DOWN, "port3": STATE_ADMIN_DOWN, "wan1": STATE_UNKNOWN}
+
+    def test_matrix_orders_ports_naturally_and_marks_missing(self):
+        records = [{**_iface(p), "device": d, "adom": "root", "model": "60F", "vdom": "root"}
+                   for d, p in [("FW1", "port10"), ("FW1", "port2"), ("FW2", "port1")]]
+        matrix = FleetStatusService.status_matrix(FleetStatusService.build_table(records))
+        assert list(matrix.columns) == ["port1", "port2", "port10"]
+        assert matrix.loc["FW1", "port1"] == STATE_NONE
+        symbols = FleetStatusService.symbol_matrix(matrix)
+        assert symbols.loc["FW2", "port1"] == "🟢" and symbols.loc["FW2", "port2"] == ""
+
+    def test_collect_is_concurrent_and_reports_errors(self):
+        DeviceService.clear()
+        api = _FleetApi({
+            "FW1": [_iface("port1"), _iface("port2", link=0)],
+            "FW2": [_iface("port1", status=0)],
+        })
+        devices = [{"name": "FW1", "adom": "root", "platform_str": "60F"},
+                   {"name": "FW2", "adom": "ank", "platform_str": "100F"},
+                   {"name": "FW3", "adom": "ank", "platform_str": "100F"}]
+        try:
+            snap = FleetStatusService.collect(api, devices, workers=3)
+        finally:
+            DeviceService.clear()
+        assert api.peak >= 2
+        assert list(snap.errors) == ["FW3"]
+        assert len(snap.table) == 3
+
+        by_adom = FleetStatusService.summarize(snap.table, "adom").set_index("adom")
+        assert by_adom.loc["root", ["Cihaz", "Port", "Up", "Link Down"]].tolist() == [1, 2, 1, 1]
+        assert by_adom.loc["ank", "Admin Down"] == 1
+
+        visible = FleetStatusService.visible(snap.table, _User())
+        assert "port2" not in set(visible["port"])
+
+    def test_stale_cache_refresh_is_bounded_by_workers(self):
+        import time
+        import device_service
+        DeviceService.clear()
+
+        class _CountingApi(_FleetApi):
+            def get_interfaces_realtime(self, device_name, vdom="root", adom="root"):
+                with self.lock:
+                    self.active += 1
+                    self.peak = max(self.peak, self.active)
+                time.sleep(0.02)
+                with self.lock:
+                    self.active -= 1
+                return [_iface("port1", link=0)]
+
+        api = _CountingApi({})
+        devices = [{"name": f"FW{i}", "adom": "root", "platform_str": "60F"} for i in range(20)]
+        try:
+            # Eski (fresh_ttl disinda, max_stale icinde) port kayitlari
+            for d in devices:
+                key = (api.base_url, d["name"], "root", "root")
+                device_service._INTERFACES.set(key, [_iface("port1")])
+                device_service._INTERFACES._data[key] = ([_iface("port1")], time.monotonic() - 30)
+            snap = FleetStatusService.collect(api, devices, workers=3)
+            # Arka plan yenilemesi baslatilmadi; eski veri yerine taze veri okundu
+            assert not any(device_service._INTERFACES.is_refreshing((api.base_url, d["name"], "root", "root"))
+                           for d in devices)
+            assert api.peak <= 3
+            assert set(snap.table["state"]) == {STATE_LINK_DOWN}
+        finally:
+            DeviceService.clear()
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import live_status
+from live_status import LiveStatusPoller, get_poller, request_refresh
+
+
+class _Fetcher:
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = 0
+        self.called = threading.Semaphore(0)
+
+    def __call__(self):
+        self.calls += 1
+        self.called.release()
+        value = self.results[min(self.calls, len(self.results)) - 1]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+class TestLiveStatus:
+    def teardown_method(self):
+        live_status.stop_all()
+
+    def test_viewers_share_one_poller(self):
+        fetch = _Fetcher([[{"name": "port1", "status": "up"}]])
+        first = get_poller(("fw1", "root", "root"), fetch, interval=60)
+        assert first.wait_ready(2)
+        for _ in range(30):
+            assert get_poller(("fw1", "root", "root"), fetch, interval=60) is first
+        assert fetch.calls == 1
+        assert first.snapshot().data == [{"name": "port1", "status": "up"}]
+
+    def test_refresh_polls_immediately_and_bumps_version_on_change(self):
+        fetch = _Fetcher([[{"name": "port1", "status": "up"}], [{"name": "port1", "status": "down"}]])
+        poller = get_poller(("fw2", "root", "root"), fetch, interval=60)
+        assert poller.wait_ready(2)
+        v1 = poller.snapshot().version
+
+        request_refresh(("fw2", "root", "root"))
+        assert fetch.called.acquire(timeout=2) and fetch.called.acquire(timeout=2)
+        deadline = time.time() + 2
+        while poller.snapshot().version == v1 and time.time() < deadline:
+            time.sleep(0.01)
+        assert poller.snapshot().data[0]["status"] == "down"
+
+    def test_error_keeps_last_data(self):
+        fetch = _Fetcher([[{"name": "port1"}], RuntimeError("timeout")])
+        poller = get_poller(("fw3", "root", "root"), fetch, interval=60)
+        assert poller.wait_ready(2)
+        poller.refresh()
+        deadline = time.time() + 2
+        while poller.snapshot().error is None and time.time() < deadline:
+            time.sleep(0.01)
+        snap = poller.snapshot()
+        assert snap.error == "timeout"
+        assert snap.data == [{"name": "port1"}]
+
+    def test_idle_poller_stops_and_is_replaced(self):
+        fetch = _Fetcher([[]])
+        with live_status._POLLERS_LOCK:
+            poller = LiveStatusPoller(("fw4", "root", "root"), fetch, interval=60, idle_timeout=0)
+            live_status._POLLERS[poller.key] = poller
+        poller._thread.join(2)
+        assert not poller.is_alive()
+        assert ("fw4", "root", "root") not in live_status._POLLERS
+        assert get_poller(("fw4", "root", "root"), fetch) is not poller
@@ -0,0 +1,178 @@
+import os
+import sys
+import csv
+import gzip
+import threading
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from log_service import AuditWriter, LOG_COLUMNS
+
+
+def _entry(i):
+    return {"Timestamp": f"2026-01-20 10:00:{i:02d}", "User": "admin", "Action": "Port UP", "Device": "FW01[root]", "Details": f"ok {i}"}
+
+
+def _read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+class TestAuditWriter:
+    def test_batched_rows_written_with_header_on_flush(self, tmp_path):
+        log_file = str(tmp_path / "audit.csv")
+        writer = AuditWriter(log_file=log_file, durability="batched", flush_interval=0.05)
+        for i in range(5):
+            assert writer.submit(_entry(i)) is True
+        assert writer.flush() is True
+
+        rows = _read_rows(log_file)
+        assert rows[0] == LOG_COLUMNS
+        assert len(rows) == 6
+        assert rows[-1][4] == "ok 4"
+        writer.close()
+
+    def test_group_commit_uses_one_fsync_per_batch(self, tmp_path):
+        log_file = str(tmp_path / "audit.csv")
+        writer = AuditWriter(log_file=log_file, durability="batched", flush_interval=0.05)
+        with patch('log_service.os.fsync') as mock_fsync:
+            # Ilk yazimi beklet; bu surede gelen kayitlar tek partide toplanmali
+            gate = threading.Event()
+            original_write = writer._write
+
+            def slow_write(entries):
+                gate.wait(1)
+                original_write(entries)
+            writer._write = slow_write
+            for i in range(50):
+                writer.submit(_entry(i % 60))
+            gate.set()
+            writer.flush()
+            assert mock_fsync.call_count < 50
+        assert len(_read_rows(log_file)) == 51
+        writer.close()
+
+    def test_strict_mode_waits_for_commit(self, tmp_path):
+        log_file = str(tmp_path / "audit.csv")
+        writer = AuditWriter(log_file=log_file, durability="strict", flush_interval=0.05)
+        assert writer.submit(_entry(1)) is True
+        # Strict modda submit dondugunde kayit diskte olmali
+        assert len(_read_rows(log_file)) == 2
+        writer.close()
+
+    def test_strict_submit_reports_failed_commit(self, tmp_path):
+        log_file = str(tmp_path / "audit.csv")
+        store, sender = MagicMock(), MagicMock()
+        writer = AuditWriter(log_file=log_file, durability="strict", flush_interval=0.05,
+                             store=store, siem_sender=sender)
+        original_write = writer._write
+
+        def failing_write(entries):
+            raise OSError("disk full")
+        writer._write = failing_write
+        assert writer.submit(_entry(1)) is False
+        # Commit edilmeyen parti store'a ve SIEM'e gitmez
+        store.insert_many.assert_not_called()
+        sender.assert_not_called()
+        # Sonraki basarili parti tekrar True doner
+        writer._write = original_write
+        assert writer.submit(_entry(2)) is True
+        writer.close()
+        store.insert_many.assert_called_once_with([_entry(2)])
+        sender.assert_called_once_with(_entry(2))
+
+    def test_close_flushes_and_forwards_to_siem(self, tmp_path):
+        log_file = str(tmp_path / "audit.csv")
+        sender = MagicMock()
+        writer = AuditWriter(log_file=log_file, durability="batched", flush_interval=0.05, siem_sender=sender)
+        writer.submit(_entry(1))
+        writer.submit(_entry(2))
+        writer.close()
+        assert len(_read_rows(log_file)) == 3
+        assert sender.call_count == 2
+        assert writer.submit(_entry(3)) is False
+
+
+    def test_writer_inserts_batch_into_store(self, tmp_path):
+        from audit_store import AuditStore
+        store = AuditStore(str(tmp_path / "audit.db"))
+        writer = AuditWriter(log_file=str(tmp_path / "audit.csv"), durability="strict", flush_interval=0.05, store=store)
+        for i in range(3):
+            assert writer.submit(_entry(i)) is True
+        writer.close()
+        assert store.count(user="admin") == 3
+
+class TestLogReads:
+    def test_time_bounded_reads_use_journal_blocks(self, tmp_path):
+        from audit_journal import AuditJournal
+        from log_service import LogService
+        journal = AuditJournal(str(tmp_path / "journal"), block_rows=10)
+        journal.append([_entry(i) for i in range(30)])
+        store = MagicMock()
+        with patch('log_service.LogService.get_audit_journal', return_value=journal), \
+             patch('log_service.LogService.get_audit_store', return_value=store), \
+             patch('log_service.LogService.flush_logs'):
+            data = LogService.build_log_export(start="2026-01-20 10:00:25")
+            rows = list(csv.reader(gzip.decompress(data).decode("utf-8").splitlines()))
+            assert rows[0] == LOG_COLUMNS and [r[4] for r in rows[1:]] == [f"ok {i}" for i in range(25, 30)]
+            store.iter_rows.assert_not_called()
+
+            # Satir siniri
+            data = LogService.build_log_export(start="2026-01-20 10:00:25", max_rows=2)
+            rows = list(csv.reader(gzip.decompress(data).decode("utf-8").splitlines()))
+            assert [r[4] for r in rows[1:]] == ["ok 25", "ok 26"]
+
+            # Sayimlar sayfalarla ayni kaynaktan (audit store) yapilir
+            store.count.return_value = 7
+            assert LogService.count_logs(start="2026-01-20 10:00:20") == 7
+            assert LogService.count_logs(start="2026-01-19") == 7
+            assert LogService.count_logs(user="admin") == 7
+        journal.close()
+
+    def test_text_filter_count_pages_and_export_agree(self, tmp_path):
+        from audit_journal import AuditJournal
+        from audit_store import AuditStore
+        from log_service import LogService
+        entries = [dict(_entry(i), Details=d) for i, d in
+                   enumerate(["şifre sıfırlandı", "Şifre değişti", "ŞİFRE", "port up", "şifre hatası"])]
+        journal = AuditJournal(str(tmp_path / "journal"), block_rows=2)
+        journal.append(entries)
+        store = AuditStore(str(tmp_path / "audit.db"))
+        store.insert_many(entries)
+        filters = {"start": "2026-01-20 10:00:00", "text": "şifre"}
+        with patch('log_service.LogService.get_audit_journal', return_value=journal), \
+             patch('log_service.LogService.get_audit_store', return_value=store), \
+             patch('log_service.LogService.flush_logs'):
+            total = LogService.count_logs(**filters)
+            pages = [LogService.get_logs(limit=1, offset=o, **filters) for o in range(total + 1)]
+            data = LogService.build_log_export(**filters)
+            exported = list(csv.reader(gzip.decompress(data).decode("utf-8").splitlines()))[1:]
+        assert total == sum(len(p) for p in pages) == len(exported)
+        assert total >= 1
+        store.close()
+        journal.close()
+
+
+class TestSiemSend:
+    def test_config_is_read_once_until_revision_changes(self):
+        import log_service
+        from log_service import LogService
+        log_service._SIEM_CONFIG_CACHE = None
+        cfg = {"siem_settings": {"enabled": True, "server": "127.0.0.1", "port": 5514, "protocol": "UDP"}}
+        with patch('log_service.ConfigService.get_revision', return_value=(1, 10)) as mock_rev, \
+             patch('log_service.ConfigService.load_config', return_value=cfg) as mock_load, \
+             patch('log_service.SiemTransport') as mock_transport:
+            mock_transport.return_value.key = ("127.0.0.1", 5514, "UDP")
+            mock_transport.return_value.protocol = "UDP"
+            for _ in range(3):
+                LogService.send_to_siem(_entry(1))
+            assert mock_load.call_count == 1
+            assert mock_transport.call_count == 1
+            assert mock_transport.return_value.send.call_count == 3
+
+            mock_rev.return_value = (2, 11)
+            LogService.send_to_siem(_entry(2))
+            assert mock_load.call_count == 2
+        LogService.close_siem_transport()
+        log_service._SIEM_CONFIG_CACHE = None
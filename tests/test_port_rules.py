@@ -0,0 +1,98 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from port_rules import PortRuleSet, PortPermissionMatcher, compact_port_list, get_matcher
+
+
+class TestPortRuleSet:
+    def test_exact_range_and_wildcard(self):
+        rs = PortRuleSet(["dmz", "port{1-48}", "vlan*", "port1/{1-24}"])
+        assert rs.matches("dmz")
+        assert rs.matches("port1")
+        assert rs.matches("port48")
+        assert not rs.matches("port49")
+        assert rs.matches("vlan100")
+        assert rs.matches("port1/24")
+        assert not rs.matches("port2/1")
+        assert not rs.matches("wan1")
+
+    def test_dashed_name_is_exact_not_range(self):
+        # Eski kurallar ("port1-4") tam isim anlamini korur; aralik yalnizca "port{1-4}"
+        rs = PortRuleSet(["port1-4"])
+        assert rs.matches("port1-4")
+        assert not rs.matches("port2")
+        assert not rs.matches("port4")
+
+    def test_empty(self):
+        rs = PortRuleSet([])
+        assert not rs
+        assert not rs.matches("port1")
+
+
+class TestPortPermissionMatcher:
+    def test_global_and_device_scopes(self):
+        m = PortPermissionMatcher(
+            ["lan1"],
+            {"FW01": ["dmz"], "FW-ANK-*": ["internal*"], "@Izmir": ["port{1-4}"]},
+            {"Izmir": ["FW-IZM-01", "FW-IZM-02"]}
+        )
+        assert m.allows("ANY", "lan1")
+        assert m.allows("FW01", "dmz")
+        assert not m.allows("FW02", "dmz")
+        assert m.allows("FW-ANK-05", "internal3")
+        assert not m.allows("FW-IST-05", "internal3")
+        assert m.allows("FW-IZM-02", "port3")
+        assert not m.allows("FW-IZM-03", "port3")
+
+    def test_unknown_group_grants_nothing(self):
+        m = PortPermissionMatcher([], {"@Missing": ["port1"]}, {})
+        assert not m.allows("FW01", "port1")
+
+    def test_get_matcher_reuses_compiled_instance(self):
+        a = get_matcher(["lan1"], {"FW01": ["dmz"]})
+        b = get_matcher(["lan1"], {"FW01": ["dmz"]})
+        assert a is b
+
+
+def test_compact_port_list():
+    ports = [f"port{i}" for i in range(1, 49)] + ["dmz", "wan1", "wan2", "vlan*"]
+    assert compact_port_list(ports) == ["dmz", "vlan*", "port{1-48}", "wan1", "wan2"]
+    # Sikistirilmis kurallar ayni portlara izin vermeli
+    rs = PortRuleSet(compact_port_list(ports))
+    assert all(rs.matches(p) for p in ports if "*" not in p)
+
+    # Sifir dolgulu isimler tam isim olarak kalir; erisim port1..port3'e genislemez
+    padded = ["port01", "port02", "port03"]
+    assert compact_port_list(padded) == padded
+    assert not PortRuleSet(compact_port_list(padded)).matches("port1")
+
+
+class TestAllowedMask:
+    def _matcher(self):
+        return PortPermissionMatcher(
+            ["lan1", "vlan*"],
+            {"FW01": ["dmz", "port{10-20}"], "FW-ANK-*": ["internal*"], "@Izmir": ["port1/{1-4}"]},
+            {"Izmir": ["FW-IZM-01"]}
+        )
+
+    def test_mask_matches_scalar_semantics(self):
+        m = self._matcher()
+        devices = ["FW01", "FW01", "FW01", "FW02", "FW-ANK-1", "FW-IST-1", "FW-IZM-01", "FW-IZM-01", "FW02"]
+        ports = ["dmz", "port15", "port21", "dmz", "internal7", "internal7", "port1/3", "port1/5", "vlan99"]
+        mask = m.allowed_mask(devices, ports)
+        assert mask.tolist() == [m.allows(d, p) for d, p in zip(devices, ports)]
+        assert mask.tolist() == [True, True, False, False, True, False, True, False, True]
+
+    def test_mask_accepts_dataframe_columns(self):
+        import pandas as pd
+        df = pd.DataFrame({"device": ["FW01", "FW02"], "port": ["lan1", "wan1"]})
+        assert self._matcher().allowed_mask(df["device"], df["port"]).tolist() == [True, False]
+
+    def test_mask_empty_and_length_mismatch(self):
+        import pytest
+        m = self._matcher()
+        assert m.allowed_mask([], []).tolist() == []
+        with pytest.raises(ValueError):
+            m.allowed_mask(["FW01"], [])
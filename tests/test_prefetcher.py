@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from device_service import DeviceService
+from prefetcher import Prefetcher, likely_next_devices
+
+
+class _FakeApi:
+    base_url = "https://fmg-prefetch.test/jsonrpc"
+
+    def __init__(self):
+        self.calls = []
+
+    def get_vdoms(self, device_name):
+        self.calls.append(("vdoms", device_name))
+        return ["root", "dmz"]
+
+    def get_interfaces_realtime(self, device_name, vdom="root", adom="root"):
+        self.calls.append(("interfaces", device_name, vdom))
+        return [{"name": "port1", "status": "up"}]
+
+
+class _Matcher:
+    def __init__(self, devices):
+        self.devices = devices
+
+    def rules_for_device(self, name):
+        return ["rule"] if name in self.devices else []
+
+
+class _User:
+    def __init__(self, username="ali", role="Operator", devices=()):
+        self.username = username
+        self.role = role
+        self._matcher = _Matcher(devices)
+
+    def get_port_matcher(self):
+        return self._matcher
+
+
+class TestPrefetcher:
+    def test_duplicate_keys_are_queued_once(self):
+        prefetcher = Prefetcher(workers=1, rate=100)
+        release = threading.Event()
+        calls = []
+
+        def job(name, throttle):
+            calls.append(name)
+            release.wait(2)
+
+        try:
+            assert prefetcher.submit("a", job, "a") is True
+            assert prefetcher.submit("a", job, "a") is False
+            assert prefetcher.submit("b", job, "b") is True
+            assert prefetcher.pending() == 2
+            release.set()
+            deadline = time.time() + 2
+            while prefetcher.pending() and time.time() < deadline:
+                time.sleep(0.01)
+            assert sorted(calls) == ["a", "b"]
+            # Tamamlanan anahtar tekrar eklenebilir
+            assert prefetcher.submit("a", job, "a") is True
+        finally:
+            release.set()
+            prefetcher.close()
+
+    def test_concurrency_and_queue_are_bounded(self):
+        prefetcher = Prefetcher(workers=2, rate=100, max_pending=3)
+        release = threading.Event()
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def job(throttle):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            release.wait(2)
+            with lock:
+                running[0] -= 1
+
+        try:
+            assert [prefetcher.submit(i, job) for i in range(5)] == [True, True, True, False, False]
+            time.sleep(0.1)
+            assert peak[0] == 2
+        finally:
+            release.set()
+            prefetcher.close()
+
+    def test_throttle_limits_fmg_call_rate(self):
+        prefetcher = Prefetcher(workers=1, rate=20)
+        try:
+            start = time.monotonic()
+            for _ in range(30):
+                assert prefetcher.throttle() is True
+            # 20 token'lik burst + 10 token @ 20/sn ~= 0.5 sn
+            assert time.monotonic() - start >= 0.4
+        finally:
+            prefetcher.close()
+        assert prefetcher.throttle() is False
+
+    def test_candidates_in_priority_order(self):
+        devices = [{"name": f"FW{i}", "adom": "root"} for i in range(5)]
+        user = _User(devices=("FW4", "FW1"))
+        targets = likely_next_devices(devices, page_devices=devices[:2], recent=[("FW3", "dmz"), ("GONE", "root")],
+                                      user=user, exclude="FW0")
+        assert targets == [("FW1", "root", None), ("FW3", "root", "dmz"), ("FW4", "root", None)]
+        # Admin icin yetki listesi sinyal degildir
+        assert likely_next_devices(devices, user=_User("admin", "Super_User", ("FW4",))) == []
+
+    def test_warm_loads_once_and_skips_fresh_entries(self):
+        DeviceService.clear()
+        api = _FakeApi()
+        try:
+            assert DeviceService.warm(api, "FW1") == 2
+            assert api.calls == [("vdoms", "FW1"), ("interfaces", "FW1", "root")]
+            assert DeviceService.warm(api, "FW1") == 0
+            # Isitilan veri normal okumada FMG'ye gitmeden gelir
+            assert DeviceService.get_interfaces(api, "FW1", "root").value == [{"name": "port1", "status": "up"}]
+            assert len(api.calls) == 2
+            # throttle False donerse cagri yapilmaz
+            assert DeviceService.warm(api, "FW2", throttle=lambda: False) == 0
+            assert len(api.calls) == 2
+        finally:
+            DeviceService.clear()
@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from session_store import SessionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = SessionStore(db_path=str(tmp_path / "sessions.db"), ttl=3600, idle_timeout=600, max_entries=3)
+    yield s
+    s.close()
+
+
+def test_create_and_get(store):
+    token = store.create("operator", {"username": "operator", "role": "Standard_User"})
+    session = store.get(token)
+    assert session is not None
+    assert session["username"] == "operator"
+    assert session["payload"]["role"] == "Standard_User"
+
+
+def test_unknown_token(store):
+    assert store.get("does-not-exist") is None
+    assert store.get("") is None
+
+
+def test_sessions_survive_restart(tmp_path):
+    """Yeni bir store instance'i (pod restart) ayni DB'den oturumu okuyabilmeli."""
+    db = str(tmp_path / "sessions.db")
+    first = SessionStore(db_path=db)
+    token = first.create("admin", {"username": "admin"})
+    first.close()
+
+    second = SessionStore(db_path=db)
+    assert second.get(token)["username"] == "admin"
+    second.close()
+
+
+def test_ttl_expiry(store):
+    token = store.create("operator", {})
+    store._cache.clear()
+    store._connect().execute("UPDATE sessions SET expires_at = ?", (time.time() - 1,))
+    assert store.get(token) is None
+
+
+def test_idle_timeout(store):
+    token = store.create("operator", {})
+    store._cache.clear()
+    store._connect().execute("UPDATE sessions SET last_seen = ?", (time.time() - 601,))
+    assert store.get(token) is None
+
+
+def test_delete_user_removes_all_tokens(store):
+    t1 = store.create("operator", {})
+    t2 = store.create("operator", {})
+    t3 = store.create("admin", {})
+    store.delete_user("operator")
+    assert store.get(t1) is None
+    assert store.get(t2) is None
+    assert store.get(t3) is not None
+
+
+def test_capacity_evicts_least_recently_used(store):
+    tokens = [store.create(f"user{i}", {}) for i in range(5)]
+    store.purge()
+    remaining = store._connect().execute("SELECT token FROM sessions").fetchall()
+    assert len(remaining) == 3
+    assert store.get(tokens[0]) is None
+    assert store.get(tokens[-1]) is not None
+
+
+def test_capacity_enforced_on_create(store):
+    tokens = [store.create(f"user{i}", {}) for i in range(5)]
+    # purge() cagrilmadan da sinir asilmaz
+    count = store._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    assert count == 3
+    assert store.get(tokens[0]) is None
+    assert all(store.get(t) is not None for t in tokens[-3:])
+
+
+def test_create_does_not_count_table(store):
+    store.create("warmup", {})
+    statements = []
+    store._connect().set_trace_callback(statements.append)
+    for i in range(5):
+        store.create(f"user{i}", {})
+    store._connect().set_trace_callback(None)
+    # Kapasite bellekteki sayiyla uygulanir; create tabloyu taramaz
+    assert not any("COUNT(" in sql.upper() for sql in statements)
+    assert store._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 3
@@ -0,0 +1,52 @@
+import os
+import sys
+import re
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from siem_format import get_formatter, frame, Rfc5424Formatter, CefFormatter, FRAMING_OCTET, FRAMING_NEWLINE
+
+RECORD = {"Timestamp": "2026-01-20 10:00:00", "User": "ali", "Action": "Port DOWN",
+          "Device": "FW01[root]", "Details": 'port1 "uplink" a=b|c'}
+
+
+class TestFormatters:
+    def test_json_is_default(self):
+        fmt = get_formatter()
+        assert fmt.framing == FRAMING_NEWLINE
+        assert fmt.format(RECORD).startswith(b'{"Timestamp"')
+
+    def test_rfc5424_header_and_structured_data(self):
+        line = Rfc5424Formatter(hostname="app-pod 1").format(RECORD).decode()
+        # <13*8+5>1 TIMESTAMP HOST APP PROCID MSGID [SD] MSG
+        m = re.match(r'^<109>1 (\S+) app-pod_1 forticam - Port_DOWN \[forticam@32473 (.*)\] (.*)$', line)
+        assert m, line
+        assert m.group(1).endswith("Z")
+        assert 'user="ali"' in m.group(2)
+        assert 'device="FW01[root\\]"' in m.group(2)
+        assert 'eventTime="2026-01-20 10:00:00"' in m.group(2)
+        assert m.group(3) == RECORD["Details"]
+
+    def test_cef_escaping(self):
+        line = CefFormatter(version="1.6").format(RECORD).decode()
+        assert line.startswith("CEF:0|FortiCam|FortiCam|1.6|Port DOWN|Port DOWN|3|")
+        assert "suser=ali" in line
+        assert 'msg=port1 "uplink" a\\=b|c' in line
+
+    def test_cef_receipt_time_format(self):
+        line = CefFormatter().format(RECORD).decode()
+        assert "|3|rt=Jan 20 2026 10:00:00 suser=ali" in line
+        # Ayristirilamayan zaman: epoch milisaniye
+        line = CefFormatter().format(dict(RECORD, Timestamp="?")).decode()
+        assert re.search(r"\|3\|rt=\d{13} suser=", line)
+
+    def test_formatter_instances_are_cached(self):
+        assert get_formatter("cef") is get_formatter("CEF")
+        with pytest.raises(ValueError):
+            get_formatter("xml")
+
+    def test_octet_counting_framing(self):
+        assert frame("ğ".encode('utf-8'), FRAMING_OCTET) == b"2 " + "ğ".encode('utf-8')
+        assert frame(b"{}", FRAMING_NEWLINE) == b"{}\n"
@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from siem_spool import SiemSpool, SiemForwarder
+
+
+def _rec(i):
+    return {"Timestamp": f"2026-01-20 10:00:{i:02d}", "User": "admin", "Action": "Port UP", "Device": "FW01", "Details": f"ok {i}"}
+
+
+class TestSiemSpool:
+    def test_ack_survives_restart_and_only_tail_is_replayed(self, tmp_path):
+        spool = SiemSpool(str(tmp_path))
+        for i in range(5):
+            spool.append(_rec(i))
+        items = spool.read_batch(3)
+        assert [r["Details"] for r, _ in items] == ["ok 0", "ok 1", "ok 2"]
+        spool.ack(items[-1][1])
+        spool.close()
+
+        reopened = SiemSpool(str(tmp_path))
+        tail = [r for r, _ in reopened.read_batch(10) if r is not None]
+        assert [r["Details"] for r in tail] == ["ok 3", "ok 4"]
+
+    def test_segments_roll_and_delivered_ones_are_deleted(self, tmp_path):
+        spool = SiemSpool(str(tmp_path), segment_bytes=200)
+        for i in range(10):
+            spool.append(_rec(i))
+        assert len(spool._segments) > 1
+
+        items = spool.read_batch(100)
+        assert [r["Details"] for r, _ in items if r is not None] == [f"ok {i}" for i in range(10)]
+        spool.ack(items[-1][1])
+        assert len(spool._segments) == 1
+        assert len([n for n in os.listdir(tmp_path) if n.endswith(".spool")]) == 1
+        assert spool.pending_bytes() == 0
+
+    def test_partial_trailing_line_is_not_merged(self, tmp_path):
+        spool = SiemSpool(str(tmp_path))
+        spool.append(_rec(0))
+        spool.close()
+        with open(spool._path(1), "ab") as f:
+            f.write(b'{"broken')  # Cokme sirasinda yarim kalmis kayit
+
+        reopened = SiemSpool(str(tmp_path))
+        reopened.append(_rec(1))
+        records = [r for r, _ in reopened.read_batch(10) if r is not None]
+        assert [r["Details"] for r in records] == ["ok 0", "ok 1"]
+
+    def test_capacity_drops_oldest_segments(self, tmp_path):
+        spool = SiemSpool(str(tmp_path), segment_bytes=200, max_bytes=500)
+        for i in range(30):
+            spool.append(_rec(i))
+        records = [r for r, _ in spool.read_batch(100) if r is not None]
+        assert records[-1]["Details"] == "ok 29"
+        assert records[0]["Details"] != "ok 0"
+
+
+class TestSiemForwarder:
+    def test_retries_with_backoff_then_delivers_in_order(self, tmp_path):
+        delivered = []
+        outage = {"left": 2}
+        lock = threading.Lock()
+
+        def sender(record):
+            with lock:
+                if outage["left"] > 0:
+                    outage["left"] -= 1
+                    raise ConnectionRefusedError("SIEM down")
+                delivered.append(record["Details"])
+
+        forwarder = SiemForwarder(SiemSpool(str(tmp_path)), sender, rate=0,
+                                  backoff_initial=0.01, backoff_max=0.05)
+        for i in range(5):
+            forwarder.submit(_rec(i))
+        assert forwarder.wait_idle(5)
+        assert delivered == [f"ok {i}" for i in range(5)]
+        assert forwarder.last_error is None
+        forwarder.close()
+
+    def test_partial_batch_is_acked_before_retry(self, tmp_path):
+        delivered = []
+        calls = {"n": 0}
+
+        def sender(record):
+            calls["n"] += 1
+            if calls["n"] == 3:
+                raise OSError("connection reset")
+            delivered.append(record["Details"])
+
+        spool = SiemSpool(str(tmp_path))
+        for i in range(4):
+            spool.append(_rec(i))
+        forwarder = SiemForwarder(spool, sender, rate=0, backoff_initial=0.01)
+        assert forwarder.wait_idle(5)
+        # Basarili gonderilenler tekrar gonderilmez (duplicate yok)
+        assert delivered == ["ok 0", "ok 1", "ok 2", "ok 3"]
+        forwarder.close()
+
+    def test_replay_is_rate_limited(self, tmp_path):
+        spool = SiemSpool(str(tmp_path))
+        for i in range(20):
+            spool.append(_rec(i))
+        start = time.monotonic()
+        forwarder = SiemForwarder(spool, lambda r: None, rate=100, batch_size=10)
+        assert forwarder.wait_idle(5)
+        # 20 olay / 100 olay/sn -> ilk parti sonrasi en az ~0.1s beklenir
+        assert time.monotonic() - start >= 0.09
+        forwarder.close()
@@ -0,0 +1,141 @@
+import os
+import sys
+import socket
+import threading
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import siem_transport
+from siem_transport import SiemTransport, resolve_address
+
+
+class _TcpServer:
+    """Gelen baglantilari ve satirlari kaydeden basit yerel TCP sunucusu."""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(5)
+        self.port = self.sock.getsockname()[1]
+        self.connections = []
+        self.lines = []
+        self.got_line = threading.Semaphore(0)
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections.append(conn)
+            threading.Thread(target=self._read, args=(conn,), daemon=True).start()
+
+    def _read(self, conn):
+        buf = b""
+        while True:
+            try:
+                chunk = conn.recv(4096)
+            except OSError:
+                return
+            if not chunk:
+                return
+            buf += chunk
+            while b"\n" in buf:
+                line, buf = buf.split(b"\n", 1)
+                self.lines.append(line)
+                self.got_line.release()
+
+    def close(self):
+        self.sock.close()
+
+
+class TestSiemTransport:
+    def setup_method(self):
+        siem_transport._DNS_CACHE.clear()
+
+    def test_tcp_connection_is_reused(self):
+        server = _TcpServer()
+        transport = SiemTransport("127.0.0.1", server.port, "TCP")
+        for i in range(5):
+            transport.send(f"msg{i}\n".encode())
+        for _ in range(5):
+            assert server.got_line.acquire(timeout=2)
+        assert server.lines == [f"msg{i}".encode() for i in range(5)]
+        assert len(server.connections) == 1
+        assert transport._sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE) == 1
+        transport.close()
+        server.close()
+
+    def test_tcp_reconnects_after_failure(self):
+        server = _TcpServer()
+        transport = SiemTransport("127.0.0.1", server.port, "TCP")
+        transport.send(b"first\n")
+        assert server.got_line.acquire(timeout=2)
+
+        # Mevcut soket bozulursa gonderim yeni baglanti ile tekrarlanmali
+        transport._sock.close()
+        transport.send(b"second\n")
+        assert server.got_line.acquire(timeout=2)
+        assert server.lines == [b"first", b"second"]
+        assert len(server.connections) == 2
+        transport.close()
+        server.close()
+
+    def test_udp_socket_is_reused(self):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(("127.0.0.1", 0))
+        receiver.settimeout(2)
+        transport = SiemTransport("127.0.0.1", receiver.getsockname()[1], "UDP")
+
+        transport.send(b"a")
+        first_sock = transport._sock
+        transport.send(b"b")
+        assert transport._sock is first_sock
+        assert receiver.recv(100) == b"a"
+        assert receiver.recv(100) == b"b"
+        transport.close()
+        receiver.close()
+
+    def test_udp_follows_address_change_after_dns_ttl(self):
+        import time
+        old, new = (socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(2))
+        for r in (old, new):
+            r.bind(("127.0.0.1", 0))
+            r.settimeout(2)
+        # Ayni isim, TTL sonrasi farkli adrese cozuluyor (UDP'de gonderim hatasi olusmaz)
+        answers = iter([old.getsockname(), new.getsockname()])
+        with patch('siem_transport.resolve_address', side_effect=lambda *a: next(answers)):
+            transport = SiemTransport("siem.example", 514, "UDP", dns_ttl=0.05)
+            transport.send(b"a")
+            transport.send(b"b")  # TTL dolmadi: eski adres
+            time.sleep(0.06)
+            transport.send(b"c")
+        assert old.recv(100) == b"a" and old.recv(100) == b"b"
+        assert new.recv(100) == b"c"
+        transport.close()
+        old.close()
+        new.close()
+
+    def test_dns_resolution_is_cached(self):
+        with patch('siem_transport.socket.getaddrinfo', wraps=socket.getaddrinfo) as mock_gai:
+            assert resolve_address("127.0.0.1", 514) == ("127.0.0.1", 514)
+            assert resolve_address("127.0.0.1", 514) == ("127.0.0.1", 514)
+            assert mock_gai.call_count == 1
+
+    def test_tcp_batch_is_written_in_one_call(self):
+        server = _TcpServer()
+        transport = SiemTransport("127.0.0.1", server.port, "TCP")
+        transport.send(b"warmup\n")
+        assert server.got_line.acquire(timeout=2)
+
+        real_sock = transport._sock
+        transport._sock = MagicMock(wraps=real_sock)
+        transport.send_batch([f"m{i}\n".encode() for i in range(50)])
+        assert transport._sock.sendall.call_count == 1
+        for _ in range(50):
+            assert server.got_line.acquire(timeout=2)
+        assert server.lines[-1] == b"m49"
+        transport.close()
+        server.close()
@@ -0,0 +1,45 @@
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import static_assets
+
+
+class TestStaticAssets:
+    def setup_method(self):
+        static_assets._publish.cache_clear()
+        static_assets._data_uri.cache_clear()
+
+    def test_publishes_content_hashed_copy(self, tmp_path):
+        src = tmp_path / "Logo Dosyası.png"
+        src.write_bytes(b"v1")
+        static_dir = tmp_path / "static"
+        with patch.object(static_assets, "STATIC_DIR", str(static_dir)), \
+             patch.object(static_assets, "static_serving_enabled", return_value=True):
+            url1 = static_assets.asset_url(str(src))
+            assert url1.startswith("app/static/Logo-Dosyas.") and url1.endswith(".png")
+            assert static_assets.asset_url(str(src)) == url1
+
+            # Icerik degisince yeni URL, eski surum silinir
+            src.write_bytes(b"v2-changed")
+            url2 = static_assets.asset_url(str(src))
+            assert url2 != url1
+            assert sorted(os.listdir(static_dir)) == [url2.rsplit("/", 1)[1]]
+            assert (static_dir / url2.rsplit("/", 1)[1]).read_bytes() == b"v2-changed"
+
+    def test_stylesheet_sends_only_import_reference(self, tmp_path):
+        with patch.object(static_assets, "STATIC_DIR", str(tmp_path)), \
+             patch.object(static_assets, "static_serving_enabled", return_value=True):
+            block = static_assets.stylesheet("app.css", ".x{}")
+        assert block.startswith('<style>@import url("app/static/app.') and block.endswith('.css");.x{}</style>')
+        assert len(block) < 200
+
+    def test_falls_back_to_inline_when_static_serving_disabled(self, tmp_path):
+        img = tmp_path / "bg.png"
+        img.write_bytes(b"img")
+        with patch.object(static_assets, "static_serving_enabled", return_value=False):
+            assert static_assets.image_src(str(img)) == "data:image/png;base64,aW1n"
+            assert "#MainMenu" in static_assets.stylesheet("app.css")
+            assert static_assets.image_src(str(tmp_path / "missing.png")) is None
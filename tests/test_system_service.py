@@ -45,3 +45,66 @@ class TestSystemServiceConnectivity:
         # Verify
         assert status is False
         assert "Connection Refused" in message
+
+
+class TestStartupHealthChecks:
+
+    def setup_method(self):
+        import src.system_service as mod
+        mod._HEALTH_STATE.update({"checked_at": None, "runner": None, "dns": None, "auto_connect": None})
+        for key in mod._HEALTH_CHECKS:
+            mod._HEALTH_CHECKS[key] = {"status": "pending", "message": "Not Checked"}
+
+    @patch('src.system_service.SystemService.update_dns')
+    @patch('src.system_service.AuthService.check_ldap_connectivity')
+    @patch('src.system_service.SystemService.check_fmg_connectivity')
+    @patch('src.system_service.FortiManagerAPI')
+    @patch('src.system_service.ConfigService.load_config')
+    def test_checks_run_concurrently_once_per_interval(self, mock_cfg, MockAPI, mock_fmg, mock_ldap, mock_dns):
+        import time
+        cfg = {"fmg_settings": {"ip": "10.0.0.1", "token": "tok"}, "primary_dns": "1.1.1.1"}
+        mock_cfg.return_value = cfg
+
+        def slow(result):
+            def _call(*args, **kwargs):
+                time.sleep(0.3)
+                return result
+            return _call
+
+        mock_fmg.side_effect = slow((True, "Connection Successful."))
+        mock_ldap.side_effect = slow((False, "LDAP Disabled"))
+        MockAPI.return_value.login.side_effect = slow(True)
+
+        assert SystemService.get_health_checks()["fmg"]["status"] == "pending"
+        start = time.monotonic()
+        assert SystemService.start_health_checks() is True
+        assert SystemService.start_health_checks() is False  # Zaten calisiyor
+        assert SystemService.wait_health_checks(timeout=5)
+        # FMG, LDAP ve otomatik baglanti esanli: ~0.3 sn (sirali olsa ~0.9 sn)
+        assert time.monotonic() - start < 0.8
+
+        checks = SystemService.get_health_checks()
+        assert checks["fmg"] == {"status": "success", "message": "Connection Successful."}
+        assert checks["ldap"]["status"] == "warning"
+        # Her oturum kendi istemcisini alir (paylasilan istemcide logout digerlerini bozardi)
+        MockAPI.reset_mock()
+        assert SystemService.get_auto_connect_api(cfg) is MockAPI.return_value
+        MockAPI.assert_called_once_with("10.0.0.1", None, None, "tok", timeout=2)
+        MockAPI.return_value.login.assert_not_called()
+        assert SystemService.get_auto_connect_api({"fmg_settings": {"ip": "10.0.0.2", "token": "tok"}}) is None
+        mock_dns.assert_called_once_with("1.1.1.1", None)
+
+        # Sonuclar taze: yeni oturumlar yeniden kontrol tetiklemez; force ile yenilenir
+        assert SystemService.start_health_checks() is False
+        assert SystemService.start_health_checks(force=True) is True
+        assert SystemService.wait_health_checks(timeout=5)
+        assert mock_fmg.call_count == 2
+        mock_dns.assert_called_once()
+        MockAPI.return_value.login.assert_not_called()  # Dogrulanmis cift tekrar denenmez
+
+        # FMG erisilemez olursa yeni oturumlar otomatik baglanmaz
+        mock_fmg.side_effect = None
+        mock_fmg.return_value = (False, "Connection Failed.")
+        assert SystemService.start_health_checks(force=True) is True
+        assert SystemService.wait_health_checks(timeout=5)
+        assert SystemService.get_auto_connect_api(cfg) is None
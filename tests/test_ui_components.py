@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import ui_components
+from ui_components import UI
+
+
+class TestDeviceCardMarkup:
+    def setup_method(self):
+        ui_components._device_card_markup.cache_clear()
+
+    def test_markup_is_memoized_per_record_and_selection(self):
+        device = {"name": "FGT-01", "ip": "10.0.0.1", "platform_str": "FortiGate-60F", "os_ver": "7.2", "conn_status": 1}
+        first = UI.device_card_markup(device, False)
+        assert UI.device_card_markup(dict(device), False) is first
+        assert UI.device_card_markup(device, True) != first
+        assert ui_components._device_card_markup.cache_info().misses == 2
+
+        # Kayit degisirse yeni markup uretilir
+        changed = UI.device_card_markup(dict(device, conn_status=0), False)
+        assert "KOPUK" in changed and "BAĞLI" in first
+
+    def test_markup_is_single_line_and_escaped(self):
+        markup = UI.device_card_markup({"name": "<b>x</b>", "platform_str": None}, False)
+        assert "\n" not in markup
+        assert "&lt;b&gt;x&lt;/b&gt;" in markup
+        assert "FortiGate (v-)" in markup